@@ -0,0 +1,50 @@
+"""
+  compression.py
+  --------------
+
+  Measure response bytes on the wire and wall time of large queries with
+  and without TXTRADER_COMPRESSION, for both transports, against the local
+  stand-in server compressing its responses over a simulated WAN link.
+
+  usage: python -m benchmarks.compression [link_mbit] [repeat]
+
+"""
+
+import sys
+import time
+
+from txtrader_client import API
+from tests.server import MockServer
+
+# (label, API method, args)
+QUERIES = [
+    ('query_all_symbols', 'query_all_symbols', ()),
+    ('query_bars', 'query_bars', ('SPY', 1, '2017-01-01 00:00:00', '2030-01-01 00:00:00')),
+    ('query_executions', 'query_executions', ()),
+    ('query_orders', 'query_orders', ()),
+]
+
+
+def main(link_mbit=100, repeat=3):
+    with MockServer(compress=True, bandwidth=link_mbit * 125000) as server:
+        server.txtrader.populate(symbols=5000, bars=100000, orders=5000, executions=20000)
+        for transport in ('requests', 'http.client'):
+            for compression in ('false', 'true'):
+                config = dict(server.config, TXTRADER_TRANSPORT=transport, TXTRADER_COMPRESSION=compression)
+                with API(config=config) as api:
+                    for label, method, args in QUERIES:
+                        samples = []
+                        for _ in range(repeat):
+                            before = server.bytes_out
+                            start = time.perf_counter()
+                            getattr(api, method)(*args)
+                            samples.append(time.perf_counter() - start)
+                            wire = server.bytes_out - before
+                        print(
+                            f'{transport:11} compression={compression:5} {label:17} wire_bytes={wire:<9} '
+                            f'ms={min(samples) * 1000:.0f}'
+                        )
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,67 @@
+"""
+  decoder.py
+  ----------
+
+  Compare the available JSON decoders on response payloads sized like a
+  production server: decode time from raw bytes for each TXTRADER_JSON
+  choice, plus requests' Response.json() on the same bytes.
+
+  usage: python -m benchmarks.decoder [repeat]
+
+"""
+
+import json
+import sys
+import time
+
+import requests
+
+from txtrader_client.decoder import DECODERS, get_decoder
+from tests.server import MockTxTrader
+
+# (label, server function, args, MockTxTrader.populate sizes)
+PAYLOADS = [
+    ('query_all_symbols', 'query_symbols', dict(data=True), dict(symbols=5000)),
+    ('query_executions', 'query_executions', {}, dict(executions=20000)),
+    ('query_orders', 'query_orders', {}, dict(orders=5000)),
+    (
+        'query_bars', 'query_bars', dict(symbol='SPY', period=1, start='2017-01-01 00:00:00',
+                                         end='2030-01-01 00:00:00'), dict(bars=100000)
+    ),
+]
+
+
+def _best(function, content, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(content)
+        samples.append(time.perf_counter() - start)
+    return min(samples) * 1000
+
+
+def _requests_json(content):
+    r = requests.Response()
+    r._content = content
+    r.status_code = 200
+    return r.json()
+
+
+def main(repeat=5):
+    decoders = {}
+    for name in DECODERS:
+        try:
+            decoders[name] = get_decoder(name)
+        except ImportError:
+            print(f'{name:8} not installed')
+    decoders['requests'] = _requests_json
+    for label, function_name, args, sizes in PAYLOADS:
+        txtrader = MockTxTrader()
+        txtrader.populate(**sizes)
+        content = json.dumps(txtrader.call(function_name, args)).encode()
+        timings = ' '.join(f'{name}={_best(decode, content, repeat):.1f}ms' for name, decode in decoders.items())
+        print(f'{label:18} bytes={len(content):<9} {timings}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,39 @@
+"""
+  fanout.py
+  ---------
+
+  Measure query_symbol_many sweep time against worker count using the local
+  stand-in server with a simulated per-request server latency.
+
+  usage: python -m benchmarks.fanout [symbols] [server_delay_ms]
+
+"""
+
+import sys
+import time
+
+from txtrader_client import API
+from tests.server import subprocess_server
+
+
+def main(count=500, delay_ms=20):
+    symbols = [f'S{i:04d}' for i in range(count)]
+    with subprocess_server(delay=delay_ms / 1000) as config:
+        with API(config=config) as api:
+            for symbol in symbols:
+                api.add_symbol(symbol)
+            start = time.perf_counter()
+            for symbol in symbols:
+                api.query_symbol(symbol)
+            print(f'loop        sweep_s={time.perf_counter() - start:.3f}')
+        for workers in (1, 2, 4, 8, 16, 32):
+            with API(config=dict(config, TXTRADER_POOL_SIZE=str(workers))) as api:
+                start = time.perf_counter()
+                ret = api.query_symbol_many(symbols, max_workers=workers)
+                elapsed = time.perf_counter() - start
+            errors = sum(isinstance(v, Exception) for v in ret.values())
+            print(f'workers={workers:<3} sweep_s={elapsed:.3f} errors={errors}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
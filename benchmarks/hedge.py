@@ -0,0 +1,43 @@
+"""
+  hedge.py
+  --------
+
+  Compare query_symbol latency percentiles with and without TXTRADER_HEDGE
+  against the local stand-in server, where a small fraction of requests is
+  held for a long tail delay.
+
+  usage: python -m benchmarks.hedge [calls] [tail_percent] [tail_ms]
+
+"""
+
+import random
+import sys
+import time
+
+from txtrader_client import API
+from tests.server import MockServer
+
+
+def main(calls=2000, tail_percent=2, tail_ms=200):
+    for hedge in ('false', 'true'):
+        rng = random.Random(1)
+        with MockServer() as server:
+            server.txtrader.symbols['IBM'] = server.txtrader.quote('IBM')
+            # hedged copies also draw from the sequence, so make it long enough for both
+            server.delays.extend(
+                tail_ms / 1000 if rng.random() < tail_percent / 100 else 0.001 for _ in range(calls * 2)
+            )
+            with API(config=dict(server.config, TXTRADER_HEDGE=hedge)) as api:
+                samples = []
+                for _ in range(calls):
+                    start = time.perf_counter()
+                    api.query_symbol('IBM')
+                    samples.append(time.perf_counter() - start)
+                hedged = api.hedge.hedged if api.hedge else 0
+        samples.sort()
+        p50, p99 = (samples[int(len(samples) * p)] * 1000 for p in (0.5, 0.99))
+        print(f'hedge={hedge:5} p50_ms={p50:.2f} p99_ms={p99:.2f} max_ms={samples[-1] * 1000:.1f} hedged={hedged}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,63 @@
+"""
+  portfolio.py
+  ------------
+
+  Compare valuing positions across many accounts with nested Python loops
+  over query_positions and query_all_symbols against Portfolio (NumPy and
+  list fallback), for a full build and for an update of a few quotes.
+
+  usage: python -m benchmarks.portfolio [accounts] [symbols] [changed]
+
+"""
+
+import random
+import sys
+import time
+
+from txtrader_client.portfolio import Portfolio
+
+
+def _loops(positions, quotes):
+    ret = {}
+    for account, symbols in positions.items():
+        totals = ret[account] = {'market_value': 0.0, 'long': 0.0, 'short': 0.0, 'pnl': 0.0}
+        for symbol, quantity in symbols.items():
+            quote = quotes.get(symbol)
+            if not quote:
+                continue
+            value = quantity * quote['last']
+            totals['market_value'] += value
+            totals['long' if quantity > 0 else 'short'] += value
+            totals['pnl'] += quantity * (quote['last'] - quote['close'])
+    return ret
+
+
+def _ms(function):
+    start = time.perf_counter()
+    function()
+    return (time.perf_counter() - start) * 1000
+
+
+def main(accounts=200, symbols=3000, changed=30):
+    rng = random.Random(1)
+    names = [f'S{i:04d}' for i in range(symbols)]
+    quotes = {s: {'last': 10.0 + i % 500, 'close': 10.0 + i % 400, 'bid': 9.99, 'ask': 10.01} for i, s in enumerate(names)}
+    positions = {
+        f'ACCOUNT{a}': {s: rng.randrange(-500, 500) or 1 for s in rng.sample(names, symbols // 4)}
+        for a in range(accounts)
+    }
+    count = sum(len(p) for p in positions.values())
+    update = {s: dict(quotes[s], last=quotes[s]['last'] + 0.5) for s in rng.sample(names, changed)}
+    print(f'positions={count} changed_quotes={changed}')
+    print(f'nested loops      full_ms={_ms(lambda: _loops(positions, quotes)):.1f}')
+    for label, use_numpy in (('portfolio numpy', True), ('portfolio lists', False)):
+        ret = []
+        build = _ms(lambda: ret.append(Portfolio(positions, quotes, use_numpy=use_numpy)))
+        p = ret[0]
+        refresh = _ms(p.refresh)
+        incremental = _ms(lambda: p.update_quotes(update))
+        print(f'{label:17} build_ms={build:.1f} refresh_ms={refresh:.1f} update_ms={incremental:.2f}')
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
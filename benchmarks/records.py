@@ -0,0 +1,62 @@
+"""
+  records.py
+  ----------
+
+  Compare retained memory and field access time of the dict result form
+  against TXTRADER_RECORDS=typed slotted records, on order and execution
+  collections sized like a long running process.
+
+  usage: python -m benchmarks.records [orders] [executions]
+
+"""
+
+import gc
+import json
+import sys
+import timeit
+import tracemalloc
+
+from txtrader_client import records
+from tests.server import MockTxTrader
+
+
+def _retained(build):
+    """Return (result, bytes still allocated by build() once it returns)"""
+    gc.collect()
+    tracemalloc.start()
+    ret = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ret, current
+
+
+def main(orders=100000, executions=100000):
+    txtrader = MockTxTrader()
+    txtrader.populate(symbols=500, orders=orders, executions=executions)
+    for label, function_name, cls, field in (
+        ('orders', 'query_orders', records.Order, 'status'),
+        ('executions', 'query_executions', records.Execution, 'PRICE'),
+    ):
+        content = json.dumps(txtrader.call(function_name, {}))
+        dicts, dict_bytes = _retained(lambda: json.loads(content))
+        typed, typed_bytes = _retained(lambda: records.each(cls)(json.loads(content)))
+        count = len(dicts)
+        print(
+            f'{label:11} count={count} dict_bytes_per_record={dict_bytes / count:.0f} '
+            f'typed_bytes_per_record={typed_bytes / count:.0f} saving={1 - typed_bytes / dict_bytes:.0%}'
+        )
+        d = next(iter(dicts.values()))
+        r = next(iter(typed.values()))
+        attribute = cls._ATTRIBUTES[field]
+        names = dict(d=d, r=r, field=field)
+        timings = {
+            'dict[key]': timeit.timeit('d[field]', globals=names, number=1000000),
+            'record.attribute': timeit.timeit(f'r.{attribute}', globals=names, number=1000000),
+            'record.get(key)': timeit.timeit('r.get(field)', globals=names, number=1000000),
+        }
+        print(f'{label:11} ' + ' '.join(f'{k}={v * 1000:.0f}ns' for k, v in timings.items()))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
@@ -0,0 +1,178 @@
+"""
+  suite.py
+  --------
+
+  Client benchmark suite run against the local stand-in txtrader server,
+  populated with payloads sized like a production server.
+
+  Measures per-method latency percentiles, sequential and threaded
+  throughput, per-call allocations and CLI cold start time, and writes the
+  results as JSON so runs can be compared.
+
+  usage: python -m benchmarks.suite [--output results.json] [--quick]
+         python -m benchmarks.suite --compare base.json new.json
+
+"""
+
+import argparse
+import collections
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+from txtrader_client import API, __version__
+from tests.server import subprocess_server
+
+FULL = dict(symbols=5000, bars=100000, orders=5000, executions=20000)
+QUICK = dict(symbols=500, bars=10000, orders=500, executions=2000)
+
+# (label, method name, args, calls)
+CALLS = [
+    ('status', 'status', (), 500),
+    ('query_symbol', 'query_symbol', ('S0001', ), 500),
+    ('query_positions', 'query_positions', (), 50),
+    ('query_orders', 'query_orders', (), 20),
+    ('query_executions', 'query_executions', (), 10),
+    ('iter_executions', 'iter_executions', (), 10),
+    ('query_all_symbols', 'query_all_symbols', (), 10),
+    ('query_bars', 'query_bars', ('SPY', 1, '2017-01-01 00:00:00', '2030-01-01 00:00:00'), 10),
+]
+
+
+def percentiles(samples):
+    samples = sorted(samples)
+
+    def at(p):
+        return samples[min(len(samples) - 1, int(len(samples) * p))] * 1000
+
+    return {
+        'calls': len(samples),
+        'mean_ms': sum(samples) / len(samples) * 1000,
+        'p50_ms': at(0.50),
+        'p90_ms': at(0.90),
+        'p99_ms': at(0.99),
+        'max_ms': samples[-1] * 1000,
+    }
+
+
+def _call(function, args):
+    ret = function(*args)
+    if isinstance(ret, types.GeneratorType):
+        # consume iterator items one at a time, as a streaming caller would
+        collections.deque(ret, maxlen=0)
+    return ret
+
+
+def bench_method(api, method, args, calls):
+    function = getattr(api, method)
+    ret = function(*args)
+    response_bytes = len(json.dumps(dict(ret) if isinstance(ret, types.GeneratorType) else ret))
+    samples = []
+    start = time.perf_counter()
+    for _ in range(calls):
+        t = time.perf_counter()
+        _call(function, args)
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    _call(function, args)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    ret = percentiles(samples)
+    ret.update(calls_per_s=calls / elapsed, response_bytes=response_bytes, alloc_peak_bytes=peak)
+    return ret
+
+
+def bench_threaded(config, workers, calls):
+    with API(config=dict(config, TXTRADER_POOL_SIZE=str(workers))) as api:
+        api.status()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: api.status(), range(calls)))
+        elapsed = time.perf_counter() - start
+    return {'workers': workers, 'calls': calls, 'calls_per_s': calls / elapsed}
+
+
+def bench_cli(config, args, runs):
+    env = dict(os.environ)
+    env.update(config)
+    samples = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        subprocess.run([sys.executable, '-m', 'txtrader_client'] + args, env=env, check=True, capture_output=True)
+        samples.append(time.perf_counter() - t)
+    return percentiles(samples)
+
+
+def run(sizes, scale=1.0, cli_runs=10):
+    results = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'client_version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'payload_sizes': sizes,
+        'methods': {},
+    }
+    with subprocess_server(**sizes) as config:
+        with API(config=config) as api:
+            for label, method, args, calls in CALLS:
+                results['methods'][label] = bench_method(api, method, args, max(1, int(calls * scale)))
+                print(f"{label:20} " + ' '.join(f'{k}={v:.6g}' for k, v in results['methods'][label].items()))
+        results['threaded'] = [bench_threaded(config, workers, max(1, int(1000 * scale))) for workers in (1, 4, 16)]
+        for result in results['threaded']:
+            print(f"threaded status      workers={result['workers']} calls_per_s={result['calls_per_s']:.1f}")
+        results['cli'] = {
+            'txtrader --version': bench_cli(config, ['--version'], cli_runs),
+            'txtrader status': bench_cli(config, ['status'], cli_runs),
+        }
+        for label, result in results['cli'].items():
+            print(f"{label:20} p50_ms={result['p50_ms']:.1f} max_ms={result['max_ms']:.1f}")
+    return results
+
+
+def _flatten(results):
+    ret = {}
+    for label, metrics in results.get('methods', {}).items():
+        ret.update({f'{label}.{k}': v for k, v in metrics.items() if k != 'calls'})
+    for metrics in results.get('threaded', []):
+        ret[f"threaded.{metrics['workers']}.calls_per_s"] = metrics['calls_per_s']
+    for label, metrics in results.get('cli', {}).items():
+        ret.update({f'{label}.{k}': v for k, v in metrics.items() if k != 'calls'})
+    return ret
+
+
+def compare(base_file, new_file):
+    with open(base_file) as f:
+        base = _flatten(json.load(f))
+    with open(new_file) as f:
+        new = _flatten(json.load(f))
+    for key in sorted(set(base) & set(new)):
+        change = (new[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+        print(f'{key:45} {base[key]:14.2f} {new[key]:14.2f} {change:+8.1f}%')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='txtrader client benchmark suite')
+    parser.add_argument('--output', default='bench_output.json', help='results JSON file')
+    parser.add_argument('--quick', action='store_true', help='smaller payloads and fewer calls')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'), help='compare two results files')
+    args = parser.parse_args()
+    if args.compare:
+        return compare(*args.compare)
+    if args.quick:
+        results = run(QUICK, scale=0.2, cli_runs=3)
+    else:
+        results = run(FULL)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    print(f'results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+"""
+  transport.py
+  ------------
+
+  Compare per-call latency of pooled keep-alive connections against
+  close-per-call connections using the local stand-in server.
+
+  usage: python -m benchmarks.transport [calls]
+
+"""
+
+import statistics
+import sys
+import time
+
+from txtrader_client import API
+from tests.server import MockServer
+
+
+def measure(config, calls):
+    latencies = []
+    with API(config=config) as api:
+        for _ in range(calls):
+            start = time.perf_counter()
+            api.query_symbol('TEST')
+            latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main(calls=2000):
+    with MockServer() as server:
+        server.txtrader.call('add_symbol', {'symbol': 'TEST'})
+        for label, keepalive in (('keepalive', 'true'), ('close', 'false')):
+            result = measure(dict(server.config, TXTRADER_KEEPALIVE=keepalive), calls)
+            print(f"{label:10} " + ' '.join(f'{k}={v:.3f}' for k, v in result.items()))
+
+
+if __name__ == '__main__':
+    main(*[int(a) for a in sys.argv[1:]])
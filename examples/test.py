@@ -21,13 +21,9 @@ def order_stock(api, account, route, symbol, shares):
     order = api.market_order(account, route, symbol, shares)
     order_id = order['permid']
 
-    # query the order status wait for it to be filled; printing the status of the order when it changes
-    last_text = None
-    while order['status'] != 'Filled':
-        order = api.query_order(order_id)
-        if order['text'] != last_text:
-            print(f"order_id {order_id} {order['text']}")
-            last_text = order['text']
+    # wait for the order to be filled (or cancelled or rejected), then print its final status
+    order = api.wait_for_fill(order_id, timeout=300)
+    print(f"order_id {order_id} {order['text']}")
 
 
 if __name__ == '__main__':
@@ -31,6 +31,10 @@ setup(
         "Environment :: Console",
     ],
     install_requires=['requests==2.24.0', 'click==7.1.2'],
+    extras_require={
+        'numpy': ['numpy'],
+        'orjson': ['orjson'],
+    },
     tests_require=['pybump', 'pytest', 'tox', 'twine', 'wheel', 'yapf'],
     entry_points={
         'console_scripts': [
@@ -0,0 +1,9 @@
+import pytest
+
+from .server import MockServer
+
+
+@pytest.fixture
+def server():
+    with MockServer() as s:
+        yield s
@@ -0,0 +1,494 @@
+"""
+  server.py
+  ---------
+
+  Local stand-in for the txtrader HTTP api, used by tests and benchmarks that
+  cannot depend on a live RTX/TWS backed server.
+
+"""
+
+import datetime
+import gzip
+import json
+import multiprocessing
+import socket
+import socketserver
+import threading
+import time
+import zlib
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockTxTrader():
+    """In-memory txtrader server state answering a subset of the json api"""
+
+    def __init__(self, account='DEMO.TEST.01', route='DEMO'):
+        self.lock = threading.Lock()
+        self.accounts = [account]
+        self.account = account
+        self.route = {route: {}}
+        self.symbols = {}
+        self.orders = {}
+        self.executions = {}
+        self.positions = {account: {}}
+        self.bars = {}
+        self.next_id = 1000
+        self.calls = {}
+        self.failing_symbols = set()
+
+    def call(self, name, args):
+        with self.lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+            handler = getattr(self, f'_{name}', None)
+            if not handler:
+                raise KeyError(name)
+            if args.get('symbol') in self.failing_symbols:
+                raise RuntimeError(f"{name} failed for {args['symbol']}")
+            return handler(**args)
+
+    def quote(self, symbol, price=100.0):
+        return {
+            'symbol': symbol,
+            'fullname': f'{symbol} TEST ISSUE',
+            'last': price,
+            'size': 100,
+            'volume': 1000000,
+            'bid': price - 0.01,
+            'bid_size': 200,
+            'ask': price + 0.01,
+            'ask_size': 300,
+            'open': price - 1.0,
+            'high': price + 2.0,
+            'low': price - 2.0,
+            'close': price - 0.5,
+            'vwap': price,
+        }
+
+    def populate(self, symbols=0, bars=0, orders=0, executions=0):
+        """Fill state with canned data sized like a production server"""
+        names = [f'S{i:04d}' for i in range(symbols)]
+        for i, symbol in enumerate(names):
+            self.symbols[symbol] = self.quote(symbol, 10.0 + i % 500)
+            self.positions[self.account][symbol] = (i % 7 - 3) * 100
+        day = datetime.datetime(2017, 1, 3, 9, 30)
+        rows = []
+        while len(rows) < bars:
+            for minute in range(390):
+                t = day + datetime.timedelta(minutes=minute)
+                price = 200.0 + (len(rows) % 1000) * 0.01
+                rows.append([
+                    t.strftime('%Y-%m-%d'),
+                    t.strftime('%H:%M:%S'), price, price + 0.05, price - 0.05, price + 0.01, 1000 + minute
+                ])
+            day += datetime.timedelta(days=1)
+        self.bars['SPY'] = rows[:bars]
+        for i in range(orders):
+            symbol = names[i % len(names)] if names else 'SPY'
+            self.next_id += 1
+            order_id = str(self.next_id)
+            status = ('Submitted', 'Filled', 'Cancelled', 'Error')[i % 4]
+            self.orders[order_id] = dict(
+                permid=order_id,
+                account=self.account,
+                route=list(self.route.keys())[0],
+                symbol=symbol,
+                quantity=100 * (i % 10 + 1),
+                filled=100 * (i % 10 + 1) if status == 'Filled' else 0,
+                remaining=0 if status == 'Filled' else 100 * (i % 10 + 1),
+                type='limit',
+                limit_price=10.0 + i % 500,
+                avgfillprice=10.0 + i % 500 if status == 'Filled' else 0.0,
+                status=status,
+                text=f'limit order {order_id} {status}',
+                updates=[{'time': '2017-01-03 09:30:00', 'status': status}],
+            )
+        for i in range(executions):
+            execution_id = f'X{i:08d}'
+            self.executions[execution_id] = {
+                'EXECUTION_ID': execution_id,
+                'ORIGINAL_ORDER_ID': str(1001 + i % max(orders, 1)),
+                'ACCOUNT': self.account,
+                'DISP_NAME': names[i % len(names)] if names else 'SPY',
+                'BUYORSELL': 'Buy' if i % 2 else 'Sell',
+                'VOLUME': 100,
+                'PRICE': 10.0 + i % 500,
+                'EXCHANGE': 'NSDQ',
+                'TRD_DATE': '20170103',
+                'TRD_TIME': '09:30:00',
+                'CURRENCY': 'USD',
+                'CURRENT_STATUS': 'COMPLETED',
+                'TYPE': 'ExchangeTradeOrder',
+                'ORDER_TAG': f'TAG{i:08d}',
+                'COMMISSION': 1.0,
+            }
+        return self
+
+    def _help(self):
+        return {'status': 'status() => "Up"', 'help': 'help() => {command: docstring, ...}'}
+
+    def _status(self):
+        return 'Up'
+
+    def _version(self):
+        return {'txtrader': '1.0.0', 'python': '3', 'flags': {}, 'revision': 'test'}
+
+    def _uptime(self):
+        return 'started 2020-01-01 00:00:00 (elapsed 0:00:01.000000)'
+
+    def _time(self):
+        return time.strftime('%Y-%m-%d %H:%M:%S')
+
+    def _shutdown(self, message):
+        return True
+
+    def _add_symbol(self, symbol):
+        self.symbols.setdefault(symbol, self.quote(symbol))
+        return self.symbols[symbol]
+
+    def _del_symbol(self, symbol):
+        return self.symbols.pop(symbol, None) is not None
+
+    def _query_symbols(self, data=False):
+        if data:
+            return dict(self.symbols)
+        return list(self.symbols.keys())
+
+    def _query_symbol(self, symbol):
+        return self.symbols.get(symbol)
+
+    def _query_symbol_data(self, symbol):
+        if symbol in self.symbols:
+            return {'SYMBOL': symbol, 'TRDPRC_1': self.symbols[symbol]['last']}
+        return None
+
+    def _query_symbol_bars(self, symbol):
+        return self.bars.get(symbol, [])
+
+    def _query_bars(self, symbol, period, start, end):
+        return [bar for bar in self.bars.get(symbol, []) if str(start) <= f'{bar[0]} {bar[1]}' <= str(end)]
+
+    def _query_accounts(self):
+        return list(self.accounts)
+
+    def _query_account(self, account, fields=None):
+        data = {'CASH_BALANCE': 1000000.0, 'EXCESS_EQ': 500000.0, 'NOTIONAL_AMOUNT': 0.0}
+        if fields:
+            data = {k: v for k, v in data.items() if k in fields.split(',')}
+        return data
+
+    def _set_account(self, account):
+        if account in self.accounts:
+            self.account = account
+            return True
+        return False
+
+    def _query_positions(self):
+        return {k: dict(v) for k, v in self.positions.items()}
+
+    def _query_orders(self):
+        return {k: dict(v) for k, v in self.orders.items()}
+
+    def _query_tickets(self):
+        return {k: dict(v) for k, v in self.orders.items() if v['status'] == 'Staged'}
+
+    def _query_order(self, id):
+        return dict(self.orders.get(id, {'permid': id, 'status': 'Error', 'text': 'unknown order'}))
+
+    def _cancel_order(self, id):
+        if id in self.orders and self.orders[id]['status'] not in ('Filled', 'Error'):
+            self.orders[id]['status'] = 'Cancelled'
+        return True
+
+    def _global_cancel(self):
+        for order_id in self.orders:
+            self._cancel_order(order_id)
+        return True
+
+    def _query_order_executions(self, id):
+        return {k: v for k, v in self.executions.items() if v['ORIGINAL_ORDER_ID'] == id}
+
+    def _query_execution(self, id):
+        return self.executions.get(id)
+
+    def _query_executions(self):
+        return dict(self.executions)
+
+    def _set_order_route(self, route):
+        self.route = json.loads(route) if type(route) == str else route
+        return True
+
+    def _get_order_route(self):
+        return self.route
+
+    def _order(self, account, route, symbol, quantity, type, status='Submitted', **fields):
+        self.next_id += 1
+        order_id = str(self.next_id)
+        order = dict(
+            permid=order_id,
+            account=account,
+            route=route,
+            symbol=symbol,
+            quantity=int(quantity),
+            type=type,
+            status=status,
+            text=f'{type} order {order_id} {status}'
+        )
+        order.update(fields)
+        if symbol not in self.symbols or not int(quantity):
+            order['status'] = 'Error'
+        self.orders[order_id] = order
+        return dict(order)
+
+    def _market_order(self, account, route, symbol, quantity):
+        return self._order(account, route, symbol, quantity, 'market')
+
+    def _stage_market_order(self, tag, account, route, symbol, quantity):
+        return self._order(account, route, symbol, quantity, 'market', status='Staged', tag=tag)
+
+    def _limit_order(self, account, route, symbol, limit_price, quantity):
+        return self._order(account, route, symbol, quantity, 'limit', limit_price=limit_price)
+
+    def _stop_order(self, account, route, symbol, stop_price, quantity):
+        return self._order(account, route, symbol, quantity, 'stop', stop_price=stop_price)
+
+    def _stoplimit_order(self, account, route, symbol, stop_price, limit_price, quantity):
+        return self._order(account, route, symbol, quantity, 'stoplimit', stop_price=stop_price, limit_price=limit_price)
+
+    def fill(self, order_id):
+        """simulate a complete fill of a working order"""
+        with self.lock:
+            order = self.orders[order_id]
+            order['status'] = 'Filled'
+            positions = self.positions.setdefault(order['account'], {})
+            positions[order['symbol']] = positions.get(order['symbol'], 0) + order['quantity']
+            execution_id = f'X{order_id}'
+            self.executions[execution_id] = {
+                'ORIGINAL_ORDER_ID': order_id,
+                'symbol': order['symbol'],
+                'quantity': order['quantity'],
+                'price': self.symbols[order['symbol']]['last'],
+            }
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._respond({})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+        self.server.bytes_in += len(body)
+        if self.headers.get('Content-Encoding') == 'gzip':
+            self.server.compressed_requests += 1
+            body = gzip.decompress(body)
+        self._respond(json.loads(body or b'{}'))
+
+    def _respond(self, args):
+        delay = self.server.delays.popleft() if self.server.delays else self.server.delay
+        if delay:
+            time.sleep(delay)
+        try:
+            status, body = 200, json.dumps(self.server.txtrader.call(self.path.strip('/'), args)).encode()
+        except KeyError:
+            status, body = 404, b'{"error": "not found"}'
+        except Exception as ex:
+            status, body = 500, json.dumps({'error': str(ex)}).encode()
+        if self.server.hangups:
+            self.server.hangups -= 1
+            self.close_connection = True
+            return
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        accept = self.headers.get('Accept-Encoding', '')
+        if self.server.compress and 'gzip' in accept:
+            body = gzip.compress(body, 6)
+            self.send_header('Content-Encoding', 'gzip')
+        elif self.server.compress and 'deflate' in accept:
+            body = zlib.compress(body, 6)
+            self.send_header('Content-Encoding', 'deflate')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if self.server.bandwidth:
+            time.sleep(len(body) / self.server.bandwidth)
+        self.server.bytes_out += len(body)
+        self.wfile.write(body)
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded keep-alive HTTP server wrapping a MockTxTrader; usable as a context manager"""
+
+    daemon_threads = True
+
+    def __init__(self, txtrader=None, delay=0, port=0, compress=False, bandwidth=0):
+        super().__init__(('127.0.0.1', port), MockHandler)
+        self.txtrader = txtrader or MockTxTrader()
+        self.delay = delay
+        # gzip or deflate responses when the client accepts them
+        self.compress = compress
+        # simulated link speed in bytes per second for response bodies; 0 for unlimited
+        self.bandwidth = bandwidth
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.compressed_requests = 0
+        # per request delays used before falling back to delay
+        self.delays = deque()
+        # count of coming requests carried out and then answered by closing the connection
+        self.hangups = 0
+        self.connections = 0
+        self._thread = None
+
+    def get_request(self):
+        ret = super().get_request()
+        self.connections += 1
+        return ret
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def config(self):
+        """Return API config dict addressing this server"""
+        return {
+            'TXTRADER_PROTOCOL': 'http',
+            'TXTRADER_HOST': '127.0.0.1',
+            'TXTRADER_HTTP_PORT': str(self.port),
+            'TXTRADER_API_ACCOUNT': self.txtrader.account,
+            'TXTRADER_ROUTE': list(self.txtrader.route.keys())[0],
+        }
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+class MockStreamHandler(socketserver.BaseRequestHandler):
+
+    def setup(self):
+        self.authorized = False
+        self.symbols = set()
+        self.lock = threading.Lock()
+        self.server.clients.append(self)
+
+    def finish(self):
+        self.server.clients.remove(self)
+
+    def send(self, line):
+        data = line.encode()
+        with self.lock:
+            self.request.sendall(b'%d:%s,' % (len(data), data))
+
+    def handle(self):
+        self.send('.connected txtrader test server')
+        buffer = b''
+        while True:
+            try:
+                data = self.request.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            buffer += data
+            while b',' in buffer:
+                length, _, rest = buffer.partition(b':')
+                size = int(length)
+                if len(rest) < size + 1:
+                    break
+                self.command(rest[:size].decode())
+                buffer = rest[size + 1:]
+
+    def command(self, line):
+        cmd, _, arg = line.partition(' ')
+        self.server.commands.append(line)
+        if cmd == 'auth':
+            self.authorized = True
+            self.send('.Authorized')
+        elif self.authorized and cmd == 'add':
+            self.symbols.add(arg)
+            self.send(f'.symbol: {arg} added')
+        elif self.authorized and cmd == 'del':
+            self.symbols.discard(arg)
+            self.send(f'.symbol: {arg} deleted')
+
+
+class MockStreamServer(socketserver.ThreadingTCPServer):
+    """Stand-in for the txtrader netstring TCP push channel; usable as a context manager"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port=0):
+        super().__init__(('127.0.0.1', port), MockStreamHandler)
+        self.clients = []
+        self.commands = []
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def config(self):
+        return {'TXTRADER_HOST': '127.0.0.1', 'TXTRADER_TCP_PORT': str(self.port)}
+
+    def publish(self, line, symbol=None):
+        """Send line to every authorized client, or only to clients subscribed to symbol"""
+        for client in list(self.clients):
+            if client.authorized and (symbol is None or symbol in client.symbols):
+                client.send(line)
+
+    def subscribed(self, symbol):
+        return any(symbol in client.symbols for client in list(self.clients))
+
+    def drop(self):
+        """Disconnect every client"""
+        for client in list(self.clients):
+            client.request.shutdown(socket.SHUT_RDWR)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.shutdown()
+        self.server_close()
+
+
+def _serve(queue, delay, populate):
+    server = MockServer(MockTxTrader().populate(**populate), delay=delay)
+    queue.put(server.config)
+    server.serve_forever()
+
+
+@contextmanager
+def subprocess_server(delay=0, **populate):
+    """Run a MockServer in a child process, yielding its API config; keeps benchmarks off the client's GIL
+
+    keyword arguments are passed to MockTxTrader.populate()
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(queue, delay, populate), daemon=True)
+    process.start()
+    try:
+        yield queue.get(timeout=10)
+    finally:
+        process.terminate()
+        process.join()
@@ -0,0 +1,81 @@
+import asyncio
+import inspect
+
+import pytest
+import requests
+
+from txtrader_client import API, AsyncAPI
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_async_surface_matches_api():
+    names = [
+        n for n, f in vars(API).items()
+        if not n.startswith('_') and callable(f) and '_call_txtrader_api' in inspect.getsource(f)
+    ]
+    assert len(names) > 30
+    for name in names:
+        assert asyncio.iscoroutinefunction(getattr(AsyncAPI, name)), name
+
+
+def test_async_calls(server):
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            assert await api.status() == 'Up'
+            assert await api.add_symbol('IBM')
+            assert await api.query_symbols() == ['IBM']
+            assert (await api.query_symbol('IBM'))['symbol'] == 'IBM'
+            assert await api.set_account(server.txtrader.account)
+            assert api.account == server.txtrader.account
+            order = await api.market_order(api.account, api.route, 'IBM', 100)
+            assert (await api.query_order(order['permid']))['status'] == 'Submitted'
+
+    _run(main())
+
+
+def test_async_concurrent_requests_share_pool(server):
+
+    async def main():
+        async with AsyncAPI(config=dict(server.config, TXTRADER_POOL_SIZE='8')) as api:
+            results = await asyncio.gather(*[api.query_accounts() for _ in range(200)])
+        assert all(r == [server.txtrader.account] for r in results)
+
+    _run(main())
+    assert server.connections <= 8
+
+
+def test_async_validation(server):
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            with pytest.raises(TypeError):
+                await api.query_bars(1, 1, '.', '.')
+            with pytest.raises(ValueError):
+                await api.query_bars('IBM', 'year', '.', '.')
+            with pytest.raises(TypeError):
+                await api.query_account('A', {'invalid': True})
+            with pytest.raises(requests.HTTPError):
+                await api._call_txtrader_api('no_such_function', {})
+
+    _run(main())
+
+
+def test_async_retries_only_read_only_calls(server):
+    server.txtrader.quote('IBM')
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            assert await api.status() == 'Up'
+            server.hangups = 1
+            assert await api.query_accounts() == [server.txtrader.account]
+            server.hangups = 1
+            with pytest.raises(ConnectionError):
+                await api.market_order(api.account, api.route, 'IBM', 100)
+
+    _run(main())
+    assert server.txtrader.calls['query_accounts'] == 2
+    assert server.txtrader.calls['market_order'] == 1
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client import bars
+
+ROWS = [
+    ['2017-07-06', '09:30:00', 242.11, 242.2, 242.0, 242.15, 1200],
+    ['2017-07-06', '09:31:00', 242.15, 242.3, 242.1, 242.25, 800],
+    'status: complete',
+]
+
+
+def test_columns_array_fallback():
+    b = bars.columns(ROWS, use_numpy=False)
+    assert isinstance(b, bars.Bars)
+    assert len(b) == 2
+    assert b.time.typecode == 'q'
+    assert b.time[0] == 1499333400
+    assert list(b.close) == [242.15, 242.25]
+    assert b[1] == (1499333460, 242.15, 242.3, 242.1, 242.25, 800)
+    assert b.rows() == ROWS[:2]
+
+
+def test_columns_numpy_required(monkeypatch):
+    monkeypatch.setattr(bars, '_numpy', lambda: None)
+    with pytest.raises(ImportError):
+        bars.columns([], use_numpy=True)
+    assert isinstance(bars.columns([]), bars.Bars)
+
+
+def test_columns_numpy():
+    numpy = pytest.importorskip('numpy')
+    b = bars.columns(ROWS)
+    assert b.dtype == bars.DTYPE
+    assert b['time'][0] == numpy.datetime64('2017-07-06T09:30:00')
+    assert b['time'][1].astype('int64') == 1499333460
+    assert b['volume'].sum() == 2000
+    assert len(bars.columns([])) == 0
+
+
+def test_query_bars_columnar(server):
+    server.txtrader.bars['SPY'] = ROWS[:2]
+    api = API(config=server.config)
+    assert api.query_bars('SPY', 1, '2017-07-06 09:30:00', '2017-07-06 09:40:00') == ROWS[:2]
+    b = api.query_bars('SPY', 1, '2017-07-06 09:30:00', '2017-07-06 09:40:00', columnar=True)
+    assert len(b) == 2
+    assert len(api.query_symbol_bars('SPY', columnar=True)) == 2
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            return await api.query_bars('SPY', 1, '2017-07-06 09:30:00', '2017-07-06 09:40:00', columnar=True)
+
+    assert len(asyncio.run(main())) == 2
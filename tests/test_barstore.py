@@ -0,0 +1,89 @@
+import os
+
+from txtrader_client import API
+from txtrader_client.barstore import BarStore
+
+
+def _bars(day, count):
+    return [[day, '09:%02d:00' % m, 100.0 + m, 101.0 + m, 99.0 + m, 100.5 + m, 1000 + m] for m in range(count)]
+
+
+def _api(server, path, **config):
+    return API(config=dict(server.config, TXTRADER_BAR_CACHE=str(path), **config))
+
+
+def test_incremental_fetch(server, tmp_path):
+    server.txtrader.bars['SPY'] = _bars('2017-07-06', 30) + _bars('2017-07-07', 30)
+    api = _api(server, tmp_path)
+    first = api.query_bars('SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:29:00')
+    assert first == _bars('2017-07-06', 30)
+    assert server.txtrader.calls['query_bars'] == 1
+
+    assert api.query_bars('SPY', 1, '2017-07-06 09:10:00', '2017-07-06 09:19:00') == _bars('2017-07-06', 30)[10:20]
+    assert server.txtrader.calls['query_bars'] == 1
+
+    both = api.query_bars('SPY', 1, '2017-07-06 09:00:00', '2017-07-07 09:29:00')
+    assert both == server.txtrader.bars['SPY']
+    assert server.txtrader.calls['query_bars'] == 2
+    assert api.bar_store.fetches == 2
+
+    fresh = _api(server, tmp_path)
+    assert fresh.query_bars('SPY', 1, '2017-07-06 09:00:00', '2017-07-07 09:29:00', columnar=True)['close'][-1] == 129.5
+    assert server.txtrader.calls['query_bars'] == 2
+
+
+def test_backfill_merges(server, tmp_path):
+    server.txtrader.bars['SPY'] = _bars('2017-07-06', 30)
+    api = _api(server, tmp_path)
+    api.query_bars('SPY', 1, '2017-07-06 09:20:00', '2017-07-06 09:29:00')
+    api.query_bars('SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:09:00')
+    assert api.query_bars('SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:29:00') == _bars('2017-07-06', 30)
+    assert server.txtrader.calls['query_bars'] == 3
+
+
+def test_relative_ranges_bypass_store(server, tmp_path):
+    api = _api(server, tmp_path)
+    api.query_bars('SPY', 1, '-5', '.')
+    api.query_bars('SPY', 1, '-5', '.')
+    assert server.txtrader.calls['query_bars'] == 2
+    assert not os.listdir(tmp_path)
+
+
+def test_uncovered_after_server_time(tmp_path):
+    calls = []
+
+    def fetch(symbol, period, start, end):
+        calls.append((start, end))
+        return _bars('2017-07-06', 10)
+
+    store = BarStore(str(tmp_path))
+    clock = lambda: '2017-07-06 09:09:30'
+    store.query(fetch, 'SPY', 1, '2017-07-06 09:00:00', '2017-07-06 16:00:00', clock)
+    store.query(fetch, 'SPY', 1, '2017-07-06 09:00:00', '2017-07-06 16:00:00', clock)
+    assert calls == [('2017-07-06 09:00:00', '2017-07-06 16:00:00'), ('2017-07-06 09:09:31', '2017-07-06 16:00:00')]
+
+
+def test_failed_fetch_is_not_covered(tmp_path):
+    answers = [[], ['error: no data available'], _bars('2017-07-06', 10)]
+    calls = []
+
+    def fetch(symbol, period, start, end):
+        calls.append((start, end))
+        return answers.pop(0)
+
+    store = BarStore(str(tmp_path))
+    assert store.query(fetch, 'SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:09:00') == []
+    assert store.query(fetch, 'SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:09:00') == ['error: no data available']
+    assert store.query(fetch, 'SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:09:00') == _bars('2017-07-06', 10)
+    assert store.query(fetch, 'SPY', 1, '2017-07-06 09:00:00', '2017-07-06 09:09:00') == _bars('2017-07-06', 10)
+    assert len(calls) == 3
+
+
+def test_eviction(tmp_path):
+    store = BarStore(str(tmp_path), max_bytes=500)
+    fetch = lambda symbol, period, start, end: _bars('2017-07-06', 10)
+    for symbol in ('A', 'B', 'C'):
+        store.query(fetch, symbol, 1, '2017-07-06 09:00:00', '2017-07-06 09:09:00')
+    assert [os.path.basename(s[2]) for s in store.series()] == ['C.1.bars']
+    store.clear()
+    assert not os.listdir(tmp_path)
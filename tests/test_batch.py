@@ -0,0 +1,65 @@
+import json
+
+from click.testing import CliRunner
+
+from txtrader_client.cli import cli
+
+BATCH = '''
+# symbols
+add_symbol IBM
+query_symbol IBM
+query_symbol BAD
+query_symbols
+bogus_command 1
+query_accounts
+buy 100 IBM
+buy 100 IBM --force
+'''
+
+
+def _batch(server, *args, input=BATCH):
+    server.txtrader.failing_symbols.add('BAD')
+    ret = CliRunner().invoke(cli, ['-v', 'batch'] + list(args), input=input, env=server.config)
+    return ret, [json.loads(line) for line in ret.output.splitlines()]
+
+
+def test_batch(server):
+    ret, records = _batch(server)
+    assert ret.exit_code == 1
+    assert [r['line'] for r in records] == [3, 4, 5, 6, 7, 8, 9, 10]
+    assert records[0]['result']['symbol'] == 'IBM'
+    assert records[1]['result']['symbol'] == 'IBM'
+    assert 'error' in records[2]
+    assert records[3]['result'] == ['IBM']
+    assert 'bogus_command' in records[4]['error']
+    assert records[5]['result'] == [server.txtrader.account]
+    assert records[6]['command'] == 'buy 100 IBM'
+    assert '--force' in records[6]['error']
+    assert records[7]['result']['symbol'] == 'IBM'
+    assert server.connections == 1
+
+
+def test_batch_parallel(server):
+    server.txtrader.populate(symbols=20)
+    lines = '\n'.join(f'query_symbol S{i:04d}' for i in range(20))
+    ret, records = _batch(server, '--parallel', '4', input=lines)
+    assert ret.exit_code == 0
+    assert [r['result']['symbol'] for r in records] == [f'S{i:04d}' for i in range(20)]
+    assert server.connections <= 4
+
+
+def test_batch_parallel_ordering(server):
+    ret, records = _batch(server, '-j', '8')
+    assert [r['line'] for r in records] == [3, 4, 5, 6, 7, 8, 9, 10]
+    assert records[1]['result']['symbol'] == 'IBM'
+
+
+def test_cli_ignores_typed_records(server):
+    server.txtrader.populate(symbols=3, orders=2)
+    env = dict(server.config, TXTRADER_RECORDS='typed')
+    ret = CliRunner().invoke(cli, ['-v', 'query_orders'], env=env)
+    assert ret.exit_code == 0, ret.output
+    assert json.loads(ret.output) == server.txtrader.orders
+    ret = CliRunner().invoke(cli, ['-v', 'batch'], input='query_orders\n', env=env)
+    assert ret.exit_code == 0, ret.output
+    assert json.loads(ret.output)['result'] == server.txtrader.orders
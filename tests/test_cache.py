@@ -0,0 +1,85 @@
+import time
+
+from txtrader_client import API
+from txtrader_client.cache import TTLCache
+
+
+def _api(server, **config):
+    return API(config=dict(server.config, TXTRADER_CACHE='true', **config))
+
+
+def test_cache_disabled_by_default(server):
+    api = API(config=server.config)
+    assert api.cache is None
+    api.help()
+    api.help()
+    assert server.txtrader.calls['help'] == 2
+
+
+def test_cached_methods(server):
+    api = _api(server)
+    for _ in range(3):
+        assert api.version()['txtrader']
+        assert api.query_accounts() == [server.txtrader.account]
+        api.get_order_route()
+        api.help()
+    for name in ('version', 'query_accounts', 'get_order_route', 'help'):
+        assert server.txtrader.calls[name] == 1
+    stats = api.cache.stats()
+    assert stats['hits'] == 8
+    assert stats['misses'] == 4
+    assert stats['methods']['version'] == {'hits': 2, 'misses': 1}
+
+
+def test_cached_results_are_copies(server):
+    api = _api(server)
+    api.query_accounts().append('MUTATED')
+    assert api.query_accounts() == [server.txtrader.account]
+
+
+def test_write_through_invalidation(server):
+    api = _api(server)
+    assert api.query_symbols() == []
+    api.add_symbol('IBM')
+    assert api.query_symbols() == ['IBM']
+    api.del_symbol('IBM')
+    assert api.query_symbols() == []
+    assert server.txtrader.calls['query_symbols'] == 3
+
+    api.set_order_route('{"NEW": {}}')
+    assert api.get_order_route() == {'NEW': {}}
+
+    api.query_accounts()
+    api.set_account(server.txtrader.account)
+    api.query_accounts()
+    assert server.txtrader.calls['query_accounts'] == 2
+
+
+def test_query_all_symbols_not_cached(server):
+    api = _api(server)
+    api.add_symbol('IBM')
+    api.query_all_symbols()
+    api.query_all_symbols()
+    assert server.txtrader.calls['query_symbols'] == 2
+
+
+def test_ttl_config(server):
+    api = _api(server, TXTRADER_CACHE_TTL='version=0.05,status=60')
+    assert api.cache_ttl['version'] == 0.05
+    api.version()
+    api.status()
+    api.status()
+    time.sleep(0.1)
+    api.version()
+    assert server.txtrader.calls['version'] == 2
+    assert server.txtrader.calls['status'] == 2
+
+
+def test_ttl_cache_bounded():
+    cache = TTLCache(maxsize=2)
+    for i in range(3):
+        cache.put(('query_symbols', i), i, 60)
+    assert cache.get(('query_symbols', 0)) == (False, None)
+    assert cache.get(('query_symbols', 2)) == (True, 2)
+    cache.invalidate('query_symbols')
+    assert cache.stats()['size'] == 0
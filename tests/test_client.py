@@ -113,20 +113,12 @@ def test_query_accounts():
 
 def _wait_for_fill(api, oid, return_on_error=False):
     print('waiting for fill...')
-    done = False
-    last_status = ''
-    while not done:
-        o = api.query_order(oid)
-        if last_status != o['status']:
-            last_status = o['status']
-            print('order status: %s' % o['status'])
-        if return_on_error and o['status'] == 'Error':
-            return
-        assert o['status'] != 'Error'
-        if o['status'] == 'Filled':
-            done = True
-        else:
-            time.sleep(1)
+    o = api.wait_for_fill(oid, timeout=300)
+    print('order status: %s' % o['status'])
+    if return_on_error and o['status'] == 'Error':
+        return
+    assert o['status'] != 'Error'
+    assert o['status'] == 'Filled'
 
 
 def _position(api, account):
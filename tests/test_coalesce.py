@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.coalesce import SingleFlight
+
+
+def test_coalesce_threads(server):
+    server.delay = 0.2
+    server.txtrader.symbols['IBM'] = server.txtrader.quote('IBM')
+    with API(config=dict(server.config, TXTRADER_COALESCE='true')) as api:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(api.query_symbol('IBM'))) for _ in range(8)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        assert len(results) == 8
+        assert all(r == results[0] for r in results)
+        # callers get their own copies
+        assert len(set(id(r) for r in results)) == 8
+        assert server.txtrader.calls['query_symbol'] == 1
+        assert api.coalesce.status() == {'requests': 1, 'coalesced': 7}
+        api.query_symbol('IBM')
+        assert server.txtrader.calls['query_symbol'] == 2
+
+
+def test_coalesce_shared_result_is_copied_for_every_caller():
+    flight = SingleFlight()
+    original = {'IBM': {'last': 1.0}}
+    started = threading.Event()
+    release = threading.Event()
+
+    def function():
+        started.set()
+        release.wait()
+        return original
+
+    results = {}
+    leader = threading.Thread(target=lambda: results.setdefault('leader', flight.do('k', function)))
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=lambda: results.setdefault('follower', flight.do('k', function)))
+    follower.start()
+    while not flight.coalesced:
+        release.wait(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+    # the leader's caller may change its result while the follower is still copying the shared one
+    assert results['leader'] == results['follower'] == original
+    assert results['leader'] is not original and results['follower'] is not original
+    assert flight.do('k', lambda: original) is original
+
+
+def test_coalesce_errors_and_writes(server):
+    server.delay = 0.2
+    server.txtrader.failing_symbols.add('BAD')
+    with API(config=dict(server.config, TXTRADER_COALESCE='true')) as api:
+        errors = []
+
+        def query():
+            try:
+                api.query_symbol('BAD')
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=query) for _ in range(4)]
+        threads += [threading.Thread(target=api.add_symbol, args=('IBM', )) for _ in range(2)]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        assert len(errors) == 4
+        assert server.txtrader.calls['query_symbol'] == 1
+        assert server.txtrader.calls['add_symbol'] == 2
+
+
+def test_coalesce_async(server):
+    server.delay = 0.2
+
+    async def run():
+        async with AsyncAPI(config=dict(server.config, TXTRADER_COALESCE='true')) as api:
+            ret = await asyncio.gather(*[api.query_accounts() for _ in range(5)], api.query_positions())
+            return ret, api.coalesce.status()
+
+    ret, status = asyncio.run(run())
+    assert ret[:5] == [[server.txtrader.account]] * 5
+    assert status == {'requests': 2, 'coalesced': 4}
+    assert server.txtrader.calls['query_accounts'] == 1
@@ -0,0 +1,72 @@
+import asyncio
+import zlib
+
+import pytest
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.transport import decompress, decompress_chunks
+
+from .server import MockServer
+
+TRANSPORTS = ['requests', 'http.client']
+
+
+@pytest.fixture
+def compressing():
+    with MockServer(compress=True) as s:
+        s.txtrader.populate(symbols=200, executions=500)
+        yield s
+
+
+def test_decompress():
+    content = b'{"a": 1}' * 100
+    assert decompress(content, None) == content
+    assert decompress(zlib.compress(content), 'deflate') == content
+    gzipped = zlib.compressobj(wbits=31)
+    gzipped = gzipped.compress(content) + gzipped.flush()
+    assert decompress(gzipped, 'gzip') == content
+    chunks = [gzipped[i:i + 7] for i in range(0, len(gzipped), 7)]
+    assert b''.join(decompress_chunks(iter(chunks), 'gzip')) == content
+    with pytest.raises(ValueError):
+        decompress(content, 'br')
+
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_compressed_responses(compressing, transport):
+    with API(config=dict(compressing.config, TXTRADER_TRANSPORT=transport)) as api:
+        symbols = api.query_all_symbols()
+        compressed = compressing.bytes_out
+        assert len(symbols) == 200
+        assert len(dict(api.iter_executions())) == 500
+    with API(config=dict(compressing.config, TXTRADER_TRANSPORT=transport, TXTRADER_COMPRESSION='false')) as api:
+        before = compressing.bytes_out
+        assert api.query_all_symbols() == symbols
+        assert compressing.bytes_out - before > compressed * 4
+
+
+@pytest.mark.parametrize('transport', TRANSPORTS)
+def test_compressed_requests(compressing, transport):
+    config = dict(compressing.config, TXTRADER_TRANSPORT=transport, TXTRADER_COMPRESS_REQUESTS='64')
+    with API(config=config) as api:
+        api.query_symbol('S0001')
+        assert compressing.compressed_requests == 0
+        route = {'ROUTE': {'parameter': 'x' * 200}}
+        api.set_order_route(route)
+        assert compressing.compressed_requests == 1
+        assert api.get_order_route() == route
+
+
+def test_compressed_async(compressing):
+
+    async def run():
+        config = dict(compressing.config, TXTRADER_COMPRESS_REQUESTS='64')
+        async with AsyncAPI(config=config) as api:
+            await api.set_order_route({'ROUTE': {'parameter': 'x' * 200}})
+            symbols = await api.query_all_symbols()
+            executions = [item async for item in api.iter_executions()]
+            return symbols, executions
+
+    symbols, executions = asyncio.run(run())
+    assert len(symbols) == 200
+    assert len(executions) == 500
+    assert compressing.compressed_requests == 1
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from txtrader_client import API
+from txtrader_client.decoder import get_decoder
+
+DOCUMENT = {'symbol': 'IBM', 'last': 123.45, 'volume': 1000000, 'text': 'café', 'bars': [[1, 2.5], [3, None]]}
+
+
+@pytest.mark.parametrize('name', ['auto', 'json', 'orjson', 'ujson'])
+def test_decoders(name):
+    if name not in ('auto', 'json'):
+        pytest.importorskip(name)
+    decode = get_decoder(name)
+    assert decode(json.dumps(DOCUMENT).encode()) == DOCUMENT
+    # python's json.dumps writes NaN and unbounded integers, which the fast decoders reject
+    ret = decode(json.dumps({'bid': float('nan'), 'big': 2**70}).encode())
+    assert ret['bid'] != ret['bid'] and ret['big'] == 2**70
+    with pytest.raises(ValueError):
+        decode(b'{"truncated": ')
+
+
+def test_unknown_decoder():
+    with pytest.raises(ValueError):
+        get_decoder('yaml')
+
+
+def test_api_decoder(server):
+    calls = []
+
+    def decode(content):
+        calls.append(len(content))
+        return json.loads(content)
+
+    api = API(config=dict(server.config, TXTRADER_JSON=decode))
+    assert api.status() == 'Up'
+    assert calls == [len(b'"Up"')]
+    assert API(config=dict(server.config, TXTRADER_JSON='json')).query_accounts() == [server.txtrader.account]
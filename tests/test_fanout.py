@@ -0,0 +1,46 @@
+import asyncio
+
+import requests
+
+from txtrader_client import API, AsyncAPI
+
+
+def _setup(server, symbols):
+    for symbol in symbols:
+        server.txtrader.call('add_symbol', {'symbol': symbol})
+    server.txtrader.failing_symbols.add('BAD')
+
+
+def test_query_symbol_many(server):
+    symbols = [f'S{i}' for i in range(50)]
+    _setup(server, symbols)
+    with API(config=server.config) as api:
+        ret = api.query_symbol_many(symbols + ['BAD', 'S0'], max_workers=8)
+    assert list(ret.keys()) == symbols + ['BAD']
+    for symbol in symbols:
+        assert ret[symbol]['symbol'] == symbol
+    assert isinstance(ret['BAD'], requests.HTTPError)
+
+
+def test_query_symbol_data_and_bars_many(server):
+    _setup(server, ['IBM', 'MSFT'])
+    with API(config=server.config) as api:
+        data = api.query_symbol_data_many(['IBM', 'MSFT'])
+        bars = api.query_symbol_bars_many(['IBM', 'BAD'])
+    assert data['MSFT']['SYMBOL'] == 'MSFT'
+    assert bars['IBM'] == []
+    assert isinstance(bars['BAD'], requests.HTTPError)
+    assert api.query_symbol_many([]) == {}
+
+
+def test_async_query_symbol_many(server):
+    symbols = [f'S{i}' for i in range(50)]
+    _setup(server, symbols)
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            return await api.query_symbol_many(symbols + ['BAD'], max_workers=8)
+
+    ret = asyncio.run(main())
+    assert ret['S49']['symbol'] == 'S49'
+    assert isinstance(ret['BAD'], requests.HTTPError)
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+import pytest
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.hedge import MIN_SAMPLES, Hedge
+
+
+def test_hedge_delay():
+    hedge = Hedge(percentile=90)
+    for i in range(MIN_SAMPLES - 1):
+        hedge.record('status', i / 1000)
+    assert hedge.delay('status') is None
+    for i in range(MIN_SAMPLES - 1, 100):
+        hedge.record('status', i / 1000)
+    assert hedge.delay('status') == 0.09
+    assert hedge.delay('query_symbol') is None
+    with pytest.raises(ValueError):
+        Hedge(percentile=100)
+
+
+def _warm(api):
+    for _ in range(MIN_SAMPLES):
+        api.query_accounts()
+
+
+def test_hedged_read(server):
+    with API(config=dict(server.config, TXTRADER_HEDGE='true')) as api:
+        _warm(api)
+        server.delays.append(1.0)
+        start = time.monotonic()
+        assert api.query_accounts() == [server.txtrader.account]
+        assert time.monotonic() - start < 0.5
+        assert api.hedge.hedged == 1
+        assert api.hedge.wins == 1
+
+
+def test_orders_not_hedged(server):
+    server.txtrader.symbols['IBM'] = server.txtrader.quote('IBM')
+    with API(config=dict(server.config, TXTRADER_HEDGE='true')) as api:
+        _warm(api)
+        server.delays.append(0.3)
+        start = time.monotonic()
+        api.market_order(api.account, api.route, 'IBM', 100)
+        assert time.monotonic() - start >= 0.3
+        assert api.hedge.hedged == 0
+        assert len(server.txtrader.orders) == 1
+
+
+def test_hedged_read_async(server):
+
+    async def run():
+        async with AsyncAPI(config=dict(server.config, TXTRADER_HEDGE='true')) as api:
+            for _ in range(MIN_SAMPLES):
+                await api.query_accounts()
+            server.delays.append(1.0)
+            start = time.monotonic()
+            ret = await api.query_accounts()
+            return ret, time.monotonic() - start, api.hedge.wins
+
+    ret, elapsed, wins = asyncio.run(run())
+    assert ret == [server.txtrader.account]
+    assert elapsed < 0.5
+    assert wins == 1
@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.decoder import ItemParser
+
+DOCUMENT = {'a': {'x': [1, 2, {'y': 'é'}]}, 'b': 12345, 'c': 'text , } "quoted"', 'd': None, 'e': -1.5e10, 'f': {}}
+
+
+@pytest.mark.parametrize('size', [1, 3, 7, 4096])
+def test_item_parser(size):
+    for indent in (None, 2):
+        content = json.dumps(DOCUMENT, indent=indent, ensure_ascii=False).encode()
+        parser = ItemParser()
+        items = []
+        for i in range(0, len(content), size):
+            items.extend(parser.feed(content[i:i + size]))
+        items.extend(parser.feed(b'', final=True))
+        assert items == list(DOCUMENT.items())
+
+
+@pytest.mark.parametrize('size', [1, 2, 4, 8])
+def test_item_parser_whitespace(size):
+    # chunk boundaries fall on the whitespace between a value and the following , or }
+    content = b'{"a": 1 , "b": 2\r\n, "s": "s" \t}'
+    parser = ItemParser()
+    items = []
+    for i in range(0, len(content), size):
+        items.extend(parser.feed(content[i:i + size]))
+    items.extend(parser.feed(b'', final=True))
+    assert items == [('a', 1), ('b', 2), ('s', 's')]
+
+
+@pytest.mark.parametrize('content', [b'[1]', b'{"a": 1', b'{"a" 1}', b'{"a": 1 "b": 2}', b'{"a": 1,}', b'{"a": 1}x'])
+def test_item_parser_errors(content):
+    with pytest.raises(ValueError):
+        ItemParser().feed(content, final=True)
+
+
+@pytest.mark.parametrize('transport', ['requests', 'http.client'])
+def test_iterators(server, transport):
+    server.txtrader.populate(symbols=20, orders=50, executions=200)
+    with API(config=dict(server.config, TXTRADER_TRANSPORT=transport)) as api:
+        assert list(api.iter_executions()) == list(api.query_executions().items())
+        assert dict(api.iter_orders()) == api.query_orders()
+        assert dict(api.iter_symbols()) == api.query_all_symbols()
+        # abandoning an iterator part way discards its connection; the api keeps working
+        items = api.iter_executions()
+        next(items)
+        items.close()
+        assert api.status() == 'Up'
+        server.txtrader.failing_symbols.add(None)
+        with pytest.raises(requests.HTTPError):
+            list(api.iter_orders())
+
+
+def test_async_iterators(server):
+    server.txtrader.populate(symbols=20, orders=50, executions=200)
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            assert [item async for item in api.iter_executions()] == list((await api.query_executions()).items())
+            assert {k: v async for k, v in api.iter_symbols()} == await api.query_all_symbols()
+            items = api.iter_orders()
+            await items.__anext__()
+            await items.aclose()
+            assert await api.status() == 'Up'
+
+    asyncio.run(main())
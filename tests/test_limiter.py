@@ -0,0 +1,132 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.limiter import Limiter
+
+
+def test_limiter_aimd():
+    limiter = Limiter(minimum=2, maximum=8, reserved=1)
+    limiter.limit = 4.0
+    for _ in range(4):
+        limiter.acquire()
+        limiter.release(0.01)
+    assert 4.9 < limiter.limit < 5.0
+    limiter.acquire()
+    limiter.release(0.1)
+    assert 4.4 < limiter.limit < 4.5
+    # a burst of failures within one baseline latency backs off once
+    limiter.baseline = 1.0
+    limiter._decreased = 0.0
+    for _ in range(3):
+        limiter.acquire()
+        limiter.release(0.01, dropped=True)
+    assert 3.9 < limiter.limit < 4.0
+    for _ in range(50):
+        limiter._decreased = 0.0
+        limiter.acquire()
+        limiter.release(0.01, dropped=True)
+    assert limiter.limit == 2.0
+    assert limiter.status()['in_flight'] == 0
+
+
+def test_limiter_reserved():
+    limiter = Limiter(minimum=2, maximum=3, reserved=1)
+    limiter.acquire()
+    limiter.acquire()
+    blocked = threading.Thread(target=limiter.acquire)
+    blocked.start()
+    blocked.join(0.1)
+    assert blocked.is_alive()
+    limiter.acquire(priority=True)
+    assert limiter.in_flight == 3
+    limiter.release(0.01)
+    limiter.release(0.01)
+    blocked.join(1)
+    assert not blocked.is_alive()
+    assert limiter.in_flight == 2
+
+
+def test_limiter_reservation_survives_backoff():
+    with pytest.raises(ValueError):
+        Limiter(minimum=1, maximum=3, reserved=1)
+    limiter = Limiter(minimum=2, maximum=4, reserved=1)
+    limiter.limit = 2.0
+    limiter.acquire()
+    # the only query slot is taken; an order still gets the reserved one
+    assert not limiter._available(False)
+    limiter.acquire(priority=True)
+    assert limiter.in_flight == 2
+
+
+def test_limiter_caps_in_flight(server):
+    server.delay = 0.05
+    config = dict(server.config, TXTRADER_LIMITER='true', TXTRADER_LIMITER_MAX='3', TXTRADER_POOL_SIZE='10')
+    peak = []
+    with API(config=config) as api, API(config=config) as other:
+        assert api.limiter is other.limiter
+        hook = lambda record: peak.append(api.limiter.in_flight)
+        api.call_hook = other.call_hook = hook
+        threads = [threading.Thread(target=a.query_accounts) for a in (api, other) * 6]
+        [t.start() for t in threads]
+        [t.join() for t in threads]
+        assert api.limiter.in_flight == 0
+    assert len(peak) == 12
+    assert max(peak) <= 2
+
+
+def test_limiter_backs_off_on_errors(server):
+    server.txtrader.failing_symbols.add('BAD')
+    with API(config=dict(server.config, TXTRADER_LIMITER='true', TXTRADER_LIMITER_MIN='2')) as api:
+        for _ in range(20):
+            api.limiter._decreased = 0.0
+            try:
+                api.query_symbol('BAD')
+            except Exception:
+                pass
+        assert api.limiter.limit == 2.0
+
+
+def test_limiter_counts_streamed_calls(server):
+    server.txtrader.populate(symbols=5, orders=20)
+    config = dict(server.config, TXTRADER_LIMITER='true')
+
+    async def run(api):
+        items = api.iter_orders()
+        await items.__anext__()
+        in_flight = api.limiter.in_flight
+        await items.aclose()
+        return in_flight
+
+    with API(config=config) as api:
+        items = api.iter_orders()
+        next(items)
+        assert api.limiter.in_flight == 1
+        items.close()
+        assert api.limiter.in_flight == 0
+        assert list(api.iter_orders()) and api.limiter.in_flight == 0
+
+    async def main():
+        async with AsyncAPI(config=config) as api:
+            return await run(api), api.limiter.in_flight
+
+    assert asyncio.run(main()) == (1, 0)
+
+
+def test_limiter_async(server):
+    server.delay = 0.05
+    config = dict(server.config, TXTRADER_LIMITER='true', TXTRADER_LIMITER_MAX='2')
+
+    async def run():
+        async with AsyncAPI(config=config) as api:
+            start = time.monotonic()
+            results = await asyncio.gather(*[api.query_accounts() for _ in range(4)])
+            return results, time.monotonic() - start
+
+    results, elapsed = asyncio.run(run())
+    assert results == [[server.txtrader.account]] * 4
+    # one query slot (2 minus 1 reserved) serializes the calls
+    assert elapsed >= 0.2
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+import requests
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.metrics import BUCKETS, CallRecord, Metrics
+
+
+def test_metrics_disabled_by_default(server):
+    api = API(config=server.config)
+    api.status()
+    assert api.metrics is None
+    assert api.snapshot() == {}
+
+
+def test_metrics_snapshot(server):
+    server.txtrader.call('add_symbol', {'symbol': 'IBM'})
+    api = API(config=dict(server.config, TXTRADER_METRICS='true'))
+    for _ in range(3):
+        api.query_symbol('IBM')
+    api.status()
+    with pytest.raises(requests.HTTPError):
+        api._call_txtrader_api('no_such_function', {})
+    snapshot = api.snapshot()
+    q = snapshot['query_symbol']
+    assert q['calls'] == 3
+    assert q['errors'] == 0
+    assert q['status'] == {200: 3}
+    assert q['request_bytes'] == 3 * len(b'{"symbol": "IBM"}')
+    assert q['response_bytes'] > 3 * 100
+    assert sum(q['histogram']) == 3
+    assert 0 < q['latency_p50'] <= q['latency_max']
+    assert snapshot['status']['calls'] == 1
+    assert snapshot['no_such_function']['errors'] == 1
+    assert snapshot['no_such_function']['status'] == {404: 1}
+
+
+def test_call_hook(server):
+    records = []
+    api = API(config=server.config)
+    api.call_hook = records.append
+    api.status()
+    api.query_accounts()
+    assert [r.function for r in records] == ['status', 'query_accounts']
+    assert records[0].method == 'GET'
+    assert records[0].status == 200
+    assert records[0].error is None
+    assert records[0].response_bytes == len(b'"Up"')
+    assert api.snapshot() == {}
+
+
+def test_call_hook_connection_error():
+    records = []
+    api = API(config={'TXTRADER_HOST': '127.0.0.1', 'TXTRADER_HTTP_PORT': '1'})
+    api.call_hook = records.append
+    with pytest.raises(requests.ConnectionError):
+        api.status()
+    assert records[0].status is None
+    assert records[0].error == 'ConnectionError'
+
+
+def test_async_metrics(server):
+
+    async def main():
+        async with AsyncAPI(config=dict(server.config, TXTRADER_METRICS='true')) as api:
+            await asyncio.gather(*[api.status() for _ in range(5)])
+            return api.snapshot()
+
+    assert asyncio.run(main())['status']['calls'] == 5
+
+
+def test_histogram_buckets():
+    m = Metrics()
+    for latency in (0.0005, 0.003, 0.2, 20.0):
+        m.record(CallRecord('f', 'GET', 200, latency, 0, 0, None))
+    s = m.snapshot()['f']
+    assert s['histogram'][0] == 1
+    assert s['histogram'][-1] == 1
+    assert len(s['histogram']) == len(BUCKETS) + 1
+    assert s['latency_p50'] == 0.005
+    assert s['latency_p99'] == 20.0
@@ -0,0 +1,119 @@
+import collections
+
+import pytest
+
+from txtrader_client import MultiAPI
+from txtrader_client.multi import _hash
+
+from .server import MockServer
+
+SYMBOLS = [f'S{i:04d}' for i in range(60)]
+
+
+@pytest.fixture
+def servers():
+    with MockServer() as a, MockServer() as b, MockServer() as c:
+        yield [a, b, c]
+
+
+def _multi(servers, **overrides):
+    config = dict(servers[0].config, TXTRADER_HEALTH_INTERVAL='0')
+    config.update(overrides)
+    return MultiAPI([f'127.0.0.1:{s.port}' for s in servers], config=config)
+
+
+def _server(servers, name):
+    return next(s for s in servers if name.endswith(f':{s.port}'))
+
+
+def test_multi_routing(servers):
+    with _multi(servers) as api:
+        for symbol in SYMBOLS:
+            api.add_symbol(symbol)
+        owners = collections.Counter(api.owner(symbol) for symbol in SYMBOLS)
+        assert len(owners) == 3
+        assert min(owners.values()) > 5
+        for symbol in SYMBOLS[:5]:
+            server = _server(servers, api.owner(symbol))
+            assert symbol in server.txtrader.symbols
+            assert api.query_symbol(symbol)['symbol'] == symbol
+        assert sorted(api.query_symbols()) == SYMBOLS
+        assert sorted(api.query_all_symbols()) == SYMBOLS
+        assert sorted(k for k, v in api.iter_symbols()) == SYMBOLS
+        many = api.query_symbol_many(SYMBOLS[:10])
+        assert [v['symbol'] for v in many.values()] == SYMBOLS[:10]
+        # everything else goes to the primary
+        assert api.query_accounts() == [servers[0].txtrader.account]
+        assert api.primary() is api.apis[f'127.0.0.1:{servers[0].port}']
+
+
+def test_multi_consistent_hash(servers):
+    with _multi(servers) as three, _multi(servers[:2]) as two:
+        moved = [s for s in SYMBOLS if three.owner(s) != two.owner(s)]
+        assert all(three.owner(s) == f'127.0.0.1:{servers[2].port}' for s in moved)
+        assert _hash('IBM') == _hash('IBM')
+
+
+def test_multi_failover(servers):
+    # without keep-alive so calls to the stopped server cannot reuse a connection its handler thread still serves
+    with _multi(servers, TXTRADER_KEEPALIVE='false') as api:
+        for symbol in SYMBOLS:
+            api.add_symbol(symbol)
+        down = servers[1]
+        name = f'127.0.0.1:{down.port}'
+        lost = [s for s in SYMBOLS if api.owner(s) == name]
+        down.stop()
+        # a connection failure checks the server at once and retries on the new owner
+        assert api.query_symbol(lost[0])['symbol'] == lost[0]
+        assert api.healthy[name] is False
+        for symbol in lost:
+            assert api.owner(symbol) != name
+            assert symbol in _server(servers, api.owner(symbol)).txtrader.symbols
+        assert sorted(api.query_symbols()) == SYMBOLS
+        assert api.check_all() == {s: s != name for s in api.servers}
+
+
+def test_multi_recovery_moves_symbols_back(servers):
+    with _multi(servers) as api:
+        for symbol in SYMBOLS:
+            api.add_symbol(symbol)
+        name = f'127.0.0.1:{servers[1].port}'
+        owned = [s for s in SYMBOLS if api.owner(s) == name]
+        api._set_health(name, False)
+        interim = {symbol: api.owner(symbol) for symbol in owned}
+        assert all(symbol in _server(servers, interim[symbol]).txtrader.symbols for symbol in owned)
+        api._set_health(name, True)
+        for symbol in owned:
+            assert api.owner(symbol) == name
+            assert symbol in servers[1].txtrader.symbols
+            assert symbol not in _server(servers, interim[symbol]).txtrader.symbols
+        # each symbol is subscribed on its owner only
+        assert sum(len(s.txtrader.symbols) for s in servers) == len(SYMBOLS)
+
+
+def test_multi_orders_on_other_shards(servers):
+    with _multi(servers) as api:
+        primary = f'127.0.0.1:{servers[0].port}'
+        symbols = [s for s in SYMBOLS if api.owner(s) != primary][:3]
+        api.add_symbol(symbols[0])
+        order = api.market_order(api.account, api.route, symbols[0], 100)
+        assert order['status'] == 'Submitted'
+        assert symbols[0] in servers[0].txtrader.symbols
+        api.limit_order(api.account, api.route, symbol=symbols[1], limit_price=10.0, quantity=100)
+        assert symbols[1] in servers[0].txtrader.symbols
+        results = api.submit_orders([{'symbol': symbols[2].lower(), 'quantity': 100}])
+        assert not isinstance(results[0], Exception)
+        assert results[0]['status'] == 'Submitted'
+        assert api.query_order(order['permid'])['status'] == 'Submitted'
+        # the primary subscription is made once per symbol
+        calls = servers[0].txtrader.calls['add_symbol']
+        api.market_order(api.account, api.route, symbols[0], 100)
+        assert servers[0].txtrader.calls['add_symbol'] == calls
+
+
+def test_multi_health_thread(servers):
+    servers[0].stop()
+    with _multi(servers, TXTRADER_HEALTH_INTERVAL='0.05', TXTRADER_KEEPALIVE='false') as api:
+        api._stop.wait(0.3)
+        assert api.healthy == {s: s != f'127.0.0.1:{servers[0].port}' for s in api.servers}
+        assert api.primary() is api.apis[f'127.0.0.1:{servers[1].port}']
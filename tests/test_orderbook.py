@@ -0,0 +1,64 @@
+import pytest
+
+from txtrader_client import API, OrderBook
+
+
+def test_orderbook_changes(server):
+    server.txtrader.call('add_symbol', {'symbol': 'IBM'})
+    server.txtrader.call('add_symbol', {'symbol': 'MSFT'})
+    api = API(config=server.config)
+    book = OrderBook(api)
+    assert book.refresh() == []
+    assert book.version == 0
+
+    a = api.market_order(api.account, api.route, 'IBM', 10)['permid']
+    b = api.limit_order(api.account, api.route, 'MSFT', 10.0, 20)['permid']
+    changes = book.refresh()
+    assert [(c.kind, c.permid) for c in changes] == [('new', a), ('new', b)]
+    assert book.version == 1
+    assert set(book.with_status('Submitted')) == {a, b}
+    assert list(book.for_symbol('IBM')) == [a]
+
+    assert book.refresh() == []
+    assert book.version == 1
+
+    server.txtrader.fill(a)
+    api.cancel_order(b)
+    changes = book.refresh()
+    assert [(c.kind, c.permid, c.version) for c in changes] == [('filled', a, 2), ('cancelled', b, 2)]
+    assert changes[0].previous['status'] == 'Submitted'
+    assert list(book.with_status('Filled')) == [a]
+    assert book.with_status('Submitted') == {}
+
+    assert [c.kind for c in book.changes_since(0)] == ['new', 'new', 'filled', 'cancelled']
+    assert [c.kind for c in book.changes_since(1)] == ['filled', 'cancelled']
+    assert book.changes_since(2) == []
+
+
+def test_orderbook_removed_and_updated():
+    book = OrderBook(api=None)
+    book.apply({'1': {'permid': '1', 'status': 'Submitted', 'symbol': 'IBM', 'filled': 0}})
+    changes = book.apply({'1': {'permid': '1', 'status': 'Submitted', 'symbol': 'IBM', 'filled': 5}})
+    assert changes[0].kind == 'updated'
+    changes = book.apply({})
+    assert (changes[0].kind, changes[0].permid, changes[0].order) == ('removed', '1', None)
+    assert book.by_symbol == {}
+    assert book.by_status == {}
+
+
+def test_orderbook_history_bounded():
+    book = OrderBook(api=None, history=2)
+    for i in range(3):
+        book.apply({str(n): {'status': 'Submitted'} for n in range(i + 1)})
+    assert [c.permid for c in book.changes_since(2)] == ['2']
+    with pytest.raises(ValueError):
+        book.changes_since(0)
+
+
+def test_orderbook_tickets(server):
+    server.txtrader.call('add_symbol', {'symbol': 'IBM'})
+    api = API(config=server.config)
+    staged = api.stage_market_order('TAG', api.account, api.route, 'IBM', 10)['permid']
+    book = OrderBook(api, tickets=True)
+    book.refresh()
+    assert list(book.with_status('Staged')) == [staged]
@@ -0,0 +1,65 @@
+import pytest
+
+from txtrader_client import API
+from txtrader_client.portfolio import Portfolio
+
+POSITIONS = {
+    'A1': {'IBM': 100, 'MSFT': -50, 'FLAT': 0},
+    'A2': {'IBM': {'quantity': -10}, 'NOQUOTE': 5},
+}
+
+QUOTES = {
+    'IBM': {'last': 10.0, 'close': 9.0, 'bid': 9.9, 'ask': 10.1},
+    'MSFT': {'last': 20.0, 'close': 21.0, 'bid': 19.9, 'ask': 20.1},
+}
+
+
+def _check(p):
+    a1, a2 = p.by_account()['A1'], p.by_account()['A2']
+    assert a1['market_value'] == pytest.approx(0.0)
+    assert a1['long'] == pytest.approx(1000.0)
+    assert a1['short'] == pytest.approx(-1000.0)
+    assert a1['gross'] == pytest.approx(2000.0)
+    assert a1['pnl'] == pytest.approx(100.0 + 50.0)
+    assert a1['liquidation_value'] == pytest.approx(990.0 - 1005.0)
+    assert a2['market_value'] == pytest.approx(-100.0)
+    assert p.summary()['market_value'] == pytest.approx(-100.0)
+    assert p.missing == ['NOQUOTE']
+    assert p.positions()['A1']['IBM']['market_value'] == pytest.approx(1000.0)
+    assert 'FLAT' not in p.positions()['A1']
+
+
+@pytest.mark.parametrize('use_numpy', [False, True])
+def test_portfolio(use_numpy):
+    if use_numpy:
+        pytest.importorskip('numpy')
+    p = Portfolio(POSITIONS, QUOTES, use_numpy=use_numpy)
+    assert bool(p.numpy) == use_numpy
+    _check(p)
+    assert p.update_quotes({'IBM': {'last': 11.0, 'close': 9.0}, 'OTHER': {'last': 1.0}}) == 2
+    a1, a2 = p.by_account()['A1'], p.by_account()['A2']
+    assert a1['market_value'] == pytest.approx(100.0)
+    assert a1['pnl'] == pytest.approx(200.0 + 50.0)
+    assert a2['market_value'] == pytest.approx(-110.0)
+    # the incremental totals match a full revaluation
+    incremental = p.by_account()
+    p.refresh()
+    for account, totals in p.by_account().items():
+        assert totals == pytest.approx(incremental[account])
+    assert p.update_quotes({'OTHER': {'last': 1.0}}) == 0
+    # a partial quote, such as a Stream quote update, keeps the fields it does not carry
+    assert p.update_quotes({'IBM': {'symbol': 'IBM', 'bid': 10.9, 'ask': 11.1}}) == 2
+    ibm = p.positions()['A1']['IBM']
+    assert ibm['market_value'] == pytest.approx(1100.0)
+    assert ibm['pnl'] == pytest.approx(200.0)
+    assert ibm['liquidation_value'] == pytest.approx(1090.0)
+
+
+def test_portfolio_from_api(server):
+    server.txtrader.populate(symbols=50)
+    with API(config=dict(server.config, TXTRADER_RECORDS='typed')) as api:
+        p = Portfolio.from_api(api)
+    positions = server.txtrader.positions[server.txtrader.account]
+    expected = sum(q * server.txtrader.symbols[s]['last'] for s, q in positions.items())
+    assert p.summary()['market_value'] == pytest.approx(expected)
+    assert p.missing == []
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from txtrader_client import API, AsyncAPI, OrderBook
+from txtrader_client.records import Execution, Order, Position, Quote, positions
+
+
+def test_record_fields():
+    data = {'permid': '1001', 'status': 'Filled', 'symbol': 'IBM', 'quantity': 100, 'broker_note': 'x'}
+    order = Order.from_dict(data)
+    assert (order.permid, order.status, order.quantity, order.stop_price) == ('1001', 'Filled', 100, None)
+    assert order.extra == {'broker_note': 'x'}
+    assert order['status'] == 'Filled' and order.get('broker_note') == 'x' and order.get('stop_price', 0) == 0
+    with pytest.raises(KeyError):
+        order['stop_price']
+    assert order.to_dict() == data
+    assert Order.from_dict(data) == order
+    assert Order.from_dict(None) is None
+    with pytest.raises(AttributeError):
+        order.unknown = 1
+    execution = Execution.from_dict({'EXECUTION_ID': 'X1', 'PRICE': 10.5, 'DISP_NAME': 'IBM'})
+    assert (execution.execution_id, execution.price, execution.symbol) == ('X1', 10.5, 'IBM')
+
+
+def test_positions():
+    ret = positions({'ACCT': {'IBM': 100, 'MSFT': {'quantity': -50, 'cost': 12.5}}})
+    assert ret['ACCT']['IBM'] == Position(account='ACCT', symbol='IBM', quantity=100)
+    assert ret['ACCT']['MSFT'].quantity == -50 and ret['ACCT']['MSFT'].extra == {'cost': 12.5}
+
+
+def test_typed_api(server):
+    server.txtrader.populate(symbols=5, orders=8, executions=10)
+    api = API(config=dict(server.config, TXTRADER_RECORDS='typed'))
+    orders = api.query_orders()
+    assert all(type(o) == Order for o in orders.values())
+    assert api.query_order('1001') == orders['1001']
+    assert dict(api.iter_orders()) == orders
+    assert type(api.query_execution('X00000001')) == Execution
+    assert all(type(e) == Execution for _, e in api.iter_executions())
+    assert type(api.query_symbol('S0001')) == Quote
+    assert all(type(q) == Quote for q in api.query_all_symbols().values())
+    assert api.query_positions()[api.account]['S0004'].quantity == 100
+    order = api.market_order(api.account, api.route, 'S0001', 100)
+    assert type(order) == Order and order.status == 'Submitted'
+    book = OrderBook(api)
+    book.refresh()
+    assert set(book.with_status('Filled')) == {p for p, o in orders.items() if o.status == 'Filled'}
+    assert type(API(config=server.config).query_order('1001')) == dict
+
+
+def test_typed_async(server):
+    server.txtrader.populate(symbols=5, orders=8)
+
+    async def main():
+        async with AsyncAPI(config=dict(server.config, TXTRADER_RECORDS='typed')) as api:
+            assert type(await api.query_order('1001')) == Order
+            assert all(type(o) == Order for o in (await api.query_orders()).values())
+            assert [type(o) async for _, o in api.iter_orders()] == [Order] * 8
+
+    asyncio.run(main())
+
+
+def test_unknown_records_mode(server):
+    with pytest.raises(ValueError):
+        API(config=dict(server.config, TXTRADER_RECORDS='tuples'))
@@ -0,0 +1,121 @@
+import threading
+import time
+
+from txtrader_client.stream import Stream, Update, decode
+from .server import MockStreamServer
+
+
+def _wait(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, 'timeout'
+        time.sleep(0.01)
+
+
+def test_decode():
+    assert decode('quote.IBM:120.5 100 120.6 200') == Update(
+        'quote', 'IBM', {
+            'symbol': 'IBM',
+            'bid': 120.5,
+            'bid_size': 100,
+            'ask': 120.6,
+            'ask_size': 200
+        }
+    )
+    assert decode('trade.IBM:120.55 300 1000000').data['last'] == 120.55
+    assert decode('bar.IBM:2020-07-20 09:30:00 1 2 0.5 1.5 1000').data['close'] == 1.5
+    assert decode('order.1001 {"permid": "1001", "status": "Filled"}') == Update(
+        'order', '1001', {
+            'permid': '1001',
+            'status': 'Filled'
+        }
+    )
+    assert decode('execution.X1 {"ORIGINAL_ORDER_ID": "1001"}').key == 'X1'
+    assert decode('time: 2020-07-20 09:30:00') == Update('time', None, '2020-07-20 09:30:00')
+    assert decode('.Authorized') == Update('status', None, 'Authorized')
+    assert decode('quote.IBM:garbage') == Update('message', None, 'quote.IBM:garbage')
+    assert decode('quote.IBM:n/a 100 10.1 200') == Update('message', None, 'quote.IBM:n/a 100 10.1 200')
+
+
+def test_stream_callbacks_and_iterator():
+    with MockStreamServer() as server:
+        stream = Stream(config=server.config, symbols=['ibm'])
+        quotes = []
+        stream.on('quote', quotes.append)
+        received = []
+        updates = iter(stream)
+        reader = threading.Thread(target=lambda: received.extend(u for u in updates if u.kind != 'status'))
+        reader.start()
+        with stream:
+            _wait(lambda: server.subscribed('IBM'))
+            stream.subscribe('msft')
+            _wait(lambda: server.subscribed('MSFT'))
+            server.publish('quote.IBM:1.0 1 1.1 2', 'IBM')
+            server.publish('quote.MSFT:2.0 1 2.1 2', 'MSFT')
+            server.publish('order.1001 {"permid": "1001", "status": "Submitted"}')
+            _wait(lambda: len(quotes) == 2)
+            time.sleep(0.1)
+        reader.join(5)
+        assert [q.key for q in quotes] == ['IBM', 'MSFT']
+        assert [(u.kind, u.key) for u in received] == [('quote', 'IBM'), ('quote', 'MSFT'), ('order', '1001')]
+
+
+def test_stream_reconnect_resubscribes():
+    with MockStreamServer() as server:
+        with Stream(config=server.config, symbols=['IBM'], reconnect_delay=0.05) as stream:
+            trades = []
+            stream.on('trade', trades.append)
+            stream.subscribe('SPY')
+            _wait(lambda: server.subscribed('SPY'))
+            server.drop()
+            _wait(lambda: stream.connections == 2 and server.subscribed('IBM') and server.subscribed('SPY'))
+            server.publish('trade.SPY:300.0 100 5000', 'SPY')
+            _wait(lambda: trades)
+        assert trades[0].data == {'symbol': 'SPY', 'last': 300.0, 'size': 100, 'volume': 5000}
+        assert server.commands.count(f'auth {stream.username} {stream.password}') == 2
+
+
+def test_stream_survives_bad_updates_and_callbacks():
+    with MockStreamServer() as server:
+        with Stream(config=server.config, symbols=['IBM']) as stream:
+            quotes = []
+            messages = []
+
+            def failing(update):
+                raise RuntimeError('callback failed')
+
+            stream.on('quote', failing)
+            stream.on('quote', quotes.append)
+            stream.on('message', messages.append)
+            _wait(lambda: server.subscribed('IBM'))
+            server.publish('quote.IBM:n/a 100 10.1 200', 'IBM')
+            for client in list(server.clients):
+                client.request.sendall(b'3:\xff\xfe!,')
+            server.publish('quote.IBM:1.0 1 1.1 2', 'IBM')
+            _wait(lambda: quotes)
+            assert stream.connections == 1
+        assert [q.data['bid'] for q in quotes] == [1.0]
+        assert [m.data for m in messages] == ['quote.IBM:n/a 100 10.1 200', '\ufffd\ufffd!']
+        assert stream.callback_errors == 1
+        assert isinstance(stream.last_callback_error, RuntimeError)
+
+
+def test_stream_full_queue_drops_updates():
+    with MockStreamServer() as server:
+        stream = Stream(config=server.config, symbols=['IBM'], queue_size=5)
+        trades = []
+        stream.on('trade', trades.append)
+        updates = iter(stream)
+        stream.start()
+        _wait(lambda: server.subscribed('IBM'))
+        for i in range(50):
+            server.publish(f'trade.IBM:{i}.0 100 {i}', 'IBM')
+        next(updates)
+        # callbacks keep running while the iterating consumer is not reading
+        _wait(lambda: len(trades) == 50)
+        stopper = threading.Thread(target=stream.stop)
+        stopper.start()
+        stopper.join(5)
+        assert not stopper.is_alive()
+        assert stream.dropped > 0
+        assert len(list(updates)) <= 5
@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+import pytest
+from click.testing import CliRunner
+
+from txtrader_client import API, AsyncAPI
+from txtrader_client.cli import cli
+
+ORDERS = [
+    {'symbol': 'ibm', 'quantity': 100},
+    {'symbol': 'IBM', 'quantity': 50, 'action': 'sell', 'limit_price': '101.5'},
+    {'symbol': 'BAD', 'quantity': -10},
+    {'symbol': 'IBM', 'quantity': 10, 'stop_price': 99, 'limit_price': 98.5},
+    {'symbol': 'IBM', 'quantity': 10, 'tag': 'T1'},
+]
+
+CSV = '''symbol,quantity,action,limit_price,stop_price
+IBM,100,BUY,,
+IBM,50,SELL,101.5,
+BAD,10,SELLSHORT,,
+'''
+
+
+def _setup(server):
+    server.txtrader.symbols['IBM'] = server.txtrader.quote('IBM')
+    server.txtrader.failing_symbols.add('BAD')
+
+
+def _check(results):
+    assert [r['quantity'] for r in results[:2]] == [100, -50]
+    assert [r['type'] for r in results[:2]] == ['market', 'limit']
+    assert isinstance(results[2], Exception)
+    assert results[3]['type'] == 'stoplimit'
+    assert results[3]['stop_price'] == 99.0
+    assert results[4]['status'] == 'Staged'
+
+
+def test_submit_orders(server):
+    _setup(server)
+    with API(config=server.config) as api:
+        _check(api.submit_orders(ORDERS, max_in_flight=2))
+    assert len(server.txtrader.orders) == 4
+
+
+def test_submit_orders_concurrent(server):
+    _setup(server)
+    server.delay = 0.1
+    with API(config=dict(server.config, TXTRADER_POOL_SIZE='8')) as api:
+        results = api.submit_orders([{'symbol': 'IBM', 'quantity': i + 1} for i in range(8)])
+    assert [r['quantity'] for r in results] == list(range(1, 9))
+    assert server.connections == 8
+
+
+@pytest.mark.parametrize(
+    'order', [
+        {'quantity': 10},
+        {'symbol': 'IBM'},
+        {'symbol': 'IBM', 'quantity': 0},
+        {'symbol': 'IBM', 'quantity': 'ten'},
+        {'symbol': 'IBM', 'quantity': -10, 'action': 'SELL'},
+        {'symbol': 'IBM', 'quantity': 10, 'action': 'HOLD'},
+        {'symbol': 'IBM', 'quantity': 10, 'type': 'limit'},
+        {'symbol': 'IBM', 'quantity': 10, 'type': 'market', 'stop_price': 1},
+        {'symbol': 'IBM', 'quantity': 10, 'limit_price': 1, 'tag': 'T1'},
+        {'symbol': 'IBM', 'quantity': 10, 'price': 1},
+    ]
+)
+def test_submit_orders_invalid(server, order):
+    _setup(server)
+    with API(config=server.config) as api:
+        with pytest.raises(ValueError, match=r'\[1\]'):
+            api.submit_orders([ORDERS[0], order])
+    assert server.txtrader.orders == {}
+
+
+def test_submit_orders_aio(server):
+    _setup(server)
+
+    async def run():
+        async with AsyncAPI(config=server.config) as api:
+            return await api.submit_orders(ORDERS, max_in_flight=2)
+
+    _check(asyncio.run(run()))
+
+
+def test_submit_from_file(server, tmp_path):
+    _setup(server)
+    path = tmp_path / 'orders.csv'
+    path.write_text(CSV)
+    ret = CliRunner().invoke(cli, ['-v', 'submit', '--from-file', str(path), '--force'], env=server.config)
+    assert ret.exit_code == 0, ret.output
+    results = json.loads(ret.output)
+    assert [r.get('quantity') for r in results] == [100, -50, None]
+    assert results[2]['error'].startswith('HTTPError')
+    ret = CliRunner().invoke(cli, ['-v', 'submit', '--from-file', str(path)], input='n\n', env=server.config)
+    assert ret.exit_code == 1
+    assert 'Submit 3 orders' in ret.output
+    assert len(server.txtrader.orders) == 2
+
+
+def test_submit_from_file_short_rows(server, tmp_path):
+    _setup(server)
+    path = tmp_path / 'orders.csv'
+    # DictReader fills the fields missing from a short row with None
+    path.write_text('symbol,quantity,limit_price\nIBM,100\nIBM\n')
+    ret = CliRunner().invoke(cli, ['-v', 'submit', '--from-file', str(path), '--force'], env=server.config)
+    assert ret.exit_code == 2
+    assert 'quantity is required' in ret.output
+    assert not server.txtrader.orders
+    path.write_text('symbol,quantity,limit_price\nIBM,100\n')
+    ret = CliRunner().invoke(cli, ['-v', 'submit', '--from-file', str(path), '--force'], env=server.config)
+    assert ret.exit_code == 0, ret.output
+    assert [r['type'] for r in json.loads(ret.output)] == ['market']
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from txtrader_client import API, AsyncAPI, TxTraderTimeout
+
+
+@pytest.mark.parametrize('transport', ['requests', 'http.client'])
+def test_read_timeout(server, transport):
+    with API(config=dict(server.config, TXTRADER_TRANSPORT=transport, TXTRADER_READ_TIMEOUT='0.2')) as api:
+        assert api.connect_timeout == 10.0
+        server.delays.append(1.0)
+        start = time.monotonic()
+        with pytest.raises(TxTraderTimeout):
+            api.query_accounts()
+        assert time.monotonic() - start < 0.8
+        # the timed out connection is discarded, not reused
+        assert api.query_accounts() == [server.txtrader.account]
+
+
+@pytest.mark.parametrize('transport', ['requests', 'http.client'])
+def test_timeout_context(server, transport):
+    with API(config=dict(server.config, TXTRADER_TRANSPORT=transport, TXTRADER_READ_TIMEOUT='')) as api:
+        assert api.read_timeout is None
+        server.delays.append(1.0)
+        with api.timeout(read=0.2):
+            with pytest.raises(TimeoutError):
+                api.query_accounts()
+        server.delays.append(0.3)
+        assert api.query_accounts() == [server.txtrader.account]
+
+
+def test_deadline_fan_out(server):
+    server.txtrader.populate(symbols=10)
+    server.delay = 0.2
+    symbols = list(server.txtrader.symbols)
+    with API(config=server.config) as api:
+        start = time.monotonic()
+        with api.timeout(0.5):
+            results = api.query_symbol_many(symbols, max_workers=2)
+            with api.timeout(5):
+                # an inner context cannot extend the outer deadline
+                with pytest.raises(TxTraderTimeout):
+                    api.status()
+        elapsed = time.monotonic() - start
+    timeouts = [r for r in results.values() if isinstance(r, TxTraderTimeout)]
+    assert 0 < len(timeouts) < len(symbols)
+    assert elapsed < 1.0
+
+
+def test_deadline_bounds_limiter_and_coalesce_waits(server):
+    server.delay = 1.0
+    config = dict(server.config, TXTRADER_LIMITER='true', TXTRADER_LIMITER_MAX='2', TXTRADER_COALESCE='true')
+    with API(config=config) as api:
+        # a slow call holds the only query slot
+        busy = threading.Thread(target=api.query_accounts)
+        busy.start()
+        while not api.limiter.in_flight:
+            time.sleep(0.01)
+        with api.timeout(0.2):
+            start = time.monotonic()
+            with pytest.raises(TxTraderTimeout):
+                # queued behind the limiter
+                api.query_positions()
+            assert time.monotonic() - start < 0.6
+            start = time.monotonic()
+            with pytest.raises(TxTraderTimeout):
+                # waiting on the identical call in flight
+                api.query_accounts()
+            assert time.monotonic() - start < 0.6
+        busy.join()
+        assert api.limiter.in_flight == 0
+        assert server.txtrader.calls == {'query_accounts': 1}
+
+
+def test_async_timeouts(server):
+
+    async def run():
+        async with AsyncAPI(config=dict(server.config, TXTRADER_READ_TIMEOUT='0.2')) as api:
+            server.delays.append(1.0)
+            with pytest.raises(TxTraderTimeout):
+                await api.query_accounts()
+            server.delays.append(1.0)
+            with api.timeout(0.3, read=5):
+                start = time.monotonic()
+                with pytest.raises(TxTraderTimeout):
+                    await api.query_accounts()
+                assert time.monotonic() - start < 0.8
+            return await api.query_accounts()
+
+    assert asyncio.run(run()) == [server.txtrader.account]
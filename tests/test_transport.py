@@ -0,0 +1,108 @@
+import subprocess
+import sys
+import threading
+
+import pytest
+import requests
+
+from txtrader_client import API
+
+
+def test_keepalive_reuses_connection(server):
+    with API(config=server.config) as api:
+        for _ in range(10):
+            assert api.status() == 'Up'
+    assert server.connections == 1
+
+
+def test_close_per_call(server):
+    api = API(config=dict(server.config, TXTRADER_KEEPALIVE='false'))
+    for _ in range(5):
+        assert api.status() == 'Up'
+    assert server.connections == 5
+
+
+def test_keepalive_threads_share_pool(server):
+    api = API(config=dict(server.config, TXTRADER_POOL_SIZE='4'))
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(20):
+                assert api.query_accounts() == [server.txtrader.account]
+        except Exception as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    api.close()
+    assert not errors
+    assert server.connections <= 4
+
+
+def test_http_error(server):
+    api = API(config=server.config)
+    with pytest.raises(requests.HTTPError):
+        api._call_txtrader_api('no_such_function', {})
+
+
+def test_http_client_transport(server):
+    config = dict(server.config, TXTRADER_TRANSPORT='http.client')
+    with API(config=config) as api:
+        for _ in range(5):
+            assert api.status() == 'Up'
+        assert api.query_accounts() == [server.txtrader.account]
+        with pytest.raises(requests.HTTPError):
+            api._call_txtrader_api('no_such_function', {})
+    assert server.connections == 1
+    api = API(config=dict(config, TXTRADER_KEEPALIVE='false'))
+    for _ in range(3):
+        assert api.status() == 'Up'
+    assert server.connections == 4
+
+
+def test_http_client_retries_only_read_only_calls(server):
+    server.txtrader.quote('IBM')
+    with API(config=dict(server.config, TXTRADER_TRANSPORT='http.client')) as api:
+        assert api.status() == 'Up'
+        # the server closes the reused connection after answering; a query is sent again on a new one
+        server.hangups = 1
+        assert api.query_accounts() == [server.txtrader.account]
+        assert server.txtrader.calls['query_accounts'] == 2
+        # an order the server may have carried out is not
+        server.hangups = 1
+        with pytest.raises(ConnectionError):
+            api.market_order(api.account, api.route, 'IBM', 100)
+        assert server.txtrader.calls['market_order'] == 1
+
+
+def test_http_client_retries_unsent_request(server, monkeypatch):
+    server.txtrader.call('add_symbol', {'symbol': 'IBM'})
+    with API(config=dict(server.config, TXTRADER_TRANSPORT='http.client')) as api:
+        assert api.status() == 'Up'
+        connection = api._get_transport().idle[0]
+
+        def broken(*args, **kwargs):
+            raise BrokenPipeError('broken pipe')
+
+        # writing to the stale pooled connection fails; the request never reached the server
+        monkeypatch.setattr(connection, 'request', broken)
+        assert api.query_accounts() == [server.txtrader.account]
+        # an order that was never written is safe to send again as well
+        monkeypatch.setattr(api._get_transport().idle[0], 'request', broken)
+        assert api.market_order(api.account, api.route, 'IBM', 100)['status'] == 'Submitted'
+        assert server.txtrader.calls['market_order'] == 1
+
+
+def test_unknown_transport(server):
+    with pytest.raises(ValueError):
+        API(config=dict(server.config, TXTRADER_TRANSPORT='curl'))
+
+
+def test_import_is_lazy():
+    code = 'import sys, txtrader_client; print(" ".join(m for m in ("requests", "numpy", "asyncio") if m in sys.modules))'
+    ret = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+    assert ret.stdout.strip() == ''
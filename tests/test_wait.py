@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+
+from txtrader_client import API, AsyncAPI
+
+
+def _orders(server, count):
+    server.txtrader.call('add_symbol', {'symbol': 'IBM'})
+    api = API(config=server.config)
+    return api, [api.market_order(api.account, api.route, 'IBM', 10)['permid'] for _ in range(count)]
+
+
+def test_wait_for_orders(server):
+    api, order_ids = _orders(server, 5)
+    bad = api.market_order(api.account, api.route, 'NOSUCH', 10)['permid']
+    for i, order_id in enumerate(reversed(order_ids)):
+        threading.Timer(0.05 * (i + 1), server.txtrader.fill, (order_id, )).start()
+    polls = server.txtrader.calls.get('query_orders', 0)
+    done = [order_id for order_id, order in api.wait_for_orders(order_ids + [bad], timeout=5, interval=0.01)]
+    assert done[0] == bad
+    assert done[1:] == list(reversed(order_ids))
+    assert server.txtrader.calls['query_orders'] - polls < 40
+    assert server.txtrader.calls.get('query_order', 0) == 0
+
+
+def test_wait_for_orders_statuses(server):
+    api, order_ids = _orders(server, 2)
+    api.cancel_order(order_ids[0])
+    done = dict(api.wait_for_orders(order_ids[:1], statuses=('Filled', 'Cancelled'), timeout=1))
+    assert done[order_ids[0]]['status'] == 'Cancelled'
+
+
+def test_wait_for_orders_timeout(server):
+    api, order_ids = _orders(server, 2)
+    server.txtrader.fill(order_ids[0])
+    done = []
+    with pytest.raises(TimeoutError):
+        for order_id, order in api.wait_for_orders(order_ids, timeout=0.3, interval=0.01):
+            done.append(order_id)
+    assert done == order_ids[:1]
+
+
+def test_wait_for_fill(server):
+    api, order_ids = _orders(server, 1)
+    threading.Timer(0.1, server.txtrader.fill, (order_ids[0], )).start()
+    assert api.wait_for_fill(order_ids[0], timeout=5)['status'] == 'Filled'
+
+
+def test_wait_for_fill_cancelled(server):
+    api, order_ids = _orders(server, 1)
+    threading.Timer(0.1, api.cancel_order, (order_ids[0], )).start()
+    # a cancelled order is final; no timeout is needed
+    assert api.wait_for_fill(order_ids[0])['status'] == 'Cancelled'
+
+
+def test_async_wait_for_fill(server):
+    api, order_ids = _orders(server, 1)
+    threading.Timer(0.1, server.txtrader.fill, (order_ids[0], )).start()
+
+    async def main():
+        async with AsyncAPI(config=server.config) as api:
+            return await api.wait_for_fill(order_ids[0], timeout=5)
+
+    assert asyncio.run(main())['status'] == 'Filled'
@@ -0,0 +1,52 @@
+import json
+import threading
+
+from click.testing import CliRunner
+
+from txtrader_client.cli import cli, _diff
+
+
+def _watch(server, *args):
+    return CliRunner().invoke(cli, ['-v', '-c', 'watch'] + list(args), env=server.config)
+
+
+def test_watch_prints_changes_only(server):
+    server.txtrader.populate(symbols=1)
+    symbol = server.txtrader.symbols['S0000']
+    initial = symbol['last']
+
+    def tick():
+        symbol['last'] = 101.0
+
+    threading.Timer(0.15, tick).start()
+    ret = _watch(server, '-n', '0.05', '--count', '8', 'query_symbol', 'S0000')
+    assert ret.exit_code == 0
+    outputs = [json.loads(line) for line in ret.output.splitlines()]
+    assert [o['last'] for o in outputs] == [initial, 101.0]
+    assert server.txtrader.calls['query_symbol'] == 8
+    assert server.connections == 1
+
+
+def test_watch_diff(server):
+    server.txtrader.populate(symbols=1)
+    initial = server.txtrader.symbols['S0000']['last']
+    threading.Timer(0.1, lambda: server.txtrader.symbols['S0000'].update(last=99.0)).start()
+    ret = _watch(server, '-n', '0.05', '--count', '5', '--diff', 'query_symbol', 'S0000')
+    outputs = [json.loads(line) for line in ret.output.splitlines()]
+    assert len(outputs) == 2
+    assert outputs[1] == {'changed': {'$.last': [initial, 99.0]}}
+
+
+def test_watch_rejects_order_commands(server):
+    ret = _watch(server, 'buy', '100', 'IBM')
+    assert ret.exit_code == 2
+    assert server.txtrader.calls == {}
+
+
+def test_diff():
+    assert _diff({'a': 1, 'b': [1, 2]}, {'a': 2, 'b': [1], 'c': {'d': 3}}) == {
+        'changed': {'$.a': [1, 2]},
+        'added': {'$.c.d': 3},
+        'removed': {'$.b[1]': 2},
+    }
+    assert _diff('Up', 'Down') == {'changed': {'$': ['Up', 'Down']}}
@@ -8,8 +8,34 @@
 
 """
 
-from .cli import cli
-from .client import API
+import importlib
+
 from .version import VERSION as __version__
 from .version import DATE as __date__
 from . import defaults
+
+# public names imported on first access, so the txtrader CLI (entry point txtrader_client:cli) and
+# `import txtrader_client` do not pay for asyncio, requests or NumPy until they are used
+_EXPORTS = {
+    'cli': '.cli',
+    'API': '.client',
+    'AsyncAPI': '.aio',
+    'MultiAPI': '.multi',
+    'TxTraderTimeout': '.client',
+    'Stream': '.stream',
+    'OrderBook': '.orderbook',
+}
+
+__all__ = list(_EXPORTS) + ['__version__', '__date__', 'defaults']
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
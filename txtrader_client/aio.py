@@ -0,0 +1,596 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  aio.py
+  ------
+
+  TxTrader Client module - Expose class AsyncAPI as asyncio user interface.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import asyncio
+import base64
+import contextlib
+import json
+import ssl
+import time
+
+import requests
+
+from txtrader_client import bars
+from txtrader_client.client import (
+    API, FILL_STATUSES, ORDER_FUNCTIONS, READ_ONLY, TxTraderTimeout, _OrderWait, _flight_key, _overloaded, _unchanged
+)
+from txtrader_client.decoder import ItemParser
+from txtrader_client.metrics import CallRecord
+from txtrader_client.transport import (
+    CHUNK_SIZE, NO_TIMEOUT, _decompressor, _Unsent, accept_encoding, decompress, encode_body
+)
+
+
+class _AsyncConnectionPool():
+    """Non-blocking HTTP/1.1 keep-alive connection pool for a single server"""
+
+    def __init__(
+        self, protocol, host, port, username, password, size, keepalive=True, compression=True, compress_min=0
+    ):
+        self.compress_min = compress_min
+        self.host = host
+        self.port = int(port)
+        self.ssl = ssl.create_default_context() if protocol == 'https' else None
+        self.size = size
+        self.keepalive = keepalive
+        credentials = base64.b64encode(f'{username}:{password}'.encode()).decode()
+        self.headers = (
+            f'Host: {host}:{port}\r\n'
+            f'Authorization: Basic {credentials}\r\n'
+            'Content-Type: application/json\r\n'
+            f"Connection: {'keep-alive' if keepalive else 'close'}\r\n"
+            f'Accept-Encoding: {accept_encoding(compression)}\r\n'
+        )
+        self._idle = []
+        self._semaphore = asyncio.Semaphore(size)
+
+    async def request(self, method, path, body=b'', timeout=NO_TIMEOUT):
+        """Send request, returning (status, reason, content); see _retry for requests on stale pooled connections
+
+        timeout is (connect, read) seconds; the read timeout bounds the whole response.
+        """
+        connect, read = timeout
+        async with self._semaphore:
+            while self._idle:
+                connection = self._idle.pop()
+                try:
+                    return await asyncio.wait_for(self._roundtrip(connection, method, path, body), read)
+                except ConnectionError as ex:
+                    if not self._retry(path, ex):
+                        raise
+            connection = await self._connect(connect)
+            return await asyncio.wait_for(self._roundtrip(connection, method, path, body), read)
+
+    def _retry(self, path, ex):
+        """Return True if a request failing with ConnectionError ex on a pooled connection may be sent again
+
+        The server may have read the request and acted on it before closing, so only read-only calls and requests
+        that could not be written are sent again.
+        """
+        return isinstance(ex, _Unsent) or path.lstrip('/') in READ_ONLY
+
+    async def _connect(self, timeout=None):
+        return await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=self.ssl), timeout)
+
+    async def _roundtrip(self, connection, method, path, body):
+        keep = False
+        try:
+            version, status, reason, headers = await self._send(connection, method, path, body)
+            content = await self._read_body(connection[0], headers)
+            keep = self._keep(version, headers)
+            return status, reason, decompress(content, headers.get('content-encoding'))
+        finally:
+            if keep:
+                self._idle.append(connection)
+            else:
+                connection[1].close()
+
+    @contextlib.asynccontextmanager
+    async def stream(self, method, path, body=b'', chunk_size=CHUNK_SIZE, timeout=NO_TIMEOUT):
+        """Send request, yielding (status, reason, async iterator of body chunks) with the body unread
+
+        timeout is (connect, read) seconds; the read timeout bounds the response head and each chunk.
+        """
+        connect, read = timeout
+        async with self._semaphore:
+            head = None
+            while self._idle and not head:
+                connection = self._idle.pop()
+                try:
+                    head = await asyncio.wait_for(self._send(connection, method, path, body), read)
+                except ConnectionError as ex:
+                    connection[1].close()
+                    if not self._retry(path, ex):
+                        raise
+                except BaseException:
+                    connection[1].close()
+                    raise
+            if not head:
+                connection = await self._connect(connect)
+                try:
+                    head = await asyncio.wait_for(self._send(connection, method, path, body), read)
+                except BaseException:
+                    connection[1].close()
+                    raise
+            version, status, reason, headers = head
+            done = False
+
+            async def chunks():
+                nonlocal done
+                body = self._iter_body(connection[0], headers, chunk_size)
+                decompressor = _decompressor(headers.get('content-encoding'))
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(body.__anext__(), read)
+                    except StopAsyncIteration:
+                        break
+                    if decompressor:
+                        chunk = decompressor.decompress(chunk)
+                    if chunk:
+                        yield chunk
+                if decompressor:
+                    chunk = decompressor.flush()
+                    if chunk:
+                        yield chunk
+                done = True
+
+            try:
+                yield status, reason, chunks()
+            finally:
+                if done and self._keep(version, headers):
+                    self._idle.append(connection)
+                else:
+                    connection[1].close()
+
+    async def _send(self, connection, method, path, body):
+        """Write request; return (version, status, reason, headers) of the response"""
+        reader, writer = connection
+        body, extra = encode_body(body, self.compress_min)
+        extra = ''.join(f'{k}: {v}\r\n' for k, v in extra.items())
+        head = f'{method} {path} HTTP/1.1\r\n{self.headers}{extra}Content-Length: {len(body)}\r\n\r\n'
+        try:
+            writer.write(head.encode() + body)
+            await writer.drain()
+        except ConnectionError as ex:
+            raise _Unsent(f'{path} not sent: {ex}') from ex
+        version, status, reason = await self._read_status(reader)
+        headers = await self._read_headers(reader)
+        return version, status, reason, headers
+
+    def _keep(self, version, headers):
+        connection_header = headers.get('connection', '').lower()
+        return (
+            self.keepalive and connection_header != 'close'
+            and (version == 'HTTP/1.1' or connection_header == 'keep-alive')
+            and ('content-length' in headers or 'chunked' in headers.get('transfer-encoding', ''))
+        )
+
+    async def _read_status(self, reader):
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError('connection closed by server')
+        version, status, reason = (line.decode('latin-1').rstrip('\r\n').split(' ', 2) + [''])[:3]
+        return version, int(status), reason
+
+    async def _read_headers(self, reader):
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+            if not line:
+                return headers
+            key, _, value = line.partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+    async def _read_body(self, reader, headers):
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await self._read_headers(reader)
+                    return b''.join(chunks)
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+        if 'content-length' in headers:
+            return await reader.readexactly(int(headers['content-length']))
+        return await reader.read()
+
+    async def _iter_body(self, reader, headers, chunk_size):
+        if 'chunked' in headers.get('transfer-encoding', ''):
+            while True:
+                size = int((await reader.readline()).split(b';')[0], 16)
+                if not size:
+                    await self._read_headers(reader)
+                    return
+                while size:
+                    chunk = await reader.readexactly(min(size, chunk_size))
+                    size -= len(chunk)
+                    yield chunk
+                await reader.readexactly(2)
+        elif 'content-length' in headers:
+            remaining = int(headers['content-length'])
+            while remaining:
+                chunk = await reader.read(min(remaining, chunk_size))
+                if not chunk:
+                    raise asyncio.IncompleteReadError(b'', remaining)
+                remaining -= len(chunk)
+                yield chunk
+        else:
+            while True:
+                chunk = await reader.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def close(self):
+        while self._idle:
+            reader, writer = self._idle.pop()
+            writer.close()
+
+
+class AsyncAPI(API):
+    """asyncio variant of API; server call methods are coroutines (iter_* return async iterators) sharing one pool"""
+
+    def __init__(self, mode='rtx', config={}):
+        super().__init__(mode=mode, config=config)
+        self._pool = None
+        self.cache = None
+        self.bar_store = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _get_pool(self):
+        if not self._pool:
+            self._pool = _AsyncConnectionPool(
+                self._config('PROTOCOL'), self._config('HOST'), self._config('HTTP_PORT'), self.username,
+                self.password, self.pool_size, self.keepalive, self.compression, self.compress_min
+            )
+        return self._pool
+
+    async def close(self):
+        """Close all pooled server connections"""
+        if self._pool:
+            await self._pool.close()
+            self._pool = None
+
+    async def _pool_request(self, function_name, method, body):
+        connect, read, remaining = self._timeouts(function_name)
+        try:
+            return await asyncio.wait_for(
+                self._get_pool().request(method, f'/{function_name}', body, (connect, read)), remaining
+            )
+        except TxTraderTimeout:
+            raise
+        except asyncio.TimeoutError as ex:
+            raise TxTraderTimeout(f'timeout calling {function_name}') from ex
+
+    async def _request(self, function_name, method, body):
+        if self.hedge is not None and function_name in READ_ONLY:
+            return await self.hedge.run_async(function_name, lambda: self._request_once(function_name, method, body))
+        return await self._request_once(function_name, method, body)
+
+    async def _acquire(self, function_name):
+        """Wait within the deadline for a limiter slot (if limiting); return the (connect, read) timeouts left"""
+        connect, read, remaining = self._timeouts(function_name)
+        if self.limiter is None:
+            return connect, read
+        if not await self.limiter.acquire_async(function_name in ORDER_FUNCTIONS, remaining):
+            raise TxTraderTimeout(f'deadline exceeded waiting for a request slot for {function_name}')
+        try:
+            # the wait for a slot used part of the remaining time
+            return self._timeouts(function_name)[:2]
+        except TxTraderTimeout:
+            self.limiter.release()
+            raise
+
+    async def _request_once(self, function_name, method, body):
+        if self.limiter is None:
+            return await self._pool_request(function_name, method, body)
+        await self._acquire(function_name)
+        start = time.perf_counter()
+        dropped = True
+        try:
+            # _pool_request recomputes the timeouts from the remaining deadline
+            ret = await self._pool_request(function_name, method, body)
+            dropped = _overloaded(ret[0])
+            return ret
+        finally:
+            self.limiter.release(time.perf_counter() - start, dropped)
+
+    async def _call_txtrader_api(self, function_name, args):
+        if self.coalesce is not None and function_name in READ_ONLY:
+            return await self.coalesce.do_async(
+                _flight_key(function_name, args), lambda: self._call_once(function_name, args),
+                self._timeouts(function_name)[2]
+            )
+        return await self._call_once(function_name, args)
+
+    async def _call_once(self, function_name, args):
+        if args:
+            method, body = 'POST', json.dumps(args).encode()
+        else:
+            method, body = 'GET', b''
+        if self.metrics is None and self.call_hook is None:
+            return self._decode(function_name, *await self._request(function_name, method, body))
+        start = time.perf_counter()
+        status = None
+        response_bytes = 0
+        error = None
+        try:
+            status, reason, content = await self._request(function_name, method, body)
+            response_bytes = len(content)
+            return self._decode(function_name, status, reason, content)
+        except Exception as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            self._record(
+                CallRecord(
+                    function_name, method, status,
+                    time.perf_counter() - start, len(body), response_bytes, error
+                )
+            )
+
+    def _typed(self, convert, ret):
+        if not self.typed:
+            return ret
+
+        async def typed():
+            return convert(await ret)
+
+        return typed()
+
+    async def _iter_txtrader_api(self, function_name, args, record=None):
+        if args:
+            method, body = 'POST', json.dumps(args).encode()
+        else:
+            method, body = 'GET', b''
+        convert = record.from_dict if record and self.typed else _unchanged
+        start = time.perf_counter()
+        status = None
+        response_bytes = 0
+        error = None
+        try:
+            timeout = await self._acquire(function_name)
+            sent = time.perf_counter()
+            latency = None
+            dropped = True
+            stream = self._get_pool().stream(method, f'/{function_name}', body, timeout=timeout)
+            try:
+                async with stream as (status, reason, chunks):
+                    # the limiter samples the time to the response head; the body is read as the caller consumes it
+                    latency = time.perf_counter() - sent
+                    dropped = _overloaded(status)
+                    self._check_status(function_name, status, reason)
+                    parser = ItemParser()
+                    async for chunk in chunks:
+                        response_bytes += len(chunk)
+                        for key, value in parser.feed(chunk):
+                            yield key, convert(value)
+                    for key, value in parser.feed(b'', final=True):
+                        yield key, convert(value)
+            except TxTraderTimeout:
+                raise
+            except asyncio.TimeoutError as ex:
+                raise TxTraderTimeout(f'timeout calling {function_name}') from ex
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release(time.perf_counter() - sent if latency is None else latency, dropped)
+        except Exception as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            if self.metrics is not None or self.call_hook is not None:
+                self._record(
+                    CallRecord(
+                        function_name, method, status,
+                        time.perf_counter() - start, len(body), response_bytes, error
+                    )
+                )
+
+    def _check_status(self, function_name, status, reason):
+        if status != requests.codes.ok:
+            kind = 'Client' if status < 500 else 'Server'
+            raise requests.HTTPError(f'{status} {kind} Error: {reason} for url: {self.url}/{function_name}')
+
+    def _decode(self, function_name, status, reason, content):
+        self._check_status(function_name, status, reason)
+        return self.decode(content)
+
+    async def _run_all(self, calls, max_workers):
+        semaphore = asyncio.Semaphore(max(1, max_workers or self.pool_size))
+
+        async def call(method, args):
+            async with semaphore:
+                return await method(*args)
+
+        return await asyncio.gather(*[call(method, args) for method, args in calls], return_exceptions=True)
+
+    async def _fan_out(self, method, symbols, max_workers):
+        symbols = list(dict.fromkeys(symbols))
+        return dict(zip(symbols, await self._run_all([(method, (symbol, )) for symbol in symbols], max_workers)))
+
+    async def submit_orders(self, orders, max_in_flight: int = None):
+        """Validate all orders, then submit them concurrently; return list of new order results or exceptions in input order"""
+        return await self._run_all(self._order_calls(orders), max_in_flight)
+
+    async def query_symbol_many(self, symbols, max_workers: int = None):
+        """Return dict keyed by symbol containing current data for each symbol, or the exception raised for it"""
+        return await self._fan_out(self.query_symbol, symbols, max_workers)
+
+    async def query_symbol_data_many(self, symbols, max_workers: int = None):
+        """Return dict keyed by symbol containing rawdata for each symbol, or the exception raised for it"""
+        return await self._fan_out(self.query_symbol_data, symbols, max_workers)
+
+    async def query_symbol_bars_many(self, symbols, max_workers: int = None):
+        """Return dict keyed by symbol containing live bar data for each symbol, or the exception raised for it"""
+        return await self._fan_out(self.query_symbol_bars, symbols, max_workers)
+
+    async def wait_for_orders(
+        self, order_ids, statuses=('Filled',), timeout: float = None, interval: float = 0.1, max_interval: float = 2.0
+    ):
+        """Yield (order_id, order) as each order reaches one of statuses or 'Error'; raise TimeoutError after timeout seconds"""
+        wait = _OrderWait(order_ids, statuses, timeout, interval, max_interval)
+        while wait.pending:
+            for ret in wait.update(await self.query_orders()):
+                yield ret
+            if wait.pending:
+                await asyncio.sleep(wait.next_delay())
+
+    async def wait_for_fill(self, order_id: str, timeout: float = None):
+        """Wait for an order to be filled, cancelled or rejected, returning its final order dict"""
+        async for _, order in self.wait_for_orders([order_id], FILL_STATUSES, timeout):
+            return order
+
+    async def set_account(self, account: str):
+        """Select current active trading account"""
+        ret = await self._call_txtrader_api('set_account', {'account': account})
+        if ret:
+            self.account = account
+        return ret
+
+    async def help(self):
+        """Return dict containing brief documentation for each server API call"""
+        return await super().help()
+
+    async def status(self):
+        """return string describing current API connection status"""
+        return await super().status()
+
+    async def version(self):
+        """Return string containing release version of current server instance"""
+        return await super().version()
+
+    async def shutdown(self, message: str):
+        """Request server shutdown; post message to logs"""
+        return await super().shutdown(message)
+
+    async def uptime(self):
+        """Return string showing start time and elapsed time for current server instance"""
+        return await super().uptime()
+
+    async def time(self):
+        """Return formatted timestamp string (YYYY-MM-DD HH:MM:SS) matching latest datafeed time update"""
+        return await super().time()
+
+    async def query_symbol_bars(self, symbol: str, columnar: bool = False):
+        """Return array of current live bar data for given symbol; columnar=True returns typed columns (see bars.columns)"""
+        ret = await super().query_symbol_bars(symbol)
+        return bars.columns(ret) if columnar else ret
+
+    async def query_bars(self, symbol, period, start, end, columnar: bool = False):
+        """Return array of bar data for symbol=<str> period=<minutes_as_integer|hour|day|month> start,end='YYYY-MM-DD HH:MM[:00]'; columnar=True returns typed columns (see bars.columns)"""
+        ret = await super().query_bars(symbol, period, start, end)
+        return bars.columns(ret) if columnar else ret
+
+    async def add_symbol(self, symbol: str):
+        """Request subscription to a symbol for price updates, bardata and order entry"""
+        return await super().add_symbol(symbol)
+
+    async def del_symbol(self, symbol: str):
+        """Delete subscription to a symbol for price updates and order entry"""
+        return await super().del_symbol(symbol)
+
+    async def query_symbols(self):
+        """Return the list of active symbols"""
+        return await super().query_symbols()
+
+    async def query_all_symbols(self):
+        """Return dict keyed by symbol containing current data for all active symbols"""
+        return await super().query_all_symbols()
+
+    async def query_symbol(self, symbol: str):
+        """Return dict containing current data for given symbol"""
+        return await super().query_symbol(symbol)
+
+    async def query_symbol_data(self, symbol: str):
+        """Return dict containing rawdata for given symbol"""
+        return await super().query_symbol_data(symbol)
+
+    async def query_accounts(self):
+        """Return array of account names"""
+        return await super().query_accounts()
+
+    async def query_account(self, account: str, fields: str = None):
+        """Query account data for account. [fields] is list of fields to select; None=all fields"""
+        return await super().query_account(account, fields)
+
+    async def query_positions(self):
+        """Return dict keyed by account containing dicts of position data fields"""
+        return await super().query_positions()
+
+    async def query_orders(self):
+        """Return dict keyed by order id containing dicts of order data fields"""
+        return await super().query_orders()
+
+    async def query_tickets(self):
+        """Return dict keyed by order id containing dicts of staged order ticket data fields"""
+        return await super().query_tickets()
+
+    async def query_order(self, order_id: str):
+        """Return dict containing order/ticket status fields for given order id"""
+        return await super().query_order(order_id)
+
+    async def cancel_order(self, order_id: str):
+        """Request cancellation of a pending order"""
+        return await super().cancel_order(order_id)
+
+    async def query_order_executions(self, order_id: str):
+        """Return dict keyed by execution id containing dicts of execution report data fields for given order_id"""
+        return await super().query_order_executions(order_id)
+
+    async def query_execution(self, execution_id: str):
+        """Return dict containing execution report data fields for given execution id"""
+        return await super().query_execution(execution_id)
+
+    async def query_executions(self):
+        """Return dict keyed by execution id containing dicts of execution report data fields"""
+        return await super().query_executions()
+
+    async def set_order_route(self, route: str):
+        """Set order route data given route {'route_name': {parameter: value, ...} (JSON string will be parsed into a route dict)}"""
+        return await super().set_order_route(route)
+
+    async def get_order_route(self):
+        """Return current order route as a dict"""
+        return await super().get_order_route()
+
+    async def market_order(self, account: str, route: str, symbol: str, quantity: int):
+        """Submit a market order, returning dict containing new order fields"""
+        return await super().market_order(account, route, symbol, quantity)
+
+    async def stage_market_order(self, tag: str, account: str, route: str, symbol: str, quantity: int):
+        """Submit a staged market order (displays as staged in GUI, requiring manual aproval), returning dict containing new order fields"""
+        return await super().stage_market_order(tag, account, route, symbol, quantity)
+
+    async def limit_order(self, account: str, route: str, symbol: str, limit_price: float, quantity: int):
+        """Submit a limit order, returning dict containing new order fields"""
+        return await super().limit_order(account, route, symbol, limit_price, quantity)
+
+    async def stop_order(self, account: str, route: str, symbol: str, stop_price: float, quantity: int):
+        """Submit a stop order, returning dict containing new order fields"""
+        return await super().stop_order(account, route, symbol, stop_price, quantity)
+
+    async def stoplimit_order(
+        self, account: str, route: str, symbol: str, stop_price: float, limit_price: float, quantity: int
+    ):
+        """Submit a stop-limit order, returning dict containing new order fields"""
+        return await super().stoplimit_order(account, route, symbol, stop_price, limit_price, quantity)
+
+    async def global_cancel(self):
+        """Request cancellation of all pending orders"""
+        return await super().global_cancel()
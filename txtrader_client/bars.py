@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  bars.py
+  -------
+
+  TxTrader Client module - compact columnar representation of bar data
+
+  Bar rows returned by the server have the form
+  [date, time, open, high, low, close, volume].  columns() converts them to
+  typed columns: a NumPy structured array when NumPy is installed, otherwise
+  a Bars object holding one array.array per column.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import calendar
+import datetime
+import functools
+from array import array
+
+FIELDS = ('time', 'open', 'high', 'low', 'close', 'volume')
+TYPECODES = ('q', 'd', 'd', 'd', 'd', 'q')
+
+
+@functools.lru_cache(maxsize=None)
+def _numpy():
+    """Import NumPy on first use (it adds ~100ms to every import of this package); None if not installed"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@functools.lru_cache(maxsize=None)
+def _dtype():
+    return _numpy().dtype(
+        [
+            ('time', 'datetime64[s]'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'), ('close', 'f8'),
+            ('volume', 'i8')
+        ]
+    )
+
+
+def __getattr__(name):
+    # module attributes numpy and DTYPE are resolved lazily
+    if name == 'numpy':
+        return _numpy()
+    if name == 'DTYPE' and _numpy():
+        return _dtype()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+class Bars():
+    """Bar data columns stored as array.array; time is UTC epoch seconds"""
+
+    __slots__ = FIELDS
+
+    def __init__(self):
+        for field, typecode in zip(FIELDS, TYPECODES):
+            setattr(self, field, array(typecode))
+
+    def __len__(self):
+        return len(self.time)
+
+    def __getitem__(self, index):
+        return tuple(getattr(self, field)[index] for field in FIELDS)
+
+    def __iter__(self):
+        return zip(*(getattr(self, field) for field in FIELDS))
+
+    def append(self, timestamp, open, high, low, close, volume):
+        self.time.append(timestamp)
+        self.open.append(open)
+        self.high.append(high)
+        self.low.append(low)
+        self.close.append(close)
+        self.volume.append(volume)
+
+    def rows(self):
+        """Return bars in the server list-of-lists form"""
+        return rows(self)
+
+
+def timestamp(date: str, time: str):
+    """Return UTC epoch seconds for a 'YYYY-MM-DD' date and 'HH:MM[:SS]' time"""
+    return calendar.timegm((int(date[0:4]), int(date[5:7]), int(date[8:10]), 0, 0, 0)) + _seconds(time)
+
+
+def _seconds(time):
+    return int(time[0:2]) * 3600 + int(time[3:5]) * 60 + (int(time[6:8]) if len(time) > 5 else 0)
+
+
+def _timestamps(dates, times):
+    # bar series repeat each date and time of day many times; convert every distinct value only once
+    days = {date: timestamp(date, '00:00') for date in set(dates)}
+    seconds = {time: _seconds(time) for time in set(times)}
+    return [days[date] + seconds[time] for date, time in zip(dates, times)]
+
+
+def split_timestamp(seconds):
+    """Return ('YYYY-MM-DD', 'HH:MM:SS') for UTC epoch seconds"""
+    t = datetime.datetime.fromtimestamp(seconds, datetime.timezone.utc)
+    return t.strftime('%Y-%m-%d'), t.strftime('%H:%M:%S')
+
+
+def rows(records):
+    """Return [date, time, open, high, low, close, volume] rows for (epoch_seconds, open, ...) records"""
+    days = {}
+    ret = []
+    for record in records:
+        day, seconds = divmod(record[0], 86400)
+        if day not in days:
+            days[day] = split_timestamp(day * 86400)[0]
+        time = '%02d:%02d:%02d' % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+        ret.append([days[day], time] + list(record[1:]))
+    return ret
+
+
+def columns(rows, use_numpy: bool = None):
+    """Return bar rows as a NumPy structured array (if available and use_numpy is not False) or as Bars
+
+    use_numpy=True raises ImportError when NumPy is not installed.
+    """
+    rows = [row for row in rows if type(row) == list and len(row) == 7]
+    numpy = _numpy() if use_numpy is not False else None
+    if use_numpy is None:
+        use_numpy = numpy is not None
+    elif use_numpy and numpy is None:
+        raise ImportError('columns(use_numpy=True) requires NumPy; install numpy or pass use_numpy=None')
+    if rows:
+        date, time, open, high, low, close, volume = zip(*rows)
+        time = _timestamps(date, time)
+    else:
+        time = open = high = low = close = volume = ()
+    if use_numpy:
+        ret = numpy.empty(len(rows), dtype=_dtype())
+        ret['time'] = numpy.array(time, dtype='int64').astype('datetime64[s]')
+        ret['open'] = open
+        ret['high'] = high
+        ret['low'] = low
+        ret['close'] = close
+        ret['volume'] = volume
+        return ret
+    ret = Bars()
+    ret.time = array('q', time)
+    ret.open = array('d', map(float, open))
+    ret.high = array('d', map(float, high))
+    ret.low = array('d', map(float, low))
+    ret.close = array('d', map(float, close))
+    ret.volume = array('q', map(int, volume))
+    return ret
@@ -0,0 +1,232 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  barstore.py
+  -----------
+
+  TxTrader Client module - incremental on-disk cache of historical bar data
+
+  Each (symbol, period) pair is kept in two files under the store directory:
+
+    <SYMBOL>.<period>.bars  fixed size little-endian records sorted by time:
+                            int64 epoch seconds, float64 open/high/low/close,
+                            int64 volume; read through mmap
+    <SYMBOL>.<period>.json  list of [start, end] epoch second intervals that
+                            have already been fetched from the server
+
+  A query only fetches the parts of [start, end] not yet covered.  Newer bars
+  are appended in place; backfilled bars cause a rewrite of the records file.
+  A gap is marked covered only when the server answered it with bar rows
+  alone; an answer holding status or error strings is returned unchanged,
+  as the uncached query_bars would return it.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+
+from txtrader_client import bars
+
+RECORD = struct.Struct('<qddddq')
+DATETIME = re.compile('^\\d{4}-\\d{2}-\\d{2} \\d{2}:\\d{2}(:\\d{2})*$')
+
+
+def _format(seconds):
+    return '%s %s' % bars.split_timestamp(seconds)
+
+
+def _missing(covered, start, end):
+    """Return list of [start, end] intervals within start..end not contained in sorted covered intervals"""
+    ret = []
+    for low, high in covered:
+        if high < start or low > end:
+            continue
+        if low > start:
+            ret.append([start, low - 1])
+        start = max(start, high + 1)
+    if start <= end:
+        ret.append([start, end])
+    return ret
+
+
+def _merge(intervals):
+    ret = []
+    for low, high in sorted(intervals):
+        if ret and low <= ret[-1][1] + 1:
+            ret[-1][1] = max(ret[-1][1], high)
+        else:
+            ret.append([low, high])
+    return ret
+
+
+class BarStore():
+    """Directory of cached bar series; fetch gaps from the server through query()"""
+
+    def __init__(self, path, max_bytes: int = 0, max_age: float = 0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.fetches = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def cacheable(start, end):
+        """Return True if start and end are absolute 'YYYY-MM-DD HH:MM[:SS]' timestamps"""
+        return all(type(v) == str and DATETIME.match(v) for v in (start, end))
+
+    def _files(self, symbol, period):
+        base = os.path.join(self.path, f"{symbol.replace(os.sep, '_')}.{period}")
+        return base + '.bars', base + '.json'
+
+    def query(self, fetch, symbol, period, start, end, clock=None):
+        """Return bar rows for start..end, calling fetch(symbol, period, start, end) only for uncached gaps
+
+        clock() returns the server's current 'YYYY-MM-DD HH:MM:SS' time; bars after it may still change, so
+        that part of a fetched gap is not marked covered
+        """
+        first = bars.timestamp(*start.split(' '))
+        last = bars.timestamp(*end.split(' '))
+        with self._lock:
+            records_file, index_file = self._files(symbol, period)
+            covered = self._read_index(index_file)
+            gaps = _missing(covered, first, last)
+            if gaps:
+                now = clock() if clock else None
+                limit = bars.timestamp(*now.split(' ')) if now else None
+                new_rows = []
+                complete = True
+                for low, high in gaps:
+                    ret = fetch(symbol, period, _format(low), _format(high))
+                    self.fetches += 1
+                    rows = [row for row in ret if type(row) == list and len(row) == 7] if type(ret) == list else []
+                    if type(ret) != list or len(rows) != len(ret):
+                        complete = False
+                        break
+                    new_rows.extend(rows)
+                    # an empty answer may be a transient server failure; fetch the gap again next time
+                    if rows and (limit is None or low <= limit):
+                        covered.append([low, high if limit is None else min(high, limit)])
+                self._write_records(records_file, bars.columns(new_rows, use_numpy=False))
+                self._write_index(index_file, _merge(covered))
+                if not complete:
+                    # status or error entries: leave the gap uncovered and answer as the uncached call would
+                    if [low, high] != [first, last]:
+                        ret = fetch(symbol, period, start, end)
+                        self.fetches += 1
+                    return ret
+            elif covered:
+                os.utime(index_file)
+            ret = self._read_records(records_file, first, last)
+        if gaps:
+            self.evict()
+        return ret
+
+    def _read_index(self, index_file):
+        try:
+            with open(index_file) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+
+    def _write_index(self, index_file, covered):
+        with open(index_file + '.tmp', 'w') as f:
+            json.dump(covered, f)
+        os.replace(index_file + '.tmp', index_file)
+
+    def _records(self, records_file):
+        """Return list of stored record tuples"""
+        try:
+            with open(records_file, 'rb') as f:
+                return list(RECORD.iter_unpack(f.read()))
+        except FileNotFoundError:
+            return []
+
+    def _last_time(self, records_file):
+        try:
+            with open(records_file, 'rb') as f:
+                f.seek(-RECORD.size, os.SEEK_END)
+                return RECORD.unpack(f.read(RECORD.size))[0]
+        except (FileNotFoundError, OSError):
+            return None
+
+    def _write_records(self, records_file, columns):
+        if not len(columns):
+            return
+        new = sorted(dict((r[0], r) for r in columns).values())
+        last = self._last_time(records_file)
+        if last is None or new[0][0] > last:
+            with open(records_file, 'ab') as f:
+                f.write(b''.join(RECORD.pack(*r) for r in new))
+            return
+        merged = dict((r[0], r) for r in self._records(records_file))
+        merged.update((r[0], r) for r in new)
+        with open(records_file + '.tmp', 'wb') as f:
+            f.write(b''.join(RECORD.pack(*merged[t]) for t in sorted(merged)))
+        os.replace(records_file + '.tmp', records_file)
+
+    def _read_records(self, records_file, first, last):
+        try:
+            f = open(records_file, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            if not size:
+                return []
+            with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+                low = self._bisect(mm, size // RECORD.size, first)
+                high = self._bisect(mm, size // RECORD.size, last + 1)
+                records = list(RECORD.iter_unpack(mm[low * RECORD.size:high * RECORD.size]))
+        return bars.rows(records)
+
+    def _bisect(self, mm, count, seconds):
+        """Return index of first record with time >= seconds"""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from('<q', mm, middle * RECORD.size)[0] < seconds:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def series(self):
+        """Return list of (mtime, size, records_file, index_file) for every stored series, oldest first"""
+        ret = []
+        for name in os.listdir(self.path):
+            if name.endswith('.json'):
+                index_file = os.path.join(self.path, name)
+                records_file = index_file[:-5] + '.bars'
+                size = os.path.getsize(records_file) if os.path.exists(records_file) else 0
+                ret.append((os.path.getmtime(index_file), size, records_file, index_file))
+        return sorted(ret)
+
+    def evict(self):
+        """Remove series unused for max_age seconds, then least recently used series beyond max_bytes"""
+        with self._lock:
+            entries = self.series()
+            total = sum(e[1] for e in entries)
+            expire = time.time() - self.max_age if self.max_age else None
+            for mtime, size, records_file, index_file in entries:
+                if (expire and mtime < expire) or (self.max_bytes and total > self.max_bytes):
+                    for name in (records_file, index_file):
+                        if os.path.exists(name):
+                            os.remove(name)
+                    total -= size
+
+    def clear(self):
+        """Remove every stored series"""
+        with self._lock:
+            for _, _, records_file, index_file in self.series():
+                for name in (records_file, index_file):
+                    if os.path.exists(name):
+                        os.remove(name)
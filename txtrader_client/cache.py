@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  cache.py
+  --------
+
+  TxTrader Client module - bounded TTL response cache used by API
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache():
+    """Thread-safe LRU cache with a time to live per entry; keys are tuples whose first element is the method name"""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = {}
+        self.misses = {}
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (True, value) for a live entry, else (False, None)"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits[key[0]] = self.hits.get(key[0], 0) + 1
+                return True, entry[1]
+            if entry:
+                del self._data[key]
+            self.misses[key[0]] = self.misses.get(key[0], 0) + 1
+            return False, None
+
+    def put(self, key, value, ttl: float):
+        """Store value for ttl seconds, evicting the least recently used entries beyond maxsize"""
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, *names):
+        """Remove every entry cached for the named methods"""
+        with self._lock:
+            for key in [k for k in self._data if k[0] in names]:
+                del self._data[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """Return dict of hit, miss and invalidation counters and current size"""
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'hits': sum(self.hits.values()),
+                'misses': sum(self.misses.values()),
+                'invalidations': self.invalidations,
+                'methods': {
+                    name: {
+                        'hits': self.hits.get(name, 0),
+                        'misses': self.misses.get(name, 0)
+                    }
+                    for name in sorted(set(self.hits) | set(self.misses))
+                },
+            }
@@ -12,17 +12,24 @@
 """
 
 import click
+import csv
 import json
+import shlex
 import sys
+from time import monotonic, sleep
 
-from .client import API
+from .client import API, READ_ONLY
 from .version import VERSION as __version__
 from .defaults import *
 
 
 class _API(API):
 
-    def __init__(self, mode, protocol, host, port, username, password, account, route, verbose, compress):
+    batch = False
+
+    def __init__(
+        self, mode, protocol, host, port, username, password, account, route, verbose, compress, transport='http.client'
+    ):
         if not verbose:
             sys.excepthook = lambda exctype, exc, traceback: print("{}: {}".format(exctype.__name__, exc))
         config = {
@@ -33,6 +40,9 @@ class _API(API):
             'TXTRADER_PASSWORD': password,
             'TXTRADER_API_ACCOUNT': account,
             'TXTRADER_ROUTE': route,
+            'TXTRADER_TRANSPORT': transport,
+            # output is JSON; typed records set for library use in the environment are not serializable
+            'TXTRADER_RECORDS': 'dict',
         }
         self.compress = compress
         super().__init__(mode=mode, config=config)
@@ -44,6 +54,26 @@ class _API(API):
             print(json.dumps(response, sort_keys=True, indent=2, separators=(',', ': ')))
 
 
+class _Capture():
+    """Proxy for the shared _API that keeps the response a command passes to output() instead of printing it"""
+
+    batch = True
+
+    def __init__(self, api):
+        self.api = api
+        self.result = None
+
+    def __getattr__(self, name):
+        return getattr(self.api, name)
+
+    def output(self, response):
+        self.result = response
+
+
+# commands that cannot run inside batch or watch
+BATCH_EXCLUDED = {'batch', 'watch', 'help'}
+
+
 @click.group()
 @click.option('--protocol', default=TXTRADER_PROTOCOL, envvar='TXTRADER_PROTOCOL')
 @click.option('-h', '--host', default=TXTRADER_HOST, envvar='TXTRADER_HOST')
@@ -62,10 +92,17 @@ class _API(API):
 @click.option('-m', '--mode', default=TXTRADER_MODE, envvar='TXTRADER_MODE', help='mode passed to txTrader client init')
 @click.option('-v', '--verbose/--no_verbose', default=False, help='output detailed error diagnostics')
 @click.option('-c', '--compress/--no_compress', default=False, help='minimize JSON output')
+@click.option(
+    '--transport',
+    type=click.Choice(['http.client', 'requests']),
+    default='http.client',
+    envvar='TXTRADER_TRANSPORT',
+    help='HTTP client library; http.client starts fastest'
+)
 @click.version_option(version=__version__)
 @click.pass_context
-def cli(ctx, protocol, host, port, username, password, account, route, mode, verbose, compress):
-    ctx.obj = _API(mode, protocol, host, port, username, password, account, route, verbose, compress)
+def cli(ctx, protocol, host, port, username, password, account, route, mode, verbose, compress, transport):
+    ctx.obj = _API(mode, protocol, host, port, username, password, account, route, verbose, compress, transport)
 
 
 @cli.command('status', short_help='output current API connection status')
@@ -273,20 +310,52 @@ def cover(api, symbol, quantity, staged, stop, limit, force):
 
 
 @cli.command('submit', short_help='Submit an order to buy/sell/sell-short, returning dict containing new order fields')
-@click.argument('action', type=click.Choice(['BUY', 'SELL', 'SELLSHORT', 'BUYTOCOVER'], case_sensitive=False))
-@click.argument('quantity', type=int)
-@click.argument('symbol', type=str)
+@click.argument(
+    'action', type=click.Choice(['BUY', 'SELL', 'SELLSHORT', 'BUYTOCOVER'], case_sensitive=False), required=False
+)
+@click.argument('quantity', type=int, required=False)
+@click.argument('symbol', type=str, required=False)
 @click.option('--staged', type=str, default='', help='submit as staged order with tag', metavar='<tag>')
 @click.option('-s', '--stop', type=float, default=None, help='specify a stop price', metavar='<stop_price>')
 @click.option('-l', '--limit', type=float, default=None, help='specify a limit price', metavar='<limit_price>')
 @click.option(
     '-f', '--force/--noforce', is_flag=True, default=False, help='transmit the order without a confirmation prompt'
 )
+@click.option(
+    '--from-file',
+    type=click.File('r'),
+    default=None,
+    help='submit every order in a CSV file with header row (symbol,quantity,action,type,limit_price,stop_price,tag,...)'
+)
+@click.option(
+    '--max-in-flight', type=int, default=None, help='orders awaiting a response at once with --from-file', metavar='<n>'
+)
 @click.pass_obj
-def submit(api, action, symbol, quantity, staged, stop, limit, force):
+def submit(api, action, symbol, quantity, staged, stop, limit, force, from_file, max_in_flight):
+    if from_file:
+        if action or quantity or symbol or staged or stop or limit:
+            raise click.UsageError('--from-file cannot be combined with an order on the command line')
+        return _submit_orders(api, from_file, force, max_in_flight)
+    if not (action and quantity and symbol):
+        raise click.UsageError('ACTION QUANTITY SYMBOL are required unless --from-file is given')
     return _submit_trade(api, action, symbol, quantity, staged, stop, limit, force)
 
 
+def _submit_orders(api, file, force, max_in_flight):
+    # DictReader gives None for the fields missing from a short row
+    orders = [{k.strip(): (v or '').strip() or None for k, v in row.items() if k} for row in csv.DictReader(file)]
+    try:
+        calls = api._order_calls(orders)
+    except ValueError as ex:
+        raise click.UsageError(str(ex))
+    if not force:
+        if api.batch:
+            raise click.UsageError('orders in a batch cannot be confirmed interactively; use --force')
+        click.confirm(f'Submit {len(calls)} orders from {file.name}... Confirm?', abort=True)
+    results = api._run_all(calls, max_in_flight)
+    api.output([{'error': f'{type(r).__name__}: {r}'} if isinstance(r, Exception) else r for r in results])
+
+
 def _submit_trade(api, action, symbol, quantity, staged, stop, limit, force):
     symbol = symbol.upper()
     account = api.account
@@ -307,6 +376,8 @@ def _submit_trade(api, action, symbol, quantity, staged, stop, limit, force):
         submit = api.market_order
         _limit = ''
     if not force:
+        if api.batch:
+            raise click.UsageError('orders in a batch cannot be confirmed interactively; use --force')
         _staged = 'staged ' if staged else ''
         _ticket = f" with ticket '{staged}'" if staged else ''
         description = f'{_staged}{order_type} order to {action} {abs(quantity)} {symbol}{_limit}{_ticket} account={account} route={route}'
@@ -446,5 +517,171 @@ def help(api):
         print(_help[cmd])
 
 
+def _command_name(line):
+    try:
+        return shlex.split(line)[0]
+    except ValueError:
+        return None
+
+
+def _invoke(ctx, args):
+    """Run subcommand args against the shared _API; return the response it would have output"""
+    command = cli.get_command(ctx, args[0])
+    if not command or args[0] in BATCH_EXCLUDED:
+        raise click.UsageError(f'unknown batch command {args[0]!r}')
+    capture = _Capture(ctx.obj)
+    with command.make_context(args[0], args[1:], parent=ctx, obj=capture) as command_ctx:
+        command.invoke(command_ctx)
+    return capture.result
+
+
+def _run_batch_line(ctx, number, line):
+    """Run one batch command line; return its NDJSON record dict"""
+    ret = {'line': number, 'command': line}
+    try:
+        ret['result'] = _invoke(ctx, shlex.split(line))
+    except click.ClickException as ex:
+        ret['error'] = ex.format_message()
+    except Exception as ex:
+        ret['error'] = f'{type(ex).__name__}: {ex}'
+    return ret
+
+
+@cli.command('batch', short_help='run command lines from FILE (default stdin) on one connection, output NDJSON results')
+@click.argument('input', type=click.File('r'), default='-')
+@click.option(
+    '-j',
+    '--parallel',
+    type=click.IntRange(min=1),
+    default=1,
+    metavar='<count>',
+    help='run up to <count> consecutive read-only commands concurrently'
+)
+@click.pass_context
+def batch(ctx, input, parallel):
+    """Each line of FILE is a txtrader subcommand with its arguments; blank lines and # comments are skipped.
+
+    One JSON object is written per command, in input order: {"line", "command", "result"} or {"line", "command",
+    "error"}.  A failed command does not stop the batch; the exit status is 1 if any command failed.
+    """
+    api = ctx.obj
+    api.pool_size = max(api.pool_size, parallel)
+    failed = False
+    pending = []
+
+    def emit(record):
+        nonlocal failed
+        failed = failed or 'error' in record
+        print(json.dumps(record), flush=True)
+
+    def drain():
+        for future in pending:
+            emit(future.result())
+        pending.clear()
+
+    pool = None
+    try:
+        for number, line in enumerate(input, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if parallel > 1 and _command_name(line) in READ_ONLY:
+                if not pool:
+                    from concurrent.futures import ThreadPoolExecutor
+                    pool = ThreadPoolExecutor(max_workers=parallel)
+                pending.append(pool.submit(_run_batch_line, ctx, number, line))
+            else:
+                # commands that change server state wait for everything before them and run alone
+                drain()
+                emit(_run_batch_line(ctx, number, line))
+        drain()
+    finally:
+        if pool:
+            pool.shutdown()
+    api.close()
+    if failed:
+        ctx.exit(1)
+
+
+def _flatten(value, path='$'):
+    """Return dict of JSONPath-like path: scalar for every leaf of a decoded JSON value"""
+    if isinstance(value, dict) and value:
+        items = ((f'{path}.{k}', v) for k, v in value.items())
+    elif isinstance(value, list) and value:
+        items = ((f'{path}[{i}]', v) for i, v in enumerate(value))
+    else:
+        return {path: value}
+    ret = {}
+    for key, item in items:
+        ret.update(_flatten(item, key))
+    return ret
+
+
+def _diff(old, new):
+    """Return dict of changed, added and removed leaf fields between two responses"""
+    old, new = _flatten(old), _flatten(new)
+    ret = {
+        'changed': {k: [old[k], new[k]] for k in new if k in old and old[k] != new[k]},
+        'added': {k: new[k] for k in new if k not in old},
+        'removed': {k: old[k] for k in old if k not in new},
+    }
+    return {k: v for k, v in ret.items() if v}
+
+
+@cli.command(
+    'watch',
+    short_help='repeat a read-only command on one connection, output only when the response changes',
+    context_settings={'ignore_unknown_options': True}
+)
+@click.option('-n', '--interval', type=float, default=2.0, metavar='<seconds>', help='seconds between requests')
+@click.option('-d', '--diff', is_flag=True, default=False, help='output changed fields instead of the full response')
+@click.option('--count', type=click.IntRange(min=1), default=None, metavar='<count>', help='stop after <count> requests')
+@click.argument('command', nargs=-1, required=True, type=click.UNPROCESSED)
+@click.pass_context
+def watch(ctx, interval, diff, count, command):
+    """Run COMMAND every <seconds> over a kept-alive connection, e.g. `txtrader watch -n 1 query_symbol TSLA`.
+
+    The first response is output in full; after that only changed responses are output, as a field diff with
+    --diff.  Errors are written to stderr when they first occur and polling continues.
+    """
+    if command[0] not in READ_ONLY or command[0] in BATCH_EXCLUDED:
+        raise click.UsageError(f'watch requires a read-only command, not {command[0]!r}')
+    api = ctx.obj
+    last = error = None
+    seen = False
+    polls = 0
+    deadline = monotonic()
+    try:
+        while True:
+            try:
+                ret = _invoke(ctx, list(command))
+            except click.ClickException:
+                raise
+            except Exception as ex:
+                message = f'{type(ex).__name__}: {ex}'
+                if message != error:
+                    click.echo(message, err=True)
+                error = message
+            else:
+                if not seen or ret != last:
+                    api.output(_diff(last, ret) if diff and seen else ret)
+                    sys.stdout.flush()
+                last, error, seen = ret, None, True
+            polls += 1
+            if count and polls >= count:
+                break
+            deadline += interval
+            delay = deadline - monotonic()
+            if delay > 0:
+                sleep(delay)
+            else:
+                # a slow response delays the schedule instead of triggering back to back requests
+                deadline -= delay
+    except KeyboardInterrupt:
+        pass
+    finally:
+        api.close()
+
+
 if __name__ == '__main__':
     cli()
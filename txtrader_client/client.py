@@ -11,29 +11,185 @@
 
 """
 
+import contextlib
+import contextvars
+import copy
+import functools
+import json
 import os
 import sys
-import requests
+import threading
+import time
+from collections import namedtuple
+from http import HTTPStatus
 from types import *
 import re
 
 from txtrader_client.version import VERSION
+from txtrader_client.cache import TTLCache
+from txtrader_client import bars
+from txtrader_client.barstore import BarStore
+from txtrader_client.metrics import CallRecord, Metrics
+from txtrader_client.decoder import ItemParser, get_decoder
+from txtrader_client import records
 import txtrader_client.defaults
 
+# default response cache time to live in seconds for read-mostly methods, used when TXTRADER_CACHE is enabled
+CACHE_TTL = {
+    'help': 3600,
+    'version': 3600,
+    'query_accounts': 300,
+    'get_order_route': 60,
+    'query_symbols': 10,
+}
+
+# server functions that do not change server state; safe to run concurrently, repeat or share
+READ_ONLY = frozenset(
+    [
+        'help', 'status', 'uptime', 'time', 'version', 'query_symbols', 'query_all_symbols', 'query_symbol',
+        'query_symbol_data', 'query_symbol_bars', 'query_accounts', 'query_account', 'query_positions', 'query_order',
+        'query_orders', 'query_tickets', 'query_execution', 'query_order_executions', 'query_executions', 'query_bars',
+        'get_order_route'
+    ]
+)
+
+# server functions that enter or cancel orders; they may use the limiter's reserved capacity
+ORDER_FUNCTIONS = frozenset(
+    [
+        'market_order', 'stage_market_order', 'limit_order', 'stop_order', 'stoplimit_order', 'cancel_order',
+        'global_cancel'
+    ]
+)
+
+# final order statuses wait_for_fill() returns on, besides 'Error'
+FILL_STATUSES = ('Filled', 'Cancelled', 'Canceled', 'Rejected')
+
+# submit_orders() action: quantity sign
+ORDER_ACTIONS = {'BUY': 1, 'SELL': -1, 'SELLSHORT': -1, 'BUYTOCOVER': 1}
+ORDER_FIELDS = ('symbol', 'quantity', 'action', 'type', 'limit_price', 'stop_price', 'tag', 'account', 'route')
+
+# TXTRADER_TRANSPORT values and their txtrader_client.transport classes, imported on first use
+TRANSPORTS = {
+    'requests': 'RequestsTransport',
+    'http.client': 'HTTPClientTransport',
+}
+
+
+class _OrderWait():
+    """Track a set of order ids across query_orders() snapshots, with adaptive backoff between polls"""
+
+    def __init__(self, order_ids, statuses, timeout, interval, max_interval):
+        self.pending = {str(order_id): None for order_id in order_ids}
+        self.terminal = set(s.lower() for s in statuses) | {'error'}
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.interval = interval
+        self.max_interval = max_interval
+        self.delay = interval
+
+    def update(self, orders):
+        """Return list of (order_id, order) that reached a terminal status in this snapshot"""
+        done = []
+        changed = False
+        for order_id, last_status in list(self.pending.items()):
+            order = orders.get(order_id)
+            if not order:
+                continue
+            status = order.get('status')
+            if status != last_status:
+                changed = True
+                self.pending[order_id] = status
+            if str(status).lower() in self.terminal:
+                del self.pending[order_id]
+                done.append((order_id, order))
+        self.delay = self.interval if changed else min(self.delay * 2, self.max_interval)
+        return done
+
+    def next_delay(self):
+        """Return seconds to sleep before the next poll; raise TimeoutError when the deadline has passed"""
+        if self.deadline is None:
+            return self.delay
+        remaining = self.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f'timeout waiting for orders: {", ".join(self.pending)}')
+        return min(self.delay, remaining)
+
+
+class TxTraderTimeout(TimeoutError):
+    """Raised when a server call exceeds its connect or read timeout or the deadline set with API.timeout()"""
+
+
+# deadline (time.monotonic() value or None) and connect/read timeout overrides set by API.timeout()
+_Limits = namedtuple('_Limits', ['deadline', 'connect', 'read'])
+_limits = contextvars.ContextVar('txtrader_limits', default=_Limits(None, None, None))
+
+
+def _flight_key(function_name, args):
+    """Return key identifying identical calls for single-flight coalescing"""
+    return function_name, json.dumps(args, sort_keys=True) if args else ''
+
+
+def _overloaded(status):
+    """Return True if an HTTP status tells the limiter to back off"""
+    return status == HTTPStatus.TOO_MANY_REQUESTS or status >= 500
+
+
+def _cached(method):
+    """Serve method results from the API response cache while it is enabled"""
+
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        if not self.cache:
+            return method(self, *args)
+        key = (method.__name__, ) + args
+        found, ret = self.cache.get(key)
+        if not found:
+            ret = method(self, *args)
+            self.cache.put(key, ret, self.cache_ttl.get(method.__name__, 0))
+        return copy.deepcopy(ret)
+
+    return wrapper
+
+
+def _invalidates(*names):
+    """Drop cached results of the named methods after the decorated method is called"""
+
+    def decorator(method):
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                if self.cache:
+                    self.cache.invalidate(*names)
+
+        return wrapper
+
+    return decorator
+
+
+def _unchanged(value):
+    return value
+
+
+def _load_config(config):
+    # 1st: confguration default values from module defaults
+    defaults = {
+        k: getattr(txtrader_client.defaults, k)
+        for k in dir(txtrader_client.defaults) if not k.startswith('__')
+    }
+    # 2nd: any variables set in environment override defaults
+    ret = {k: os.environ.get(k, defaults[k]) for k in defaults}
+    # 3rd: parameters passed in config take highest priority
+    ret.update(config)
+    return ret
+
 
 class API():
 
     def __init__(self, mode='rtx', config={}):
 
-        # 1st: confguration default values from module defaults
-        defaults = {
-            k: getattr(txtrader_client.defaults, k)
-            for k in dir(txtrader_client.defaults) if not k.startswith('__')
-        }
-        # 2nd: any variables set in environment override defaults
-        self.config = {k: os.environ.get(k, defaults[k]) for k in defaults}
-        # 3rd: parameters passed in config take highest priority
-        self.config.update(config)
+        self.config = _load_config(config)
 
         protocol = self._config('PROTOCOL')
         hostname = self._config('HOST')
@@ -46,6 +202,64 @@ class API():
         self.account = self._config('API_ACCOUNT')
         self.route = self._config('ROUTE')
 
+        self.keepalive = self._config_flag('KEEPALIVE')
+        self.connect_timeout = self._config_seconds('CONNECT_TIMEOUT')
+        self.read_timeout = self._config_seconds('READ_TIMEOUT')
+        self.compression = self._config_flag('COMPRESSION')
+        self.compress_min = self._config_int('COMPRESS_REQUESTS')
+        self.pool_size = self._config_int('POOL_SIZE')
+        self.transport = self._config('TRANSPORT')
+        if self.transport not in TRANSPORTS:
+            raise ValueError(f'unknown TXTRADER_TRANSPORT {self.transport!r}; expected one of {", ".join(TRANSPORTS)}')
+        self._transport = None
+        self._transport_lock = threading.Lock()
+        self.decode = get_decoder(self._config('JSON'))
+        if self._config('RECORDS') not in ('dict', 'typed'):
+            raise ValueError(f"unknown TXTRADER_RECORDS {self._config('RECORDS')!r}; expected dict or typed")
+        self.typed = self._config('RECORDS') == 'typed'
+
+        self.cache_ttl = dict(CACHE_TTL)
+        ttl = self._config('CACHE_TTL')
+        if type(ttl) == str:
+            ttl = dict(item.split('=') for item in ttl.split(',') if item)
+        self.cache_ttl.update({k.strip(): float(v) for k, v in ttl.items()})
+        self.cache = TTLCache(self._config_int('CACHE_SIZE')) if self._config_flag('CACHE') else None
+
+        self.metrics = Metrics() if self._config_flag('METRICS') else None
+        self.limiter = None
+        if self._config_flag('LIMITER'):
+            from txtrader_client.limiter import get_limiter
+            self.limiter = get_limiter(
+                self.url,
+                minimum=self._config_int('LIMITER_MIN'),
+                maximum=int(self._config('LIMITER_MAX') or self.pool_size),
+                reserved=self._config_int('LIMITER_RESERVED'),
+                tolerance=float(self._config('LIMITER_TOLERANCE')),
+                backoff=float(self._config('LIMITER_BACKOFF'))
+            )
+        self.hedge = None
+        if self._config_flag('HEDGE'):
+            from txtrader_client.hedge import Hedge
+            self.hedge = Hedge(float(self._config('HEDGE_PERCENTILE')), self.pool_size)
+        self.coalesce = None
+        if self._config_flag('COALESCE'):
+            from txtrader_client.coalesce import SingleFlight
+            self.coalesce = SingleFlight()
+        self.call_hook = None
+
+        self.bar_store = None
+        if self._config('BAR_CACHE'):
+            self.bar_store = BarStore(
+                self._config('BAR_CACHE'), self._config_int('BAR_CACHE_MAX_BYTES'),
+                float(self._config('BAR_CACHE_MAX_AGE'))
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
     def _config(self, key):
         name = f'TXTRADER_{key}'
         try:
@@ -54,20 +268,220 @@ class API():
             raise ex(f'missing config value {name}')
         return ret
 
+    def _config_flag(self, key):
+        value = self._config(key)
+        if type(value) == str:
+            value = value.strip().lower() in ('1', 'true', 'yes', 'on')
+        return bool(value)
+
+    def _config_int(self, key):
+        return int(self._config(key))
+
+    def _config_seconds(self, key):
+        """Return float seconds, or None (no limit) for an empty or zero value"""
+        value = self._config(key)
+        return float(value) if value not in (None, '') and float(value) > 0 else None
+
+    @contextlib.contextmanager
+    def timeout(self, seconds: float = None, connect: float = None, read: float = None):
+        """Context in which server calls must finish within seconds from now, optionally overriding the connect and
+        read timeouts; applies to the calling thread or task and to workers started by *_many and submit_orders"""
+        outer = _limits.get()
+        deadline = outer.deadline
+        if seconds is not None:
+            deadline = min(d for d in (deadline, time.monotonic() + seconds) if d is not None)
+        token = _limits.set(
+            _Limits(deadline, outer.connect if connect is None else connect, outer.read if read is None else read)
+        )
+        try:
+            yield
+        finally:
+            _limits.reset(token)
+
+    def _timeouts(self, function_name):
+        """Return (connect, read, remaining) seconds for a call starting now; raise TxTraderTimeout past the deadline"""
+        limits = _limits.get()
+        connect = self.connect_timeout if limits.connect is None else limits.connect
+        read = self.read_timeout if limits.read is None else limits.read
+        if limits.deadline is None:
+            return connect, read, None
+        remaining = limits.deadline - time.monotonic()
+        if remaining <= 0:
+            raise TxTraderTimeout(f'deadline exceeded before calling {function_name}')
+        return min(connect or remaining, remaining), min(read or remaining, remaining), remaining
+
+    def _get_transport(self):
+        """Return the shared transport, creating it (and importing its HTTP stack) on first use"""
+        if not self._transport:
+            with self._transport_lock:
+                if not self._transport:
+                    from txtrader_client import transport
+                    self._transport = getattr(transport, TRANSPORTS[self.transport])(
+                        self.url, self.username, self.password, self.keepalive, self.pool_size, self.compression,
+                        self.compress_min
+                    )
+        return self._transport
+
+    def close(self):
+        """Close all pooled server connections"""
+        if self.hedge:
+            self.hedge.close()
+        with self._transport_lock:
+            if self._transport:
+                self._transport.close()
+                self._transport = None
+
+    def _send(self, function_name, body):
+        """Send one request (POST if body else GET) and return the response with its content read"""
+        if self.hedge is not None and function_name in READ_ONLY:
+            return self.hedge.run(function_name, lambda: self._send_once(function_name, body))
+        return self._send_once(function_name, body)
+
+    def _acquire(self, function_name):
+        """Wait within the deadline for a limiter slot (if limiting); return the (connect, read) timeouts left"""
+        connect, read, remaining = self._timeouts(function_name)
+        if self.limiter is None:
+            return connect, read
+        if not self.limiter.acquire(function_name in ORDER_FUNCTIONS, remaining):
+            raise TxTraderTimeout(f'deadline exceeded waiting for a request slot for {function_name}')
+        try:
+            # the wait for a slot used part of the remaining time
+            return self._timeouts(function_name)[:2]
+        except TxTraderTimeout:
+            self.limiter.release()
+            raise
+
+    def _send_once(self, function_name, body):
+        timeout = self._acquire(function_name)
+        if self.limiter is None:
+            return self._get_transport().send(function_name, body, timeout)
+        start = time.perf_counter()
+        dropped = True
+        try:
+            r = self._get_transport().send(function_name, body, timeout)
+            dropped = _overloaded(r.status_code)
+            return r
+        finally:
+            self.limiter.release(time.perf_counter() - start, dropped)
+
     def _call_txtrader_api(self, function_name, args):
-        headers = {'Content-type': 'application/json', 'Connection': 'close'}
-        parameters = dict(headers=headers, auth=(self.username, self.password))
-        if args:
-            method = requests.post
-            parameters['json'] = args
-        else:
-            method = requests.get
-        with method(f"{self.url}/{function_name}", **parameters) as r:
-            if r.status_code != requests.codes.ok:
+        if self.coalesce is not None and function_name in READ_ONLY:
+            return self.coalesce.do(
+                _flight_key(function_name, args), lambda: self._call_once(function_name, args),
+                self._timeouts(function_name)[2]
+            )
+        return self._call_once(function_name, args)
+
+    def _call_once(self, function_name, args):
+        body = json.dumps(args).encode() if args else None
+        if self.metrics is None and self.call_hook is None:
+            r = self._send(function_name, body)
+            if r.status_code != HTTPStatus.OK:
+                r.raise_for_status()
+            return self.decode(r.content)
+        start = time.perf_counter()
+        status = None
+        response_bytes = 0
+        error = None
+        try:
+            r = self._send(function_name, body)
+            status = r.status_code
+            response_bytes = len(r.content)
+            if r.status_code != HTTPStatus.OK:
                 r.raise_for_status()
-            ret = r.json()
+            return self.decode(r.content)
+        except Exception as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            self._record(
+                CallRecord(
+                    function_name, 'POST' if body else 'GET', status,
+                    time.perf_counter() - start, len(body or b''), response_bytes, error
+                )
+            )
+
+    def _typed(self, convert, ret):
+        """Return convert(ret) (see records) when TXTRADER_RECORDS is 'typed', otherwise ret"""
+        return convert(ret) if self.typed else ret
+
+    def _iter_txtrader_api(self, function_name, args, record=None):
+        """Yield (key, value) members of a JSON object response, parsed as it is read from the connection"""
+        body = json.dumps(args).encode() if args else None
+        convert = record.from_dict if record and self.typed else _unchanged
+        start = time.perf_counter()
+        status = None
+        response_bytes = 0
+        error = None
+        try:
+            timeout = self._acquire(function_name)
+            sent = time.perf_counter()
+            latency = None
+            dropped = True
+            try:
+                with self._get_transport().stream(function_name, body, timeout=timeout) as (r, chunks):
+                    # the limiter samples the time to the response head; the body is read as the caller consumes it
+                    latency = time.perf_counter() - sent
+                    dropped = _overloaded(r.status_code)
+                    status = r.status_code
+                    if r.status_code != HTTPStatus.OK:
+                        r.raise_for_status()
+                    parser = ItemParser()
+                    for chunk in chunks:
+                        response_bytes += len(chunk)
+                        for key, value in parser.feed(chunk):
+                            yield key, convert(value)
+                    for key, value in parser.feed(b'', final=True):
+                        yield key, convert(value)
+            finally:
+                if self.limiter is not None:
+                    self.limiter.release(time.perf_counter() - sent if latency is None else latency, dropped)
+        except Exception as ex:
+            error = type(ex).__name__
+            raise
+        finally:
+            if self.metrics is not None or self.call_hook is not None:
+                # latency includes the time the caller spent consuming items
+                self._record(
+                    CallRecord(
+                        function_name, 'POST' if body else 'GET', status,
+                        time.perf_counter() - start, len(body or b''), response_bytes, error
+                    )
+                )
+
+    def _record(self, record):
+        if self.metrics:
+            self.metrics.record(record)
+        if self.call_hook:
+            self.call_hook(record)
+
+    def snapshot(self):
+        """Return dict keyed by server function name of call metrics; empty unless TXTRADER_METRICS is enabled"""
+        return self.metrics.snapshot() if self.metrics else {}
+
+    def _run_all(self, calls, max_workers):
+        """Run method(*args) for each (method, args) on a bounded thread pool; return list of results or exceptions"""
+        if not calls:
+            return []
+        from concurrent.futures import ThreadPoolExecutor
+        workers = max(1, min(max_workers or self.pool_size, len(calls)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # each worker runs in a copy of the caller's context, so API.timeout() deadlines apply to it
+            futures = [pool.submit(contextvars.copy_context().run, method, *args) for method, args in calls]
+        ret = []
+        for future in futures:
+            try:
+                ret.append(future.result())
+            except Exception as ex:
+                ret.append(ex)
         return ret
 
+    def _fan_out(self, method, symbols, max_workers):
+        """Call method(symbol) for each symbol on a bounded thread pool; return dict of results or exceptions"""
+        symbols = list(dict.fromkeys(symbols))
+        return dict(zip(symbols, self._run_all([(method, (symbol, )) for symbol in symbols], max_workers)))
+
+    @_cached
     def help(self):
         """Return dict containing brief documentation for each server API call"""
         return self._call_txtrader_api('help', {})
@@ -76,6 +490,7 @@ class API():
         """return string describing current API connection status"""
         return self._call_txtrader_api('status', {})
 
+    @_cached
     def version(self):
         """Return string containing release version of current server instance"""
         return self._call_txtrader_api('version', {})
@@ -92,12 +507,13 @@ class API():
         """Return formatted timestamp string (YYYY-MM-DD HH:MM:SS) matching latest datafeed time update"""
         return self._call_txtrader_api('time', {})
 
-    def query_symbol_bars(self, symbol: str):
-        """Return array of current live bar data for given symbol"""
-        return self._call_txtrader_api('query_symbol_bars', {'symbol': symbol})
+    def query_symbol_bars(self, symbol: str, columnar: bool = False):
+        """Return array of current live bar data for given symbol; columnar=True returns typed columns (see bars.columns)"""
+        ret = self._call_txtrader_api('query_symbol_bars', {'symbol': symbol})
+        return bars.columns(ret) if columnar else ret
 
-    def query_bars(self, symbol, period, start, end):
-        """Return array of bar data for symbol=<str> period=<minutes_as_integer|hour|day|month> start,end='YYYY-MM-DD HH:MM[:00]'"""
+    def query_bars(self, symbol, period, start, end, columnar: bool = False):
+        """Return array of bar data for symbol=<str> period=<minutes_as_integer|hour|day|month> start,end='YYYY-MM-DD HH:MM[:00]'; columnar=True returns typed columns (see bars.columns)"""
         if type(symbol) != str:
             raise TypeError('symbol: %s' % repr(symbol))
 
@@ -123,33 +539,60 @@ class API():
             elif type(value) != int:
                 raise TypeError('%s: %s' % (label, repr(value)))
 
+        if self.bar_store and BarStore.cacheable(start, end):
+            ret = self.bar_store.query(self._fetch_bars, symbol, period, start, end, self.time)
+        else:
+            ret = self._fetch_bars(symbol, period, start, end)
+        return bars.columns(ret) if columnar else ret
+
+    def _fetch_bars(self, symbol, period, start, end):
         args = {'symbol': symbol, 'period': period, 'start': start, 'end': end}
         return self._call_txtrader_api('query_bars', args)
 
+    @_invalidates('query_symbols')
     def add_symbol(self, symbol: str):
         """Request subscription to a symbol for price updates, bardata and order entry"""
         return self._call_txtrader_api('add_symbol', {'symbol': symbol})
 
+    @_invalidates('query_symbols')
     def del_symbol(self, symbol: str):
         """Delete subscription to a symbol for price updates and order entry"""
         return self._call_txtrader_api('del_symbol', {'symbol': symbol})
 
+    @_cached
     def query_symbols(self):
         """Return the list of active symbols"""
         return self._call_txtrader_api('query_symbols', {'data': False})
 
     def query_all_symbols(self):
         """Return dict keyed by symbol containing current data for all active symbols"""
-        return self._call_txtrader_api('query_symbols', {'data': True})
+        return self._typed(records.each(records.Quote), self._call_txtrader_api('query_symbols', {'data': True}))
+
+    def iter_symbols(self):
+        """Yield (symbol, data) for all active symbols, parsed incrementally from the query_all_symbols response"""
+        return self._iter_txtrader_api('query_symbols', {'data': True}, records.Quote)
 
     def query_symbol(self, symbol: str):
         """Return dict containing current data for given symbol"""
-        return self._call_txtrader_api('query_symbol', {'symbol': symbol})
+        return self._typed(records.Quote.from_dict, self._call_txtrader_api('query_symbol', {'symbol': symbol}))
 
     def query_symbol_data(self, symbol: str):
         """Return dict containing rawdata for given symbol"""
         return self._call_txtrader_api('query_symbol_data', {'symbol': symbol})
 
+    def query_symbol_many(self, symbols, max_workers: int = None):
+        """Return dict keyed by symbol containing current data for each symbol, or the exception raised for it"""
+        return self._fan_out(self.query_symbol, symbols, max_workers)
+
+    def query_symbol_data_many(self, symbols, max_workers: int = None):
+        """Return dict keyed by symbol containing rawdata for each symbol, or the exception raised for it"""
+        return self._fan_out(self.query_symbol_data, symbols, max_workers)
+
+    def query_symbol_bars_many(self, symbols, max_workers: int = None):
+        """Return dict keyed by symbol containing live bar data for each symbol, or the exception raised for it"""
+        return self._fan_out(self.query_symbol_bars, symbols, max_workers)
+
+    @_cached
     def query_accounts(self):
         """Return array of account names"""
         return self._call_txtrader_api('query_accounts', {})
@@ -164,6 +607,7 @@ class API():
         ret = self._call_txtrader_api('query_account', args)
         return ret
 
+    @_invalidates('query_accounts', 'query_account')
     def set_account(self, account: str):
         """Select current active trading account"""
         ret = self._call_txtrader_api('set_account', {'account': account})
@@ -173,19 +617,38 @@ class API():
 
     def query_positions(self):
         """Return dict keyed by account containing dicts of position data fields"""
-        return self._call_txtrader_api('query_positions', {})
+        return self._typed(records.positions, self._call_txtrader_api('query_positions', {}))
 
     def query_orders(self):
         """Return dict keyed by order id containing dicts of order data fields"""
-        return self._call_txtrader_api('query_orders', {})
+        return self._typed(records.each(records.Order), self._call_txtrader_api('query_orders', {}))
+
+    def iter_orders(self):
+        """Yield (order_id, order) pairs, parsed incrementally from the query_orders response"""
+        return self._iter_txtrader_api('query_orders', {}, records.Order)
 
     def query_tickets(self):
         """Return dict keyed by order id containing dicts of staged order ticket data fields"""
-        return self._call_txtrader_api('query_tickets', {})
+        return self._typed(records.each(records.Order), self._call_txtrader_api('query_tickets', {}))
 
     def query_order(self, order_id: str):
         """Return dict containing order/ticket status fields for given order id"""
-        return self._call_txtrader_api('query_order', {'id': order_id})
+        return self._typed(records.Order.from_dict, self._call_txtrader_api('query_order', {'id': order_id}))
+
+    def wait_for_orders(
+        self, order_ids, statuses=('Filled',), timeout: float = None, interval: float = 0.1, max_interval: float = 2.0
+    ):
+        """Yield (order_id, order) as each order reaches one of statuses or 'Error'; raise TimeoutError after timeout seconds"""
+        wait = _OrderWait(order_ids, statuses, timeout, interval, max_interval)
+        while wait.pending:
+            yield from wait.update(self.query_orders())
+            if wait.pending:
+                time.sleep(wait.next_delay())
+
+    def wait_for_fill(self, order_id: str, timeout: float = None):
+        """Wait for an order to be filled, cancelled or rejected, returning its final order dict"""
+        for _, order in self.wait_for_orders([order_id], FILL_STATUSES, timeout):
+            return order
 
     def cancel_order(self, order_id: str):
         """Request cancellation of a pending order"""
@@ -193,27 +656,35 @@ class API():
 
     def query_order_executions(self, order_id: str):
         """Return dict keyed by execution id containing dicts of execution report data fields for given order_id"""
-        return self._call_txtrader_api('query_order_executions', {'id': order_id})
+        ret = self._call_txtrader_api('query_order_executions', {'id': order_id})
+        return self._typed(records.each(records.Execution), ret)
 
     def query_execution(self, execution_id: str):
         """Return dict containing execution report data fields for given execution id"""
-        return self._call_txtrader_api('query_execution', {'id': execution_id})
+        ret = self._call_txtrader_api('query_execution', {'id': execution_id})
+        return self._typed(records.Execution.from_dict, ret)
 
     def query_executions(self):
         """Return dict keyed by execution id containing dicts of execution report data fields"""
-        return self._call_txtrader_api('query_executions', {})
+        return self._typed(records.each(records.Execution), self._call_txtrader_api('query_executions', {}))
+
+    def iter_executions(self):
+        """Yield (execution_id, execution) pairs, parsed incrementally from the query_executions response"""
+        return self._iter_txtrader_api('query_executions', {}, records.Execution)
 
+    @_invalidates('get_order_route')
     def set_order_route(self, route: str):
         """Set order route data given route {'route_name': {parameter: value, ...} (JSON string will be parsed into a route dict)}"""
         return self._call_txtrader_api('set_order_route', {'route': route})
 
+    @_cached
     def get_order_route(self):
         """Return current order route as a dict"""
         return self._call_txtrader_api('get_order_route', {})
 
     def market_order(self, account: str, route: str, symbol: str, quantity: int):
         """Submit a market order, returning dict containing new order fields"""
-        return self._call_txtrader_api(
+        ret = self._call_txtrader_api(
             'market_order', {
                 'account': account,
                 'route': route,
@@ -221,10 +692,11 @@ class API():
                 'quantity': quantity
             }
         )
+        return self._typed(records.Order.from_dict, ret)
 
     def stage_market_order(self, tag: str, account: str, route: str, symbol: str, quantity: int):
         """Submit a staged market order (displays as staged in GUI, requiring manual aproval), returning dict containing new order fields"""
-        return self._call_txtrader_api(
+        ret = self._call_txtrader_api(
             'stage_market_order', {
                 'tag': tag,
                 'account': account,
@@ -233,10 +705,11 @@ class API():
                 'quantity': quantity
             }
         )
+        return self._typed(records.Order.from_dict, ret)
 
     def limit_order(self, account: str, route: str, symbol: str, limit_price: float, quantity: int):
         """Submit a limit order, returning dict containing new order fields"""
-        return self._call_txtrader_api(
+        ret = self._call_txtrader_api(
             'limit_order', {
                 'account': account,
                 'route': route,
@@ -245,10 +718,11 @@ class API():
                 'quantity': quantity
             }
         )
+        return self._typed(records.Order.from_dict, ret)
 
     def stop_order(self, account: str, route: str, symbol: str, stop_price: float, quantity: int):
         """Submit a stop order, returning dict containing new order fields"""
-        return self._call_txtrader_api(
+        ret = self._call_txtrader_api(
             'stop_order', {
                 'account': account,
                 'route': route,
@@ -257,12 +731,13 @@ class API():
                 'quantity': quantity
             }
         )
+        return self._typed(records.Order.from_dict, ret)
 
     def stoplimit_order(
         self, account: str, route: str, symbol: str, stop_price: float, limit_price: float, quantity: int
     ):
         """Submit a stop-limit order, returning dict containing new order fields"""
-        return self._call_txtrader_api(
+        ret = self._call_txtrader_api(
             'stoplimit_order', {
                 'account': account,
                 'route': route,
@@ -272,6 +747,76 @@ class API():
                 'quantity': int(quantity)
             }
         )
+        return self._typed(records.Order.from_dict, ret)
+
+    def submit_orders(self, orders, max_in_flight: int = None):
+        """Validate all orders, then submit them concurrently; return list of new order results or exceptions in input order
+
+        Each order is a dict with symbol and quantity (negative to sell, or positive with action BUY, SELL, SELLSHORT
+        or BUYTOCOVER) and optional type (market, limit, stop or stoplimit; inferred from the prices given),
+        limit_price, stop_price, tag (staged market order), account and route (defaulting to the current ones).
+        Raises ValueError describing every invalid order before anything is sent.  At most max_in_flight orders
+        (default TXTRADER_POOL_SIZE) are awaiting a server response at once.
+        """
+        return self._run_all(self._order_calls(orders), max_in_flight)
+
+    def _order_calls(self, orders):
+        """Return list of (method, args) submitting each order; raise ValueError listing all invalid orders"""
+        calls = []
+        errors = []
+        for index, order in enumerate(orders):
+            try:
+                calls.append(self._order_call(order))
+            except (TypeError, ValueError) as ex:
+                errors.append(f'[{index}] {ex}')
+        if errors:
+            raise ValueError(f"invalid orders: {'; '.join(errors)}")
+        return calls
+
+    def _order_call(self, order):
+        fields = {k: v for k, v in dict(order).items() if v is not None}
+        unknown = set(fields) - set(ORDER_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown fields {', '.join(sorted(unknown))}")
+        symbol = fields.get('symbol')
+        if not symbol or type(symbol) != str:
+            raise ValueError('symbol is required')
+        symbol = symbol.upper()
+        if 'quantity' not in fields:
+            raise ValueError('quantity is required')
+        quantity = int(fields['quantity'])
+        if not quantity:
+            raise ValueError('quantity must not be 0')
+        if 'action' in fields:
+            action = str(fields['action']).upper()
+            if action not in ORDER_ACTIONS:
+                raise ValueError(f"action must be one of {', '.join(ORDER_ACTIONS)}")
+            if quantity < 0:
+                raise ValueError('quantity must be positive when action is given')
+            quantity *= ORDER_ACTIONS[action]
+        limit_price = float(fields['limit_price']) if 'limit_price' in fields else None
+        stop_price = float(fields['stop_price']) if 'stop_price' in fields else None
+        inferred = {(False, False): 'market', (True, False): 'limit', (False, True): 'stop', (True, True): 'stoplimit'}
+        order_type = str(fields.get('type', inferred[limit_price is not None, stop_price is not None])).lower()
+        if order_type not in inferred.values():
+            raise ValueError('type must be one of market, limit, stop, stoplimit')
+        if (limit_price is not None) != (order_type in ('limit', 'stoplimit')):
+            raise ValueError(f'{order_type} order {"requires" if limit_price is None else "does not take"} limit_price')
+        if (stop_price is not None) != (order_type in ('stop', 'stoplimit')):
+            raise ValueError(f'{order_type} order {"requires" if stop_price is None else "does not take"} stop_price')
+        if 'tag' in fields and order_type != 'market':
+            raise ValueError('only market orders can be staged with a tag')
+        account = fields.get('account', self.account)
+        route = fields.get('route', self.route)
+        if 'tag' in fields:
+            return self.stage_market_order, (str(fields['tag']), account, route, symbol, quantity)
+        if order_type == 'market':
+            return self.market_order, (account, route, symbol, quantity)
+        if order_type == 'limit':
+            return self.limit_order, (account, route, symbol, limit_price, quantity)
+        if order_type == 'stop':
+            return self.stop_order, (account, route, symbol, stop_price, quantity)
+        return self.stoplimit_order, (account, route, symbol, stop_price, limit_price, quantity)
 
     def global_cancel(self):
         """Request cancellation of all pending orders"""
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  coalesce.py
+  -----------
+
+  TxTrader Client module - single-flight coalescing of identical concurrent
+  read-only calls
+
+  When TXTRADER_COALESCE is enabled, a READ_ONLY call made while an
+  identical call (same function name and arguments) is waiting for the
+  server does not send its own request; it waits for the one in flight and
+  receives a deep copy of its result, or the same exception.  The caller
+  that sent the request also receives a copy when the result was shared,
+  so no caller can change the object the others are copying.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import copy
+import threading
+
+from txtrader_client.client import TxTraderTimeout
+
+
+class _Call():
+    __slots__ = ('event', 'result', 'error', 'followers')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class SingleFlight():
+    """Share one in-flight call among concurrent callers using the same key; counts requests and coalesced calls"""
+
+    def __init__(self):
+        self.requests = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._tasks = {}
+
+    def status(self):
+        """Return dict of requests sent and calls served by another caller's request"""
+        with self._lock:
+            return {'requests': self.requests, 'coalesced': self.coalesced}
+
+    def do(self, key, function, timeout=None):
+        """Return function(), or a copy of the result of the identical call already running in another thread
+
+        A caller waiting on another's call raises TxTraderTimeout after timeout seconds if timeout is not None.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.requests += 1
+                leader = True
+            else:
+                call.followers += 1
+                self.coalesced += 1
+                leader = False
+        if not leader:
+            if not call.event.wait(timeout):
+                raise TxTraderTimeout('deadline exceeded waiting for an identical call in flight')
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+        try:
+            call.result = function()
+        except Exception as ex:
+            call.error = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.followers
+            call.event.set()
+        return copy.deepcopy(call.result) if shared else call.result
+
+    async def do_async(self, key, function, timeout=None):
+        """Return await function(), or a copy of the result of the identical call already awaited by another task
+
+        A caller waiting longer than timeout seconds (None for no limit) raises TxTraderTimeout.
+        """
+        import asyncio
+        with self._lock:
+            call = self._tasks.get(key)
+            if call is None:
+                task = asyncio.ensure_future(function())
+                # [task, followers]
+                call = self._tasks[key] = [task, 0]
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+                self.requests += 1
+            else:
+                call[1] += 1
+                self.coalesced += 1
+        # shield so a cancelled or timed out caller does not cancel the request other callers are waiting on
+        try:
+            ret = await asyncio.wait_for(asyncio.shield(call[0]), timeout)
+        except TxTraderTimeout:
+            raise
+        except asyncio.TimeoutError as ex:
+            raise TxTraderTimeout('deadline exceeded waiting for an identical call in flight') from ex
+        # the task is removed before any caller resumes, so the follower count is final here
+        return copy.deepcopy(ret) if call[1] else ret
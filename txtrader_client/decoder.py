@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  decoder.py
+  ----------
+
+  TxTrader Client module - pluggable JSON decoding of raw response bytes
+
+  TXTRADER_JSON selects the decoder:
+
+    auto    orjson if installed, else ujson if installed, else json (default)
+    orjson  https://pypi.org/project/orjson
+    ujson   https://pypi.org/project/ujson
+    json    the standard library decoder
+
+  A callable taking bytes may also be passed in the API config dict.
+
+  orjson and ujson reject some documents the server can send, such as NaN
+  values written by python's json.dumps or integers wider than 64 bits;
+  those responses are decoded again with the standard library.
+
+  ItemParser parses the members of a top-level JSON object incrementally
+  from byte chunks, so large collection responses can be consumed without
+  holding the whole document in memory.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import codecs
+import importlib
+import json
+import re
+
+DECODERS = ('orjson', 'ujson', 'json')
+
+WHITESPACE = re.compile('[ \t\n\r]*')
+NUMBER_TAIL = re.compile('[0-9.eE+-]*$')
+
+
+def _with_fallback(loads):
+
+    def decode(content):
+        try:
+            return loads(content)
+        except ValueError:
+            return json.loads(content)
+
+    return decode
+
+
+def get_decoder(name='auto'):
+    """Return a function decoding a JSON document from bytes; raise ImportError if a named library is missing"""
+    if callable(name):
+        return name
+    if name == 'auto':
+        for module in DECODERS[:-1]:
+            try:
+                return get_decoder(module)
+            except ImportError:
+                pass
+        return json.loads
+    if name == 'json':
+        return json.loads
+    if name not in DECODERS:
+        raise ValueError(f'unknown TXTRADER_JSON {name!r}; expected auto or one of {", ".join(DECODERS)}')
+    return _with_fallback(importlib.import_module(name).loads)
+
+
+class ItemParser():
+    """Incremental parser returning the (key, value) members of a top-level JSON object as bytes arrive"""
+
+    def __init__(self):
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._position = 0
+        self._state = 'start'
+
+    def feed(self, chunk, final=False):
+        """Return list of members completed by chunk; pass final=True after the last chunk"""
+        self._buffer = self._buffer[self._position:] + self._text.decode(chunk, final)
+        self._position = 0
+        ret = []
+        while True:
+            item = self._next(final)
+            if item is None:
+                break
+            ret.append(item)
+        if final and self._state != 'end':
+            raise ValueError('incomplete JSON object')
+        if final and self._skip(self._position) < len(self._buffer):
+            raise ValueError('extra data after JSON object')
+        return ret
+
+    def _skip(self, position):
+        return WHITESPACE.match(self._buffer, position).end()
+
+    def _next(self, final):
+        buffer = self._buffer
+        position = self._skip(self._position)
+        if position >= len(buffer):
+            return None
+        if self._state == 'start':
+            if buffer[position] != '{':
+                raise ValueError('expected a JSON object')
+            self._state = 'first'
+            position = self._skip(position + 1)
+            self._position = position
+            if position >= len(buffer):
+                return None
+        if self._state == 'end':
+            raise ValueError('extra data after JSON object')
+        if buffer[position] == '}':
+            self._state = 'end'
+            self._position = position + 1
+            return None
+        if self._state == 'items':
+            if buffer[position] != ',':
+                raise ValueError(f'expected , or }} at offset {position}')
+            position += 1
+        try:
+            key, position = self._decoder.raw_decode(buffer, self._skip(position))
+            position = self._skip(position)
+            if buffer[position] != ':' or type(key) != str:
+                raise ValueError(f'expected "key": at offset {position}')
+            value, position = self._decoder.raw_decode(buffer, self._skip(position + 1))
+        except (json.JSONDecodeError, IndexError):
+            # the member is not complete yet
+            if final:
+                raise
+            return None
+        end = self._skip(position)
+        if end >= len(buffer) and not final:
+            # the , or } after the value is in the next chunk
+            return None
+        if end >= len(buffer) or buffer[end] not in ',}':
+            # a number at the end of the buffer may continue in the next chunk
+            if not final and NUMBER_TAIL.match(buffer, position):
+                return None
+            raise ValueError(f'expected , or }} at offset {end}')
+        self._state = 'items'
+        self._position = position
+        return key, value
@@ -2,7 +2,35 @@ TXTRADER_MODE = 'rtx'
 TXTRADER_PROTOCOL = 'http'
 TXTRADER_HOST = 'localhost'
 TXTRADER_HTTP_PORT = '50080'
+TXTRADER_SERVERS = ''
+TXTRADER_HEALTH_INTERVAL = '5'
 TXTRADER_USERNAME = 'txtrader_user'
 TXTRADER_PASSWORD = 'change_this_password'
 TXTRADER_API_ACCOUNT = 'SET.YOUR.TEST.ACCOUNT'
 TXTRADER_ROUTE = 'DEMO'
+TXTRADER_KEEPALIVE = 'true'
+TXTRADER_POOL_SIZE = '10'
+TXTRADER_CONNECT_TIMEOUT = '10'
+TXTRADER_READ_TIMEOUT = '60'
+TXTRADER_COMPRESSION = 'true'
+TXTRADER_COMPRESS_REQUESTS = '0'
+TXTRADER_TRANSPORT = 'requests'
+TXTRADER_JSON = 'auto'
+TXTRADER_RECORDS = 'dict'
+TXTRADER_TCP_PORT = '50090'
+TXTRADER_CACHE = 'false'
+TXTRADER_CACHE_SIZE = '256'
+TXTRADER_CACHE_TTL = ''
+TXTRADER_BAR_CACHE = ''
+TXTRADER_BAR_CACHE_MAX_BYTES = '0'
+TXTRADER_BAR_CACHE_MAX_AGE = '0'
+TXTRADER_METRICS = 'false'
+TXTRADER_LIMITER = 'false'
+TXTRADER_LIMITER_MIN = '2'
+TXTRADER_LIMITER_MAX = ''
+TXTRADER_LIMITER_RESERVED = '1'
+TXTRADER_LIMITER_TOLERANCE = '2.0'
+TXTRADER_LIMITER_BACKOFF = '0.9'
+TXTRADER_HEDGE = 'false'
+TXTRADER_HEDGE_PERCENTILE = '95'
+TXTRADER_COALESCE = 'false'
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  hedge.py
+  --------
+
+  TxTrader Client module - hedged requests for read-only server functions
+
+  When TXTRADER_HEDGE is enabled, a read-only call that has not answered
+  within the TXTRADER_HEDGE_PERCENTILE latency of the last WINDOW calls of
+  the same function is sent a second time, and whichever copy answers first
+  is used.  The slower copy is left to finish on its own so its connection
+  returns to the pool.  Calls are not hedged until MIN_SAMPLES latencies of
+  the function have been seen.
+
+  Only functions in client.READ_ONLY are ever hedged; order entry and other
+  calls that change server state are always sent exactly once.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import contextvars
+import threading
+import time
+from collections import deque
+
+# recent latencies kept per function
+WINDOW = 200
+
+# latencies of a function required before its calls are hedged
+MIN_SAMPLES = 20
+
+
+class Hedge():
+    """Per function latency windows and the logic sending a second copy of a slow request"""
+
+    def __init__(self, percentile=95.0, max_workers=10):
+        if not 0 < percentile < 100:
+            raise ValueError(f'hedge percentile must be between 0 and 100, got {percentile}')
+        self.percentile = percentile
+        self.max_workers = max_workers
+        self.hedged = 0
+        self.wins = 0
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._executor = None
+
+    def delay(self, function_name):
+        """Return seconds to wait before hedging a call of function_name, or None while too few calls are known"""
+        with self._lock:
+            latencies = self._latencies.get(function_name)
+            if latencies is None or len(latencies) < MIN_SAMPLES:
+                return None
+            latencies = sorted(latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * self.percentile / 100))]
+
+    def record(self, function_name, latency):
+        with self._lock:
+            latencies = self._latencies.get(function_name)
+            if latencies is None:
+                latencies = self._latencies[function_name] = deque(maxlen=WINDOW)
+            latencies.append(latency)
+
+    def status(self):
+        """Return dict of hedged call and hedge win counts and the current hedge delay per function"""
+        with self._lock:
+            functions = list(self._latencies)
+        return {'hedged': self.hedged, 'wins': self.wins, 'delays': {f: self.delay(f) for f in functions}}
+
+    def _count(self, won):
+        with self._lock:
+            self.hedged += 1
+            self.wins += won
+
+    def _timed(self, function_name, send):
+        start = time.perf_counter()
+        ret = send()
+        self.record(function_name, time.perf_counter() - start)
+        return ret
+
+    def run(self, function_name, send):
+        """Return send(), calling it again on a worker thread if the first call is slower than the hedge delay"""
+        delay = self.delay(function_name)
+        if delay is None:
+            return self._timed(function_name, send)
+        from concurrent import futures
+        with self._lock:
+            if not self._executor:
+                self._executor = futures.ThreadPoolExecutor(max_workers=self.max_workers * 2)
+        first = self._executor.submit(contextvars.copy_context().run, self._timed, function_name, send)
+        # wait() rather than result(timeout), which would mistake a TxTraderTimeout raised by the call for the delay
+        if futures.wait([first], timeout=delay).done:
+            return first.result()
+        second = self._executor.submit(contextvars.copy_context().run, self._timed, function_name, send)
+        pending = {first, second}
+        while True:
+            done, pending = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None or not pending:
+                    self._count(future is second)
+                    return future.result()
+
+    async def run_async(self, function_name, send):
+        """Return await send(), awaiting a second send() if the first is slower than the hedge delay"""
+        import asyncio
+
+        async def timed():
+            start = time.perf_counter()
+            ret = await send()
+            self.record(function_name, time.perf_counter() - start)
+            return ret
+
+        delay = self.delay(function_name)
+        if delay is None:
+            return await timed()
+        first = asyncio.ensure_future(timed())
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        second = asyncio.ensure_future(timed())
+        pending = {first, second}
+        while True:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None or not pending:
+                    # the slower copy finishes on its own; retrieve its result so a failure is not reported
+                    for other in pending:
+                        other.add_done_callback(_retrieve)
+                    self._count(task is second)
+                    return task.result()
+
+    def close(self):
+        """Shut down the worker threads once running requests finish"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False)
+
+
+def _retrieve(task):
+    if not task.cancelled():
+        task.exception()
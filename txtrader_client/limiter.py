@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  limiter.py
+  ----------
+
+  TxTrader Client module - adaptive limit on concurrent requests to a server
+
+  The limit follows AIMD (additive increase, multiplicative decrease): each
+  call answered within TXTRADER_LIMITER_TOLERANCE times the baseline latency
+  raises the limit by 1/limit, so it grows by about one per round of full
+  concurrency; a slower call, a 429 or 5xx response or a connection error
+  multiplies it by TXTRADER_LIMITER_BACKOFF, at most once per baseline
+  latency so a burst of failures backs off once.  The baseline is the lowest
+  recent latency, drifting slowly toward current samples so a lasting change
+  in server speed is eventually accepted.
+
+  TXTRADER_LIMITER_RESERVED slots of the current limit are held back for
+  order entry and cancel calls, so queries can never starve them.  The
+  minimum limit must exceed the reserved slots, so the reservation holds
+  and queries keep at least one slot however far the limit backs off.
+
+  Streamed calls (iter_executions, iter_orders, iter_symbols) hold their
+  slot until the response is read or the iterator is closed; their latency
+  sample is the time to the response head, as the body is read only as fast
+  as the caller consumes it.
+
+  One Limiter is shared by every API and AsyncAPI addressing the same URL
+  in a process.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import threading
+import time
+
+# fraction of the gap to a slower sample the baseline latency moves per call
+DRIFT = 0.01
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(url, **settings):
+    """Return the Limiter shared by all clients of url, creating it with settings on first use"""
+    with _limiters_lock:
+        ret = _limiters.get(url)
+        if ret is None:
+            ret = _limiters[url] = Limiter(**settings)
+        return ret
+
+
+class Limiter():
+    """Thread and asyncio safe AIMD concurrency limit; priority callers may use the reserved capacity"""
+
+    def __init__(self, minimum=2, maximum=10, reserved=1, tolerance=2.0, backoff=0.9):
+        if not 0 <= reserved < minimum <= maximum:
+            raise ValueError(
+                f'limiter requires 0 <= reserved < minimum <= maximum, got {reserved}, {minimum}, {maximum}'
+            )
+        self.minimum = minimum
+        self.maximum = maximum
+        self.reserved = reserved
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.limit = float(maximum)
+        self.in_flight = 0
+        self.baseline = None
+        self._decreased = 0.0
+        self._condition = threading.Condition()
+        self._waiters = []
+
+    def _available(self, priority):
+        limit = int(self.limit)
+        if not priority:
+            limit -= self.reserved
+        return self.in_flight < limit
+
+    def acquire(self, priority=False, timeout=None):
+        """Block until a request may be sent, at most timeout seconds if not None; return False on timeout"""
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._available(priority), timeout):
+                return False
+            self.in_flight += 1
+            return True
+
+    async def acquire_async(self, priority=False, timeout=None):
+        """Wait without blocking the event loop until a request may be sent; return False after timeout seconds"""
+        import asyncio
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        while True:
+            with self._condition:
+                if self._available(priority):
+                    self.in_flight += 1
+                    return True
+                future = loop.create_future()
+                self._waiters.append((loop, future))
+            try:
+                await asyncio.wait_for(future, None if deadline is None else deadline - loop.time())
+            except asyncio.TimeoutError:
+                return False
+
+    def release(self, latency=None, dropped=False):
+        """Return a slot, adjusting the limit for a call that took latency seconds; dropped marks overload
+
+        With latency None the slot is returned without adjusting the limit, for a request that was never sent.
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if latency is not None:
+                self._adjust(latency, dropped)
+            self._condition.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(_wake, future)
+
+    def _adjust(self, latency, dropped):
+        now = time.monotonic()
+        if not dropped:
+            if self.baseline is None or latency < self.baseline:
+                self.baseline = latency
+            else:
+                self.baseline += (latency - self.baseline) * DRIFT
+        baseline = self.baseline or 0.0
+        if dropped or latency > baseline * self.tolerance:
+            if now - self._decreased > baseline:
+                self.limit = max(float(self.minimum), self.limit * self.backoff)
+                self._decreased = now
+        else:
+            self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+
+    def status(self):
+        """Return dict of current limit, requests in flight and baseline latency"""
+        with self._condition:
+            return {'limit': int(self.limit), 'in_flight': self.in_flight, 'baseline': self.baseline}
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  metrics.py
+  ----------
+
+  TxTrader Client module - per server call latency and payload metrics
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import bisect
+import threading
+from collections import namedtuple
+
+# record passed to API.call_hook for every server call; status is None when no HTTP response was received
+CallRecord = namedtuple(
+    'CallRecord', ['function', 'method', 'status', 'latency', 'request_bytes', 'response_bytes', 'error']
+)
+
+# latency histogram bucket upper bounds in seconds; the last bucket counts everything slower
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics():
+    """Thread-safe per function call counters and latency histograms"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._functions = {}
+
+    def record(self, record):
+        with self._lock:
+            m = self._functions.get(record.function)
+            if m is None:
+                m = self._functions[record.function] = {
+                    'calls': 0,
+                    'errors': 0,
+                    'latency_sum': 0.0,
+                    'latency_max': 0.0,
+                    'request_bytes': 0,
+                    'response_bytes': 0,
+                    'status': {},
+                    'histogram': [0] * (len(BUCKETS) + 1),
+                }
+            m['calls'] += 1
+            if record.error:
+                m['errors'] += 1
+            m['latency_sum'] += record.latency
+            m['latency_max'] = max(m['latency_max'], record.latency)
+            m['request_bytes'] += record.request_bytes
+            m['response_bytes'] += record.response_bytes
+            m['status'][record.status] = m['status'].get(record.status, 0) + 1
+            m['histogram'][bisect.bisect_left(BUCKETS, record.latency)] += 1
+
+    def snapshot(self):
+        """Return dict keyed by function name of counters, latency histogram and estimated percentiles"""
+        with self._lock:
+            ret = {}
+            for name, m in self._functions.items():
+                s = dict(m, status=dict(m['status']), histogram=list(m['histogram']))
+                s['latency_mean'] = m['latency_sum'] / m['calls']
+                for p in (50, 90, 99):
+                    s[f'latency_p{p}'] = self._percentile(m, p / 100)
+                ret[name] = s
+            return ret
+
+    def reset(self):
+        with self._lock:
+            self._functions.clear()
+
+    @staticmethod
+    def _percentile(m, fraction):
+        """Return the histogram bucket upper bound containing the given fraction of calls"""
+        target = m['calls'] * fraction
+        count = 0
+        for bound, n in zip(BUCKETS, m['histogram']):
+            count += n
+            if count >= target:
+                return min(bound, m['latency_max'])
+        return m['latency_max']
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  multi.py
+  --------
+
+  TxTrader Client module - client for several txtrader servers sharing the
+  datafeed load
+
+  Each symbol is owned by one server, chosen by consistent hashing, so
+  adding or removing a server moves only the symbols it owns.  Per-symbol
+  calls (add_symbol, query_symbol, query_bars, ...) go to the owner;
+  query_symbols, query_all_symbols and iter_symbols merge the results of
+  every healthy server.  Every other call (accounts, orders, executions,
+  positions) goes to the primary: the first healthy server in the list.
+  txtrader only accepts orders for subscribed symbols, so order entry
+  (market_order, ..., submit_orders) first subscribes the symbol on the
+  primary, where it stays subscribed for order and position updates.
+
+  A background thread calls status() on every server each
+  TXTRADER_HEALTH_INTERVAL seconds; a connection failure during a call
+  checks that server at once.  While a server is down its symbols are owned
+  by the next healthy server on the ring; when ownership of a symbol
+  subscribed with add_symbol moves, it is subscribed on the new owner and,
+  if the previous owner is still up, deleted there.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import bisect
+import functools
+import hashlib
+import inspect
+import threading
+
+from txtrader_client.client import API, _load_config
+
+# points per server on the hash ring
+REPLICAS = 100
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], 'big')
+
+
+def _by_symbol(name):
+    """Return MultiAPI method sending API.name(symbol, ...) to the server owning symbol"""
+
+    @functools.wraps(getattr(API, name))
+    def method(self, symbol, *args, **kwargs):
+        return self._routed(name, symbol, args, kwargs)
+
+    return method
+
+
+def _many(name):
+    """Return MultiAPI method calling the routed name(symbol) for each symbol on a bounded thread pool"""
+
+    @functools.wraps(getattr(API, f'{name}_many'))
+    def method(self, symbols, max_workers: int = None):
+        symbols = list(dict.fromkeys(symbols))
+        routed = getattr(self, name)
+        results = self.primary()._run_all([(routed, (symbol, )) for symbol in symbols], max_workers)
+        return dict(zip(symbols, results))
+
+    return method
+
+
+def _order(name):
+    """Return MultiAPI method sending API.name(...) to the primary once the order's symbol is subscribed there"""
+    signature = inspect.signature(getattr(API, name))
+
+    @functools.wraps(getattr(API, name))
+    def method(self, *args, **kwargs):
+        symbol = signature.bind(None, *args, **kwargs).arguments['symbol']
+        return getattr(self._trading([symbol]), name)(*args, **kwargs)
+
+    return method
+
+
+class MultiAPI():
+    """API for a list of txtrader servers with per-symbol sharding and health-checked failover"""
+
+    def __init__(self, servers=None, mode='rtx', config={}):
+        config = _load_config(config)
+        servers = servers or config['TXTRADER_SERVERS']
+        if type(servers) == str:
+            servers = [s.strip() for s in servers.split(',') if s.strip()]
+        if not servers:
+            servers = [f"{config['TXTRADER_HOST']}:{config['TXTRADER_HTTP_PORT']}"]
+        self.servers = list(dict.fromkeys(servers))
+        self.apis = {}
+        for server in self.servers:
+            host, _, port = server.rpartition(':')
+            if not host:
+                raise ValueError(f'server {server!r} must be host:port')
+            self.apis[server] = API(mode, dict(config, TXTRADER_HOST=host, TXTRADER_HTTP_PORT=port))
+        self.healthy = {server: True for server in self.servers}
+        ring = sorted((_hash(f'{server}#{i}'), server) for server in self.servers for i in range(REPLICAS))
+        self._points = [point for point, _ in ring]
+        self._owners = [server for _, server in ring]
+        self._symbols = set()
+        # (server, symbol) subscribed on a primary server for order entry
+        self._traded = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread = None
+        self.health_interval = float(config['TXTRADER_HEALTH_INTERVAL'])
+        if self.health_interval > 0:
+            self._health_thread = threading.Thread(target=self._health_loop, name='txtrader-health', daemon=True)
+            self._health_thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.primary(), name)
+
+    def close(self):
+        """Stop health checks and close all pooled server connections"""
+        self._stop.set()
+        if self._health_thread:
+            self._health_thread.join()
+            self._health_thread = None
+        for api in self.apis.values():
+            api.close()
+
+    def primary(self):
+        """Return the API of the first healthy server (the first server when none are healthy)"""
+        with self._lock:
+            return self.apis[self._primary()]
+
+    def _primary(self):
+        return next((s for s in self.servers if self.healthy[s]), self.servers[0])
+
+    def _trading(self, symbols):
+        """Return the primary API with symbols subscribed on it, as txtrader requires for order entry"""
+        with self._lock:
+            server = self._primary()
+            missing = list(dict.fromkeys(s.upper() for s in symbols if (server, s.upper()) not in self._traded))
+        for symbol in missing:
+            self.apis[server].add_symbol(symbol)
+            with self._lock:
+                self._traded.add((server, symbol))
+        return self.apis[server]
+
+    def owner(self, symbol: str):
+        """Return the server currently owning symbol: the first healthy server on the ring from its hash"""
+        with self._lock:
+            return self._owner(symbol)
+
+    def _owner(self, symbol):
+        start = bisect.bisect(self._points, _hash(symbol.upper()))
+        count = len(self._owners)
+        for i in range(count):
+            server = self._owners[(start + i) % count]
+            if self.healthy[server]:
+                return server
+        return self._owners[start % count]
+
+    def check(self, server: str):
+        """Call status() on server, update its health and return it"""
+        try:
+            self.apis[server].status()
+            healthy = True
+        except Exception:
+            healthy = False
+        self._set_health(server, healthy)
+        return healthy
+
+    def check_all(self):
+        """Check every server; return dict of server: healthy"""
+        return {server: self.check(server) for server in self.servers}
+
+    def _health_loop(self):
+        while not self._stop.wait(self.health_interval):
+            self.check_all()
+
+    def _set_health(self, server, healthy):
+        with self._lock:
+            if self.healthy[server] == healthy:
+                return
+            before = {symbol: self._owner(symbol) for symbol in self._symbols}
+            self.healthy[server] = healthy
+            if not healthy:
+                # a restarted server has lost its subscriptions
+                self._traded = {(s, symbol) for s, symbol in self._traded if s != server}
+            moved = [
+                (symbol, previous, self._owner(symbol))
+                for symbol, previous in before.items() if self._owner(symbol) != previous
+            ]
+            healthy_servers = {s for s in self.servers if self.healthy[s]}
+        for symbol, previous, owner in moved:
+            try:
+                self.apis[owner].add_symbol(symbol)
+            except Exception:
+                # the next health check moves it again if owner is also down
+                pass
+            if previous in healthy_servers:
+                # the previous owner is up (the symbol moves back to a recovered server); drop its subscription
+                try:
+                    self.apis[previous].del_symbol(symbol)
+                except Exception:
+                    pass
+
+    def _routed(self, name, symbol, args, kwargs):
+        server = self.owner(symbol)
+        try:
+            return getattr(self.apis[server], name)(symbol, *args, **kwargs)
+        except OSError as ex:
+            # HTTP error responses (requests.HTTPError is an OSError) come from a live server
+            if getattr(ex, 'response', None) is not None or self.check(server):
+                raise
+        return getattr(self.apis[self.owner(symbol)], name)(symbol, *args, **kwargs)
+
+    def _each_healthy(self, name, *args):
+        """Return list of API.name(*args) results from every healthy server, raising the first error"""
+        with self._lock:
+            servers = [s for s in self.servers if self.healthy[s]] or self.servers
+        results = self.primary()._run_all([(getattr(self.apis[s], name), args) for s in servers], None)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def add_symbol(self, symbol: str):
+        """Request subscription to a symbol on the server owning it"""
+        ret = self._routed('add_symbol', symbol, (), {})
+        with self._lock:
+            self._symbols.add(symbol.upper())
+        return ret
+
+    def del_symbol(self, symbol: str):
+        """Delete subscription to a symbol on the server owning it"""
+        with self._lock:
+            self._symbols.discard(symbol.upper())
+        return self._routed('del_symbol', symbol, (), {})
+
+    query_symbol = _by_symbol('query_symbol')
+    query_symbol_data = _by_symbol('query_symbol_data')
+    query_symbol_bars = _by_symbol('query_symbol_bars')
+    query_bars = _by_symbol('query_bars')
+    query_symbol_many = _many('query_symbol')
+    query_symbol_data_many = _many('query_symbol_data')
+    query_symbol_bars_many = _many('query_symbol_bars')
+
+    market_order = _order('market_order')
+    stage_market_order = _order('stage_market_order')
+    limit_order = _order('limit_order')
+    stop_order = _order('stop_order')
+    stoplimit_order = _order('stoplimit_order')
+
+    def submit_orders(self, orders, max_in_flight: int = None):
+        """Validate all orders, subscribe their symbols on the primary, then submit them there (see API.submit_orders)"""
+        orders = list(orders)
+        # validate before anything is subscribed or sent
+        self.primary()._order_calls(orders)
+        api = self._trading([dict(order)['symbol'] for order in orders])
+        calls = api._order_calls(orders)
+        return api._run_all(calls, max_in_flight)
+
+    def query_symbols(self):
+        """Return the list of active symbols on all healthy servers"""
+        return list(dict.fromkeys(symbol for symbols in self._each_healthy('query_symbols') for symbol in symbols))
+
+    def query_all_symbols(self):
+        """Return dict keyed by symbol containing current data for all active symbols on all healthy servers"""
+        ret = {}
+        for symbols in self._each_healthy('query_all_symbols'):
+            ret.update(symbols)
+        return ret
+
+    def iter_symbols(self):
+        """Yield (symbol, data) for all active symbols, one healthy server after another"""
+        with self._lock:
+            servers = [s for s in self.servers if self.healthy[s]] or self.servers
+        for server in servers:
+            yield from self.apis[server].iter_symbols()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  orderbook.py
+  ------------
+
+  TxTrader Client module - local mirror of server orders with change tracking
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import threading
+from collections import deque, namedtuple
+
+Change = namedtuple('Change', ['version', 'kind', 'permid', 'order', 'previous'])
+
+# change kinds reported by OrderBook.changes_since()
+NEW = 'new'
+STATUS = 'status'
+FILLED = 'filled'
+CANCELLED = 'cancelled'
+UPDATED = 'updated'
+REMOVED = 'removed'
+
+
+class OrderBook():
+    """Mirror of query_orders (and optionally query_tickets) indexed by permid, status and symbol"""
+
+    def __init__(self, api, tickets: bool = False, history: int = 100000):
+        self.api = api
+        self.tickets = tickets
+        self.version = 0
+        self.orders = {}
+        self.by_status = {}
+        self.by_symbol = {}
+        self._changes = deque(maxlen=history)
+        self._discarded = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.orders)
+
+    def __contains__(self, permid):
+        return permid in self.orders
+
+    def __getitem__(self, permid):
+        return self.orders[permid]
+
+    def refresh(self):
+        """Fetch current orders from the server and apply them; return list of resulting changes"""
+        orders = self.api.query_orders()
+        if self.tickets:
+            orders = dict(orders)
+            for permid, ticket in self.api.query_tickets().items():
+                orders.setdefault(permid, ticket)
+        return self.apply(orders)
+
+    def apply(self, orders):
+        """Apply a full snapshot dict keyed by permid; return list of resulting changes"""
+        with self._lock:
+            changes = []
+            for permid, order in orders.items():
+                previous = self.orders.get(permid)
+                if previous == order:
+                    continue
+                if previous is None:
+                    kind = NEW
+                elif previous.get('status') != order.get('status'):
+                    kind = self._status_kind(order.get('status'))
+                else:
+                    kind = UPDATED
+                self._unindex(permid, previous)
+                self.orders[permid] = order
+                self._index(permid, order)
+                changes.append((kind, permid, order, previous))
+            for permid in [p for p in self.orders if p not in orders]:
+                previous = self.orders.pop(permid)
+                self._unindex(permid, previous)
+                changes.append((REMOVED, permid, None, previous))
+            if changes:
+                self.version += 1
+                changes = [Change(self.version, *change) for change in changes]
+                for change in changes:
+                    if len(self._changes) == self._changes.maxlen:
+                        self._discarded = self._changes[0].version
+                    self._changes.append(change)
+            return changes
+
+    def changes_since(self, version: int):
+        """Return list of changes recorded after version; raise ValueError if they are no longer in the history"""
+        with self._lock:
+            if version >= self.version:
+                return []
+            if version < self._discarded:
+                raise ValueError(f'changes since version {version} have been discarded; resynchronize from orders')
+            ret = []
+            for change in reversed(self._changes):
+                if change.version <= version:
+                    break
+                ret.append(change)
+            ret.reverse()
+            return ret
+
+    def with_status(self, status: str):
+        """Return dict of orders currently in status"""
+        with self._lock:
+            return {permid: self.orders[permid] for permid in self.by_status.get(status, ())}
+
+    def for_symbol(self, symbol: str):
+        """Return dict of orders for symbol"""
+        with self._lock:
+            return {permid: self.orders[permid] for permid in self.by_symbol.get(symbol, ())}
+
+    @staticmethod
+    def _status_kind(status):
+        status = str(status).lower()
+        if status == 'filled':
+            return FILLED
+        if status in ('cancelled', 'canceled'):
+            return CANCELLED
+        return STATUS
+
+    def _index(self, permid, order):
+        self.by_status.setdefault(order.get('status'), set()).add(permid)
+        self.by_symbol.setdefault(order.get('symbol'), set()).add(permid)
+
+    def _unindex(self, permid, order):
+        if order is None:
+            return
+        for index, key in ((self.by_status, order.get('status')), (self.by_symbol, order.get('symbol'))):
+            permids = index.get(key)
+            if permids is not None:
+                permids.discard(permid)
+                if not permids:
+                    del index[key]
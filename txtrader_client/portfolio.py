@@ -0,0 +1,216 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  portfolio.py
+  ------------
+
+  TxTrader Client module - portfolio valuation from query_positions and
+  query_all_symbols
+
+  Portfolio aligns every (account, symbol) position with its symbol's
+  prices once, then values all positions together: NumPy arrays when NumPy
+  is installed, otherwise plain Python lists.  update_quotes() revalues only
+  the positions in the symbols whose quotes changed and adjusts the account
+  totals by the difference.  Quotes given to update_quotes() may be partial,
+  such as a Stream quote (bid and ask) or trade (last) update: the fields
+  they carry replace the stored ones and the others are kept.
+
+  Positions are marked at last (close when there is no last trade).
+  Positions carry no cost basis, so pnl is the day's P&L against the
+  previous close; liquidation_value marks longs at bid and shorts at ask.
+  Symbols with no usable price are valued at 0 and listed in missing.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import math
+
+from txtrader_client.bars import _numpy
+
+# quote fields kept per symbol
+QUOTE_FIELDS = ('last', 'close', 'bid', 'ask')
+
+# per position value columns; gross exposure is long - short, net exposure is market_value
+VALUES = ('market_value', 'long', 'short', 'pnl', 'liquidation_value')
+
+
+def _price(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return value if value > 0 and not math.isinf(value) else 0.0
+
+
+def _quantity(value):
+    """Return float quantity of a query_positions value: a number, a dict or a Position record"""
+    if type(value) in (int, float):
+        return float(value)
+    quantity = value.get('quantity') if hasattr(value, 'get') else getattr(value, 'quantity', value)
+    return float(quantity or 0)
+
+
+def _quote_fields(quote):
+    """Return dict of the QUOTE_FIELDS present in a quote dict or record"""
+    return {name: _price(quote.get(name)) for name in QUOTE_FIELDS if quote.get(name) is not None}
+
+
+def _quote_prices(fields):
+    """Return (mark, close, bid, ask) from _quote_fields; 0.0 where unknown"""
+    close = fields.get('close', 0.0)
+    mark = fields.get('last') or close
+    return mark, close, fields.get('bid') or mark, fields.get('ask') or mark
+
+
+def _value(q, mark, close, bid, ask):
+    """Return one position's VALUES"""
+    market_value = q * mark
+    return (
+        market_value,
+        market_value if q > 0 else 0.0,
+        market_value if q < 0 else 0.0,
+        q * (mark - close) if close else 0.0,
+        q * (bid if q > 0 else ask),
+    )
+
+
+class Portfolio():
+    """Positions of all accounts valued together (with NumPy if available and use_numpy is not False)"""
+
+    def __init__(self, positions, quotes, use_numpy: bool = None):
+        account_index = {}
+        self._symbol_index = {}
+        accounts = []
+        symbols = []
+        quantities = []
+        self.rows = []
+        for account, held in (positions or {}).items():
+            a = account_index.setdefault(account, len(account_index))
+            for symbol, value in (held or {}).items():
+                quantity = _quantity(value)
+                if not quantity:
+                    continue
+                s = self._symbol_index.setdefault(symbol, len(self._symbol_index))
+                accounts.append(a)
+                symbols.append(s)
+                quantities.append(quantity)
+                self.rows.append((account, symbol))
+        self.accounts = list(account_index)
+        self.symbols = list(self._symbol_index)
+        quotes = quotes or {}
+        self._quotes = [_quote_fields(quotes.get(symbol) or {}) for symbol in self.symbols]
+        prices = [_quote_prices(fields) for fields in self._quotes]
+        np = self.numpy = _numpy() if use_numpy is not False else None
+        if np:
+            self.quantity = np.array(quantities, dtype='f8')
+            self._account = np.array(accounts, dtype='i8')
+            self._symbol = np.array(symbols, dtype='i8')
+            self.prices = np.array(prices, dtype='f8').reshape(len(self.symbols), 4)
+            order = np.argsort(self._symbol, kind='stable')
+            bounds = np.searchsorted(self._symbol[order], np.arange(1, len(self.symbols)))
+            self._rows_by_symbol = np.split(order, bounds) if self.symbols else []
+        else:
+            self.quantity = quantities
+            self._account = accounts
+            self._symbol = symbols
+            self.prices = [list(p) for p in prices]
+            self._rows_by_symbol = [[] for _ in self.symbols]
+            for row, s in enumerate(symbols):
+                self._rows_by_symbol[s].append(row)
+        self.refresh()
+
+    @classmethod
+    def from_api(cls, api, use_numpy: bool = None):
+        """Return Portfolio of api.query_positions() valued with api.query_all_symbols()"""
+        return cls(api.query_positions(), api.query_all_symbols(), use_numpy)
+
+    @property
+    def missing(self):
+        """Return list of held symbols with no usable price"""
+        return [symbol for symbol, prices in zip(self.symbols, self.prices) if not prices[0]]
+
+    def refresh(self):
+        """Revalue every position and recompute the account totals"""
+        np = self.numpy
+        if np:
+            self.values = self._values_numpy(slice(None))
+            self.totals = np.column_stack(
+                [np.bincount(self._account, column, len(self.accounts)) for column in self.values.T]
+            ).reshape(len(self.accounts), len(VALUES))
+        else:
+            self.values = [_value(q, *self.prices[s]) for q, s in zip(self.quantity, self._symbol)]
+            self.totals = [[0.0] * len(VALUES) for _ in self.accounts]
+            for account, values in zip(self._account, self.values):
+                self.totals[account] = [t + v for t, v in zip(self.totals[account], values)]
+
+    def _values_numpy(self, rows):
+        np = self.numpy
+        q = self.quantity[rows]
+        mark, close, bid, ask = self.prices[self._symbol[rows]].T
+        market_value = q * mark
+        return np.column_stack(
+            (
+                market_value,
+                np.where(q > 0, market_value, 0.0),
+                np.where(q < 0, market_value, 0.0),
+                np.where(close > 0, q * (mark - close), 0.0),
+                q * np.where(q > 0, bid, ask),
+            )
+        )
+
+    def update_quotes(self, quotes):
+        """Merge changed quotes {symbol: quote}; revalue only positions in those symbols; return count revalued"""
+        changed = []
+        for symbol, quote in quotes.items():
+            i = self._symbol_index.get(symbol)
+            if i is not None:
+                self._quotes[i].update(_quote_fields(quote))
+                prices = _quote_prices(self._quotes[i])
+                self.prices[i] = prices if self.numpy else list(prices)
+                changed.append(i)
+        if not changed:
+            return 0
+        np = self.numpy
+        if np:
+            rows = np.concatenate([self._rows_by_symbol[i] for i in changed])
+            values = self._values_numpy(rows)
+            np.add.at(self.totals, self._account[rows], values - self.values[rows])
+            self.values[rows] = values
+            return len(rows)
+        count = 0
+        for i in changed:
+            for row in self._rows_by_symbol[i]:
+                values = _value(self.quantity[row], *self.prices[i])
+                account = self._account[row]
+                self.totals[account] = [t + n - o for t, n, o in zip(self.totals[account], values, self.values[row])]
+                self.values[row] = values
+                count += 1
+        return count
+
+    def _summary(self, totals):
+        ret = dict(zip(VALUES, (float(v) for v in totals)))
+        ret['gross'] = ret['long'] - ret['short']
+        ret['net'] = ret['market_value']
+        return ret
+
+    def by_account(self):
+        """Return dict keyed by account of market_value, long, short, gross, net, pnl and liquidation_value"""
+        return {account: self._summary(totals) for account, totals in zip(self.accounts, self.totals)}
+
+    def summary(self):
+        """Return market_value, long, short, gross, net, pnl and liquidation_value summed over all accounts"""
+        totals = [0.0] * len(VALUES)
+        for account_totals in self.totals:
+            totals = [t + v for t, v in zip(totals, account_totals)]
+        return self._summary(totals)
+
+    def positions(self):
+        """Return {account: {symbol: dict of quantity, price and position VALUES}}"""
+        ret = {account: {} for account in self.accounts}
+        for (account, symbol), q, s, values in zip(self.rows, self.quantity, self._symbol, self.values):
+            position = dict(zip(VALUES, (float(v) for v in values)))
+            position.update(quantity=float(q), price=float(self.prices[s][0]))
+            ret[account][symbol] = position
+        return ret
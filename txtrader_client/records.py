@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  records.py
+  ----------
+
+  TxTrader Client module - compact typed records returned when
+  TXTRADER_RECORDS is 'typed'
+
+  Known server fields are __slots__ attributes (None when the server did not
+  send them); any other fields are kept in the record's extra dict.  get()
+  and [] look fields up by their server name, so code written against the
+  dict form keeps working.  String values of low cardinality fields such as
+  account, symbol and status are interned, so records share one copy.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import sys
+
+
+class Record():
+    """Base class of typed records; KEYS maps attribute names to server field names"""
+
+    __slots__ = ('extra', )
+    KEYS = {}
+    SHARED = ()
+
+    def __init__(self, **fields):
+        self._load(fields)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Return record for a server dict; other values (None, error strings) are returned unchanged"""
+        if type(data) != dict:
+            return data
+        ret = cls.__new__(cls)
+        ret._load(data)
+        return ret
+
+    def _load(self, fields):
+        for attribute, key in self.KEYS.items():
+            setattr(self, attribute, fields.get(key))
+        for attribute in self.SHARED:
+            value = getattr(self, attribute)
+            if type(value) == str:
+                setattr(self, attribute, sys.intern(value))
+        # a new dict sized for the unknown fields only
+        self.extra = {k: v for k, v in fields.items() if k not in self._ATTRIBUTES}
+
+    def to_dict(self):
+        """Return the server dict form; known fields that are None are omitted"""
+        ret = {key: getattr(self, attribute) for attribute, key in self.KEYS.items()}
+        ret = {k: v for k, v in ret.items() if v is not None}
+        ret.update(self.extra)
+        return ret
+
+    def get(self, key, default=None):
+        """Return field by server name"""
+        attribute = self._ATTRIBUTES.get(key)
+        if attribute:
+            value = getattr(self, attribute)
+            return default if value is None else value
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key):
+        ret = self.get(key, KeyError)
+        if ret is KeyError:
+            raise KeyError(key)
+        return ret
+
+    def __eq__(self, other):
+        return type(other) == type(self) and self._values() == other._values()
+
+    def _values(self):
+        return tuple(getattr(self, attribute) for attribute in self.KEYS) + (self.extra, )
+
+    def __repr__(self):
+        fields = ', '.join(f'{k}={getattr(self, k)!r}' for k in self.KEYS if getattr(self, k) is not None)
+        return f'{type(self).__name__}({fields})'
+
+    def __init_subclass__(cls):
+        cls._ATTRIBUTES = {key: attribute for attribute, key in cls.KEYS.items()}
+
+
+def _keys(*names, **aliases):
+    return dict({name: name for name in names}, **aliases)
+
+
+class Order(Record):
+    """Order or staged ticket from query_orders, query_order, query_tickets and the order entry methods"""
+
+    KEYS = _keys(
+        'permid', 'account', 'route', 'symbol', 'quantity', 'filled', 'remaining', 'type', 'status', 'limit_price',
+        'stop_price', 'avgfillprice', 'text', 'updates'
+    )
+    SHARED = ('account', 'route', 'symbol', 'type', 'status')
+    __slots__ = tuple(KEYS)
+
+
+class Execution(Record):
+    """Execution report from query_executions, query_execution and query_order_executions"""
+
+    KEYS = _keys(
+        execution_id='EXECUTION_ID',
+        order_id='ORIGINAL_ORDER_ID',
+        account='ACCOUNT',
+        symbol='DISP_NAME',
+        side='BUYORSELL',
+        quantity='VOLUME',
+        price='PRICE',
+        exchange='EXCHANGE',
+        date='TRD_DATE',
+        time='TRD_TIME',
+        status='CURRENT_STATUS',
+        commission='COMMISSION',
+    )
+    SHARED = ('account', 'symbol', 'side', 'exchange', 'date', 'status')
+    __slots__ = tuple(KEYS)
+
+
+class Position(Record):
+    """Position in one symbol of one account, from query_positions"""
+
+    KEYS = _keys('account', 'symbol', 'quantity')
+    SHARED = ('account', 'symbol')
+    __slots__ = tuple(KEYS)
+
+
+class Quote(Record):
+    """Current symbol data from query_symbol and query_all_symbols"""
+
+    KEYS = _keys(
+        'symbol', 'fullname', 'last', 'size', 'volume', 'bid', 'bid_size', 'ask', 'ask_size', 'open', 'high', 'low',
+        'close', 'vwap'
+    )
+    SHARED = ('symbol', 'fullname')
+    __slots__ = tuple(KEYS)
+
+
+def each(cls):
+    """Return function converting a dict of server dicts to a dict of cls records"""
+
+    def convert(data):
+        if type(data) != dict:
+            return data
+        return {key: cls.from_dict(value) for key, value in data.items()}
+
+    return convert
+
+
+def positions(data):
+    """Convert query_positions {account: {symbol: quantity or dict}} to {account: {symbol: Position}}"""
+    if type(data) != dict:
+        return data
+    ret = {}
+    for account, symbols in data.items():
+        ret[account] = {}
+        for symbol, value in (symbols or {}).items():
+            fields = dict(value) if type(value) == dict else {'quantity': value}
+            fields.update(account=account, symbol=symbol)
+            ret[account][symbol] = Position(**fields)
+    return ret
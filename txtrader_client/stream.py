@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  stream.py
+  ---------
+
+  TxTrader Client module - Expose class Stream as a push update subscriber
+  for the txtrader TCP port.
+
+  The TCP channel carries netstring framed text lines.  After the client
+  sends 'auth <username> <password>', the server pushes updates as lines:
+
+    quote.<symbol>:<bid> <bid_size> <ask> <ask_size>
+    trade.<symbol>:<last> <size> <volume>
+    bar.<symbol>:<date> <time> <open> <high> <low> <close> <volume>
+    order.<order_id> <json>
+    execution.<execution_id> <json>
+    time: <YYYY-MM-DD HH:MM:SS>
+    .<status text>
+
+  Symbol subscriptions are requested with 'add <symbol>' and 'del <symbol>'.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import json
+import queue
+import socket
+import threading
+from collections import namedtuple
+
+from txtrader_client.client import _load_config
+
+Update = namedtuple('Update', ['kind', 'key', 'data'])
+
+_FIELDS = {
+    'quote': (('bid', float), ('bid_size', int), ('ask', float), ('ask_size', int)),
+    'trade': (('last', float), ('size', int), ('volume', int)),
+    'bar': (
+        ('date', str), ('time', str), ('open', float), ('high', float), ('low', float), ('close', float),
+        ('volume', int)
+    ),
+}
+
+
+def decode(line):
+    """Return Update decoded from a server push line; unrecognized or malformed lines are returned as kind 'message'"""
+    if line.startswith('.'):
+        return Update('status', None, line[1:])
+    if line.startswith('time:'):
+        return Update('time', None, line[5:].strip())
+    kind, _, rest = line.partition('.')
+    if kind in _FIELDS:
+        symbol, _, values = rest.partition(':')
+        values = values.split()
+        fields = _FIELDS[kind]
+        if len(values) == len(fields):
+            data = {'symbol': symbol}
+            try:
+                data.update({name: cast(value) for (name, cast), value in zip(fields, values)})
+            except ValueError:
+                return Update('message', None, line)
+            return Update(kind, symbol, data)
+    elif kind in ('order', 'execution'):
+        key, _, payload = rest.partition(' ')
+        try:
+            return Update(kind, key, json.loads(payload))
+        except ValueError:
+            pass
+    return Update('message', None, line)
+
+
+def _netstring(line):
+    data = line.encode()
+    return b'%d:%s,' % (len(data), data)
+
+
+class Stream():
+    """Subscriber for txtrader TCP push updates, delivered to callbacks and/or by iteration"""
+
+    def __init__(
+        self,
+        mode='rtx',
+        config={},
+        symbols=(),
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        queue_size: int = 10000
+    ):
+        self.config = _load_config(config)
+        self.host = self.config['TXTRADER_HOST']
+        self.port = int(self.config['TXTRADER_TCP_PORT'])
+        self.username = self.config['TXTRADER_USERNAME']
+        self.password = self.config['TXTRADER_PASSWORD']
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.queue_size = queue_size
+        self.symbols = set(s.upper() for s in symbols)
+        self.connected = threading.Event()
+        self.connections = 0
+        # exceptions raised by callbacks are counted and the last one kept; they do not stop the receiver
+        self.callback_errors = 0
+        self.last_callback_error = None
+        # updates not queued for iteration because the queue was full
+        self.dropped = 0
+        self._callbacks = {}
+        self._queue = None
+        self._socket = None
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def on(self, kind, callback):
+        """Call callback(update) for each update of kind ('quote', 'trade', 'bar', 'order', 'execution', ... or '*')"""
+        self._callbacks.setdefault(kind, []).append(callback)
+        return callback
+
+    def subscribe(self, symbol: str):
+        """Add symbol to the subscriptions requested on every (re)connect"""
+        symbol = symbol.upper()
+        self.symbols.add(symbol)
+        self._send(f'add {symbol}')
+
+    def unsubscribe(self, symbol: str):
+        """Remove symbol from the subscriptions"""
+        symbol = symbol.upper()
+        self.symbols.discard(symbol)
+        self._send(f'del {symbol}')
+
+    def start(self):
+        """Start the background receiver thread"""
+        if not self._thread:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='txtrader-stream', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Disconnect and stop the receiver thread; ends any active iteration"""
+        self._stopped.set()
+        self._close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._queue:
+            # the end marker displaces the oldest update when the consumer has fallen behind
+            while True:
+                try:
+                    self._queue.put_nowait(None)
+                    break
+                except queue.Full:
+                    try:
+                        self._queue.get_nowait()
+                        self.dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def __iter__(self):
+        """Return iterator yielding updates as they arrive, until stop() is called; updates are queued from this call on
+
+        Updates arriving while queue_size updates are waiting are dropped and counted in dropped.
+        """
+        if not self._queue:
+            self._queue = queue.Queue(self.queue_size)
+        return self._updates()
+
+    def _updates(self):
+        while True:
+            update = self._queue.get()
+            if update is None:
+                return
+            yield update
+
+    def _send(self, line):
+        with self._lock:
+            if self._socket and self.connected.is_set():
+                self._socket.sendall(_netstring(line))
+
+    def _close(self):
+        with self._lock:
+            self.connected.clear()
+            if self._socket:
+                try:
+                    self._socket.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self._socket.close()
+                self._socket = None
+
+    def _run(self):
+        delay = self.reconnect_delay
+        while not self._stopped.is_set():
+            try:
+                sock = self._connect()
+                delay = self.reconnect_delay
+                self._receive(sock)
+            except OSError:
+                pass
+            self._close()
+            if self._stopped.wait(delay):
+                break
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port))
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self._lock:
+            if self._stopped.is_set():
+                sock.close()
+                raise ConnectionAbortedError('stream stopped')
+            self._socket = sock
+            self.connections += 1
+            lines = [f'auth {self.username} {self.password}'] + [f'add {s}' for s in sorted(self.symbols)]
+            sock.sendall(b''.join(_netstring(line) for line in lines))
+            self.connected.set()
+        return sock
+
+    def _receive(self, sock):
+        buffer = b''
+        while True:
+            data = sock.recv(65536)
+            if not data:
+                return
+            buffer += data
+            while True:
+                length, colon, rest = buffer.partition(b':')
+                if not colon:
+                    break
+                if not length.isdigit():
+                    raise ConnectionError(f'invalid netstring length {length[:16]!r}')
+                size = int(length)
+                if len(rest) < size + 1:
+                    break
+                if rest[size:size + 1] != b',':
+                    raise ConnectionError('invalid netstring terminator')
+                self._dispatch(decode(rest[:size].decode(errors='replace')))
+                buffer = rest[size + 1:]
+
+    def _dispatch(self, update):
+        for callback in self._callbacks.get(update.kind, []) + self._callbacks.get('*', []):
+            try:
+                callback(update)
+            except Exception as ex:
+                self.callback_errors += 1
+                self.last_callback_error = ex
+        if self._queue:
+            # never block the receiver on a consumer that stopped reading; callbacks keep running
+            try:
+                self._queue.put_nowait(update)
+            except queue.Full:
+                self.dropped += 1
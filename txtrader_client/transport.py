@@ -0,0 +1,304 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+  transport.py
+  ------------
+
+  TxTrader Client module - HTTP transports used by API
+
+  RequestsTransport  pooled keep-alive connections via requests (default)
+  HTTPClientTransport  keep-alive http.client connections; avoids importing
+                       requests, for short lived processes like the txtrader
+                       CLI
+
+  Both send(function_name, body, timeout) methods return a response with
+  status_code, reason, content, json() and raise_for_status() (raising
+  requests.HTTPError).  stream(function_name, body, chunk_size, timeout) is a
+  context manager yielding the response and an iterator of body chunks, with
+  the body left unread.  timeout is (connect, read) seconds, None for no
+  limit; the read timeout applies to each wait for data from the server.
+  Timeouts raise client.TxTraderTimeout.
+
+  With compression enabled, responses are requested with Accept-Encoding
+  gzip, deflate and decompressed transparently, including streamed bodies;
+  request bodies of at least compress_min bytes (0 disables) are sent gzip
+  compressed with Content-Encoding: gzip.
+
+  Copyright (c) 2020 Reliance Systems Inc. <mkrueger@rstms.net>
+  Licensed under the MIT license.  See LICENSE for details.
+
+"""
+
+import base64
+import contextlib
+import functools
+import gzip
+import http.client
+import json
+import threading
+import zlib
+from urllib.parse import urlsplit
+
+from txtrader_client.client import READ_ONLY, TxTraderTimeout
+
+CHUNK_SIZE = 65536
+
+NO_TIMEOUT = (None, None)
+
+ACCEPT_ENCODING = 'gzip, deflate'
+
+# compression level of request bodies; higher levels gain little on JSON for the extra CPU time
+COMPRESS_LEVEL = 6
+
+
+class _Unsent(ConnectionError):
+    """The request could not be written to a connection, so the server cannot have acted on it"""
+
+
+def accept_encoding(compression):
+    return ACCEPT_ENCODING if compression else 'identity'
+
+
+def encode_body(body, compress_min):
+    """Return (body, extra headers), gzip compressing a body of at least compress_min bytes when compress_min > 0"""
+    if body and compress_min and len(body) >= compress_min:
+        return gzip.compress(body, COMPRESS_LEVEL), {'Content-Encoding': 'gzip'}
+    return body, {}
+
+
+def _decompressor(encoding):
+    """Return a zlib decompressobj for a Content-Encoding header value, or None for an identity body"""
+    encoding = (encoding or '').strip().lower()
+    if encoding in ('', 'identity'):
+        return None
+    if encoding in ('gzip', 'x-gzip', 'deflate'):
+        # wbits 32 + MAX_WBITS detects a gzip or zlib header
+        return zlib.decompressobj(32 + zlib.MAX_WBITS)
+    raise ValueError(f'unsupported Content-Encoding {encoding!r}')
+
+
+def decompress(content, encoding):
+    """Return content decoded according to its Content-Encoding"""
+    decompressor = _decompressor(encoding)
+    if decompressor is None:
+        return content
+    return decompressor.decompress(content) + decompressor.flush()
+
+
+def decompress_chunks(chunks, encoding):
+    """Return iterator of decoded chunks of a body with the given Content-Encoding"""
+    decompressor = _decompressor(encoding)
+    if decompressor is None:
+        return chunks
+    return _decompressed(chunks, decompressor)
+
+
+def _decompressed(chunks, decompressor):
+    for chunk in chunks:
+        chunk = decompressor.decompress(chunk)
+        if chunk:
+            yield chunk
+    chunk = decompressor.flush()
+    if chunk:
+        yield chunk
+
+
+class RequestsTransport():
+    """Thread-safe requests session with a bounded keep-alive connection pool"""
+
+    def __init__(self, url, username, password, keepalive=True, pool_size=10, compression=True, compress_min=0):
+        import requests
+        import requests.adapters
+        self.requests = requests
+        self.url = url
+        self.auth = (username, password)
+        self.keepalive = keepalive
+        self.compress_min = compress_min
+        # requests decodes gzip and deflate responses itself, including streamed ones
+        self.headers = {'Content-type': 'application/json', 'Accept-Encoding': accept_encoding(compression)}
+        self.session = None
+        if keepalive:
+            session = requests.Session()
+            session.auth = self.auth
+            session.headers.update(self.headers)
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self.session = session
+
+    def _request(self, function_name, body, timeout, stream=False):
+        url = f'{self.url}/{function_name}'
+        body, headers = encode_body(body, self.compress_min)
+        if self.session:
+            parameters = dict(headers=headers, stream=stream, timeout=timeout)
+            get, post = self.session.get, self.session.post
+        else:
+            headers = dict(self.headers, Connection='close', **headers)
+            parameters = dict(headers=headers, auth=self.auth, stream=stream, timeout=timeout)
+            get, post = self.requests.get, self.requests.post
+        return post(url, data=body, **parameters) if body else get(url, **parameters)
+
+    @contextlib.contextmanager
+    def _timeout_errors(self, function_name):
+        try:
+            yield
+        except self.requests.Timeout as ex:
+            raise TxTraderTimeout(f'timeout calling {self.url}/{function_name}: {ex}') from ex
+        except self.requests.ConnectionError as ex:
+            # a read timeout while reading the body is reported as a ConnectionError wrapping urllib3's error
+            if ex.args and type(ex.args[0]).__name__ == 'ReadTimeoutError':
+                raise TxTraderTimeout(f'timeout calling {self.url}/{function_name}: {ex}') from ex
+            raise
+
+    def send(self, function_name, body, timeout=NO_TIMEOUT):
+        with self._timeout_errors(function_name):
+            r = self._request(function_name, body, timeout)
+            with r:
+                # read the body now so the connection is released back to the pool
+                r.content
+        return r
+
+    @contextlib.contextmanager
+    def stream(self, function_name, body, chunk_size=CHUNK_SIZE, timeout=NO_TIMEOUT):
+        with self._timeout_errors(function_name):
+            with self._request(function_name, body, timeout, stream=True) as r:
+                # closing a partly read response discards its connection instead of returning it to the pool
+                yield r, r.iter_content(chunk_size)
+
+    def close(self):
+        if self.session:
+            self.session.close()
+
+
+class Response():
+    """Minimal stand-in for requests.Response"""
+
+    def __init__(self, url, status_code, reason, content):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.content = content
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            import requests
+            kind = 'Client' if self.status_code < 500 else 'Server'
+            raise requests.HTTPError(
+                f'{self.status_code} {kind} Error: {self.reason} for url: {self.url}', response=self
+            )
+
+
+class HTTPClientTransport():
+    """Small pool of keep-alive http.client connections, one in use per calling thread"""
+
+    def __init__(self, url, username, password, keepalive=True, pool_size=1, compression=True, compress_min=0):
+        self.url = url
+        self.compress_min = compress_min
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.host = parts.hostname
+        self.port = parts.port
+        self.keepalive = keepalive
+        self.pool_size = pool_size
+        credentials = base64.b64encode(f'{username}:{password}'.encode()).decode()
+        self.headers = {
+            'Content-type': 'application/json',
+            'Authorization': f'Basic {credentials}',
+            'Connection': 'keep-alive' if keepalive else 'close',
+            'Accept-Encoding': accept_encoding(compression),
+        }
+        self.idle = []
+        self.lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _timeout_errors(self, function_name):
+        try:
+            yield
+        except TxTraderTimeout:
+            raise
+        except TimeoutError as ex:
+            raise TxTraderTimeout(f'timeout calling {self.url}/{function_name}: {ex}') from ex
+
+    def send(self, function_name, body, timeout=NO_TIMEOUT):
+        with self._timeout_errors(function_name):
+            connection, r = self._open(function_name, body, timeout)
+            try:
+                content = r.read()
+            except Exception:
+                connection.close()
+                raise
+        self._release(connection, r.will_close)
+        content = decompress(content, r.getheader('Content-Encoding'))
+        return Response(f'{self.url}/{function_name}', r.status, r.reason, content)
+
+    @contextlib.contextmanager
+    def stream(self, function_name, body, chunk_size=CHUNK_SIZE, timeout=NO_TIMEOUT):
+        with self._timeout_errors(function_name):
+            connection, r = self._open(function_name, body, timeout)
+            try:
+                chunks = iter(functools.partial(r.read, chunk_size), b'')
+                yield Response(f'{self.url}/{function_name}', r.status, r.reason, b''), decompress_chunks(
+                    chunks, r.getheader('Content-Encoding')
+                )
+            except BaseException:
+                connection.close()
+                raise
+        if r.isclosed():
+            self._release(connection, r.will_close)
+        else:
+            # the body was not read to the end
+            connection.close()
+
+    def _open(self, function_name, body, timeout):
+        """Send a request on a pooled connection; return (connection, http.client response) with the body unread"""
+        connection, reused = self._acquire()
+        try:
+            try:
+                return connection, self._request(connection, function_name, body, timeout)
+            except (_Unsent, http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError) as ex:
+                # the server closed a reused keep-alive connection; retry once on a new one unless the server
+                # may have read the request and acted on it before closing
+                connection.close()
+                if not reused or not (isinstance(ex, _Unsent) or function_name in READ_ONLY):
+                    raise
+                connection = self.connection_class(self.host, self.port)
+                return connection, self._request(connection, function_name, body, timeout)
+        except Exception:
+            connection.close()
+            raise
+
+    def _request(self, connection, function_name, body, timeout):
+        connect, read = timeout
+        if connection.sock is None:
+            connection.timeout = connect
+            connection.connect()
+        connection.sock.settimeout(read)
+        body, headers = encode_body(body, self.compress_min)
+        headers = dict(self.headers, **headers) if headers else self.headers
+        try:
+            connection.request('POST' if body else 'GET', f'/{function_name}', body=body, headers=headers)
+        except (ConnectionResetError, BrokenPipeError) as ex:
+            raise _Unsent(f'{self.url}/{function_name} not sent: {ex}') from ex
+        return connection.getresponse()
+
+    def _acquire(self):
+        with self.lock:
+            if self.idle:
+                return self.idle.pop(), True
+        return self.connection_class(self.host, self.port), False
+
+    def _release(self, connection, will_close):
+        with self.lock:
+            if self.keepalive and not will_close and len(self.idle) < self.pool_size:
+                self.idle.append(connection)
+                return
+        connection.close()
+
+    def close(self):
+        with self.lock:
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            connection.close()